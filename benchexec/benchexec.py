@@ -208,6 +208,19 @@ class BenchExec(object):
         parser.add_argument("--filesSizeLimit", type=util.parse_memory_value, metavar="BYTES",
             help="maximum size of files the tool may write (checked periodically, counts only files written in container mode or to temporary directories)")
 
+        parser.add_argument("--post-run-hook", dest="post_run_hooks",
+                            action="append", metavar="HOOK",
+                            help="Call the given function after each run with the run and its log file, "
+                                 "given as 'module:function' or as name of an entry point "
+                                 "in the group 'benchexec.post_run_hooks'. "
+                                 "Hooks are executed in parallel to the next runs. "
+                                 "This option can be specified several times.")
+
+        parser.add_argument("--database", dest="result_database",
+                            metavar="FILE",
+                            help="Additionally store the results in the given SQLite database "
+                                 "(created if it does not exist, otherwise results are added).")
+
         parser.add_argument("--commit", dest="commit",
                           action="store_true",
                           help="If the output path is a git repository without local changes, "
@@ -19,6 +19,7 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import locale
 import os
 
 from benchexec import util
@@ -37,6 +38,9 @@ class FileWriter(object):
         self.filename = filename
         self.__needsRewrite = False
         self.__content = content
+        self.__updatableLines = None
+        # the same encoding that open() uses for text files
+        self.__encoding = locale.getpreferredencoding(False)
 
         # Open file with "w" at least once so it will be overwritten.
         util.write_file(content, self.filename)
@@ -66,6 +70,58 @@ class FileWriter(object):
                 file.write(newContent)
 
         self.__needsRewrite = not keep
+        self.__updatableLines = None
+
+    def append_updatable_lines(self, lines):
+        """
+        Add lines to the represented file that can later be replaced individually
+        with update_line() without rewriting the whole file.
+        Like content added with append(newContent, keep=False), the lines will be
+        forgotten during the next call to append().
+        In the file, all lines are padded with spaces to the same width,
+        such that they can be overwritten in place.
+        """
+        self.__updatableLines = list(lines)
+        self.__lineWidth = max([len(line.encode(self.__encoding)) for line in self.__updatableLines] or [0])
+        self.__write_updatable_lines()
+        self.__needsRewrite = True
+
+    def update_line(self, index, line):
+        """
+        Replace one of the lines that were added with append_updatable_lines().
+        @param index: the index of the line in the list given to append_updatable_lines()
+        """
+        assert self.__updatableLines is not None, "no updatable lines present"
+        self.__updatableLines[index] = line
+        encodedLine = line.encode(self.__encoding)
+
+        if len(encodedLine) > self.__lineWidth:
+            # Line does not fit, we need to write all lines again with a larger width.
+            # Add some reserve to avoid doing this for every slightly longer line.
+            self.__lineWidth = max(len(encodedLine), self.__lineWidth + self.__lineWidth // 4)
+            self.__write_updatable_lines()
+        else:
+            with open(self.filename, "r+b") as file:
+                file.seek(self.__updatableLinesOffset + index * (self.__lineWidth + 1))
+                file.write(self.__pad_line(encodedLine))
+
+    def __pad_line(self, encodedLine):
+        return encodedLine.ljust(self.__lineWidth) + b"\n"
+
+    def __write_updatable_lines(self):
+        content = b"".join(self.__pad_line(line.encode(self.__encoding)) for line in self.__updatableLines)
+        if self.__needsRewrite:
+            # Replace the content of the file, using a temporary file like append().
+            tmpFilename = self.filename + ".tmp"
+            util.write_file(self.__content, tmpFilename)
+            with open(tmpFilename, "ab") as file:
+                self.__updatableLinesOffset = file.tell()
+                file.write(content)
+            os.rename(tmpFilename, self.filename)
+        else:
+            with open(self.filename, "ab") as file:
+                self.__updatableLinesOffset = file.tell()
+                file.write(content)
 
     def replace(self, newContent):
         # clear and append
@@ -1,16 +1,12 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from benchexec.othermetricswriter import Othermetricswriter
+def hookrunstatistics(run, log_file):
+    """Post-run hook (cf. benchexec.runhooks) that reports whether a run used the CEGAR algorithm."""
 
-def hookrunstatistics(run, other_writer):
+    print(log_file)
 
-    print(run.log_file)
-
-    f = open(run.log_file,"r")
-    lines = f.readlines()
-    f.close()
-
-    for line in lines:
-        if line.find("CEGAR algorithm statistics") >= 0: # CEGAR algorithm is used
-            print("Hey! I found the CEGAR statistics!: ",line)
+    with open(log_file, "r") as f:
+        for line in f:
+            if line.find("CEGAR algorithm statistics") >= 0: # CEGAR algorithm is used
+                print("Hey! I found the CEGAR statistics!: ",line)
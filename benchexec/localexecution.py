@@ -39,6 +39,7 @@ from benchexec import util
 from benchexec.intel_cpu_energy import EnergyMeasurement
 
 from benchexec.othermetricswriter import Othermetricswriter
+from benchexec import runhooks
 
 WORKER_THREADS = []
 STOPPED_BY_INTERRUPT = False
@@ -107,6 +108,8 @@ def execute_benchmark(benchmark, output_handler):
     elif benchmark.config.coreset:
         sys.exit('Please limit the number of cores first if you also want to limit the set of available cores.')
 
+    post_run_hooks = [runhooks.load_hook(name) for name in benchmark.config.post_run_hooks or []]
+
     if MEMLIMIT in benchmark.rlimits:
         # check whether we have enough memory in the used memory banks for all runs
         check_memory_size(benchmark.rlimits[MEMLIMIT], benchmark.num_of_threads,
@@ -136,12 +139,16 @@ def execute_benchmark(benchmark, output_handler):
 
         print("This is the Test! each run set start")
 
+        if STOPPED_BY_INTERRUPT:
+            break
+
         other_writer = Othermetricswriter(runSet)
 
         other_writer.other_before_runset()
 
-        if STOPPED_BY_INTERRUPT:
-            break
+        # metrics and other post-run analyses are executed in the background
+        hook_runner = runhooks.PostRunHookRunner(
+            post_run_hooks + [other_writer.other_after_run], max_workers=benchmark.num_of_threads)
 
         if not runSet.should_be_executed():
             print("This is the Test! runSet 1")
@@ -174,7 +181,7 @@ def execute_benchmark(benchmark, output_handler):
                 cores = coreAssignment[i] if coreAssignment else None
                 memBanks = memoryAssignment[i] if memoryAssignment else None
                 user = benchmark.config.users[i] if benchmark.config.users else None
-                WORKER_THREADS.append(_Worker(benchmark, cores, memBanks, user, output_handler, other_writer))
+                WORKER_THREADS.append(_Worker(benchmark, cores, memBanks, user, output_handler, hook_runner))
 
             # wait until all tasks are done,
             # instead of queue.join(), we use a loop and sleep(1) to handle KeyboardInterrupt
@@ -201,6 +208,11 @@ def execute_benchmark(benchmark, output_handler):
             if energy and cpu_packages:
                 energy = {pkg: energy[pkg] for pkg in energy if pkg in cpu_packages}
 
+            # wait for post-run hooks of all runs
+            hook_failures = hook_runner.wait()
+            if hook_failures:
+                logging.warning('%s post-run hook executions failed in this run set.', hook_failures)
+
             if STOPPED_BY_INTERRUPT:
                 output_handler.set_error('interrupted', runSet)
             output_handler.output_after_run_set(runSet, cputime=usedCpuTime, walltime=usedWallTime, energy=energy)
@@ -208,6 +220,10 @@ def execute_benchmark(benchmark, output_handler):
             for worker in WORKER_THREADS:
                 worker.cleanup()
 
+        # write all pending metrics, also if interrupted
+        hook_runner.shutdown()
+        other_writer.other_after_runset()
+
         print("This is the Test! each run set end")
 
     if throttle_check.has_throttled():
@@ -242,7 +258,7 @@ class _Worker(threading.Thread):
     """
     working_queue = Queue()
 
-    def __init__(self, benchmark, my_cpus, my_memory_nodes, my_user, output_handler, other_writer):
+    def __init__(self, benchmark, my_cpus, my_memory_nodes, my_user, output_handler, hook_runner):
         threading.Thread.__init__(self) # constuctor of superclass
         self.benchmark = benchmark
         self.my_cpus = my_cpus
@@ -250,7 +266,7 @@ class _Worker(threading.Thread):
         self.output_handler = output_handler
         self.run_executor = RunExecutor(user=my_user, **benchmark.config.containerargs)
         self.setDaemon(True)
-        self.other_writer = other_writer
+        self.hook_runner = hook_runner
 
         self.start()
 
@@ -317,10 +333,10 @@ class _Worker(threading.Thread):
 
         run.set_result(run_result)
 
-        self.output_handler.output_after_run(run)
-
-        # this is the point to store the information of run statistics
-        self.other_writer.other_after_run(run)
+        # The log file is archived only after the post-run hooks (e.g., for storing
+        # the information of run statistics) are done with it.
+        self.output_handler.output_after_run(run, log_file_in_use=True)
+        self.hook_runner.submit(run, callback=self.output_handler.release_log_file)
 
 
     def stop(self):
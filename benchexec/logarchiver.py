@@ -0,0 +1,290 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from concurrent import futures
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+# Files larger than this are not compressed in memory but streamed into the archive
+# by the writer thread.
+_MAX_PRECOMPRESSED_SIZE = 64 * 1024 * 1024
+
+_READ_CHUNK_SIZE = 1024 * 1024
+
+_STOP = None
+
+# Constants from the ZIP specification (APPNOTE.TXT),
+# written with the same struct formats as in the zipfile module.
+_LOCAL_FILE_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_DIRECTORY_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4s4H2LH")
+_ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_LIMIT = (1 << 31) - 1
+_ZIP_MAX_ENTRIES = (1 << 16) - 1
+_ZIP_DEFLATED = 8
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+_FLAG_UTF8 = 0x800
+_CREATE_SYSTEM = 0 if os.name == 'nt' else 3
+
+
+class LogArchiver(object):
+    """
+    Stores log files in a ZIP archive in the background.
+    Files are compressed in parallel by a pool of threads
+    (zlib releases the GIL while compressing),
+    and a single writer thread appends the compressed files to the archive
+    in the order in which they were added and deletes the original files afterwards.
+    The number of files that are waiting for being archived is bounded,
+    callers of add() block if necessary.
+    """
+
+    def __init__(self, zip_filename, num_of_threads=1, max_pending=None):
+        """
+        Create the ZIP archive and start the background threads.
+        @param zip_filename: the name of the archive
+        @param num_of_threads: the number of threads for compression
+        @param max_pending: the maximal number of files that are waiting for being archived
+        """
+        self._zip = _ZipWriter(zip_filename)
+        self._compressor = futures.ThreadPoolExecutor(max_workers=max(1, num_of_threads))
+        self._queue = queue.Queue(maxsize=max_pending or 4 * max(1, num_of_threads))
+        self._writer = threading.Thread(target=self._write_files, name="log-archiver")
+        self._writer.daemon = True
+        self._writer.start()
+
+    def add(self, filename, arcname):
+        """
+        Schedule a file for being archived and deleted.
+        This method is thread-safe, and blocks if there are too many pending files.
+        @param filename: the file to archive
+        @param arcname: the name of the file in the archive
+        """
+        compressed = self._compressor.submit(_compress_file, filename)
+        self._queue.put((filename, arcname, compressed))
+
+    def flush(self):
+        """Wait until all files that were added so far are archived."""
+        self._queue.join()
+
+    def close(self):
+        """Archive all pending files and close the archive."""
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._compressor.shutdown()
+        self._zip.close()
+
+    def _write_files(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                filename, arcname, compressed = item
+                try:
+                    precompressed = compressed.result()
+                    if precompressed:
+                        self._zip.write_compressed(filename, arcname, *precompressed)
+                    else:
+                        self._zip.write(filename, arcname)
+                    os.remove(filename)
+                except Exception as e:
+                    # This thread must continue, otherwise callers of add() and flush() would block.
+                    # The file is kept such that the log is not lost.
+                    logging.warning("Could not add log file %s to archive: %s", filename, e)
+            finally:
+                self._queue.task_done()
+
+
+class _ZipWriter(object):
+    """
+    A minimal writer for ZIP archives with members compressed with DEFLATE.
+    In contrast to zipfile.ZipFile, it can append members that were compressed already.
+    The ZIP64 extensions are used where necessary.
+    This class is not thread-safe.
+    """
+
+    def __init__(self, filename):
+        self._file = open(filename, 'wb')
+        self._entries = []
+
+    def write_compressed(self, filename, arcname, file_size, crc, data):
+        """
+        Append a member with already compressed content.
+        @param filename: the file that was compressed (its metadata are stored in the archive)
+        @param arcname: the name of the member in the archive
+        @param file_size: the size of the uncompressed content
+        @param crc: the CRC-32 of the uncompressed content
+        @param data: the content compressed with raw DEFLATE
+        """
+        entry = _ZipEntry(filename, arcname)
+        entry.file_size = file_size
+        entry.crc = crc
+        entry.compress_size = len(data)
+        entry.zip64 = file_size > _ZIP64_LIMIT or len(data) > _ZIP64_LIMIT
+        self._append(entry, lambda: self._file.write(data))
+
+    def write(self, filename, arcname):
+        """
+        Compress a file while appending it to the archive, like ZipFile.write().
+        @param filename: the file to archive
+        @param arcname: the name of the member in the archive
+        """
+        entry = _ZipEntry(filename, arcname)
+        # Like ZipFile, reserve space for ZIP64 sizes if the compressed size may exceed the limit.
+        entry.zip64 = os.path.getsize(filename) * 1.05 > _ZIP64_LIMIT
+
+        def write_data():
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            crc = 0
+            with open(filename, 'rb') as f:
+                for chunk in iter(lambda: f.read(_READ_CHUNK_SIZE), b''):
+                    crc = zlib.crc32(chunk, crc)
+                    entry.file_size += len(chunk)
+                    data = compressor.compress(chunk)
+                    entry.compress_size += len(data)
+                    self._file.write(data)
+            data = compressor.flush()
+            entry.compress_size += len(data)
+            self._file.write(data)
+            entry.crc = crc & 0xffffffff
+            if not entry.zip64 and max(entry.file_size, entry.compress_size) > _ZIP64_LIMIT:
+                raise IOError("File {} grew too large while archiving it".format(filename))
+
+            # write header again, now with the CRC and the sizes
+            end = self._file.tell()
+            self._file.seek(entry.header_offset)
+            self._file.write(entry.local_header())
+            self._file.seek(end)
+
+        self._append(entry, write_data)
+
+    def _append(self, entry, write_data):
+        entry.header_offset = self._file.tell()
+        try:
+            self._file.write(entry.local_header())
+            write_data()
+        except:
+            # remove partially written member such that the archive stays valid
+            self._file.seek(entry.header_offset)
+            self._file.truncate()
+            raise
+        self._entries.append(entry)
+
+    def close(self):
+        """Write the central directory and close the archive."""
+        start = self._file.tell()
+        for entry in self._entries:
+            self._file.write(entry.central_directory_header())
+        end = self._file.tell()
+        count = len(self._entries)
+        size = end - start
+        if count > _ZIP_MAX_ENTRIES or start > _ZIP64_LIMIT or size > _ZIP64_LIMIT:
+            self._file.write(_ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+                b'PK\x06\x06', _ZIP64_END_OF_CENTRAL_DIRECTORY.size - 12,
+                _VERSION_ZIP64, _VERSION_ZIP64, 0, 0, count, count, size, start))
+            self._file.write(_ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR.pack(
+                b'PK\x06\x07', 0, end, 1))
+            count = min(count, 0xffff)
+            size = min(size, 0xffffffff)
+            start = min(start, 0xffffffff)
+        self._file.write(_END_OF_CENTRAL_DIRECTORY.pack(
+            b'PK\x05\x06', 0, 0, count, count, size, start, 0))
+        self._file.close()
+
+
+class _ZipEntry(object):
+    """The metadata of a member of a ZIP archive written by _ZipWriter."""
+
+    def __init__(self, filename, arcname):
+        stat = os.stat(filename)
+        year, month, day, hour, minute, second = time.localtime(stat.st_mtime)[:6]
+        if year < 1980:
+            year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+        self.dos_date = (year - 1980) << 9 | month << 5 | day
+        self.dos_time = hour << 11 | minute << 5 | second // 2
+        self.external_attr = (stat.st_mode & 0xffff) << 16
+
+        arcname = arcname.replace(os.sep, '/').lstrip('/')
+        try:
+            self.name = arcname.encode('ascii')
+            self.flags = 0
+        except UnicodeEncodeError:
+            self.name = arcname.encode('utf-8')
+            self.flags = _FLAG_UTF8
+
+        self.file_size = 0
+        self.compress_size = 0
+        self.crc = 0
+        self.header_offset = 0
+        self.zip64 = False
+
+    def local_header(self):
+        if self.zip64:
+            extra = struct.pack('<2H2Q', 1, 16, self.file_size, self.compress_size)
+            file_size = compress_size = 0xffffffff
+            version = _VERSION_ZIP64
+        else:
+            extra = b''
+            file_size = self.file_size
+            compress_size = self.compress_size
+            version = _VERSION_DEFAULT
+        return _LOCAL_FILE_HEADER.pack(
+            b'PK\x03\x04', version, 0, self.flags, _ZIP_DEFLATED, self.dos_time, self.dos_date,
+            self.crc, compress_size, file_size, len(self.name), len(extra)) + self.name + extra
+
+    def central_directory_header(self):
+        # Values that do not fit are moved to the ZIP64 extra field, in this order.
+        values = [self.file_size, self.compress_size, self.header_offset]
+        zip64_values = [value for value in values if value > _ZIP64_LIMIT]
+        file_size, compress_size, header_offset = [
+            0xffffffff if value > _ZIP64_LIMIT else value for value in values]
+        if zip64_values:
+            extra = struct.pack('<2H{}Q'.format(len(zip64_values)),
+                                1, 8 * len(zip64_values), *zip64_values)
+        else:
+            extra = b''
+        version = _VERSION_ZIP64 if self.zip64 or zip64_values else _VERSION_DEFAULT
+        return _CENTRAL_DIRECTORY_HEADER.pack(
+            b'PK\x01\x02', version, _CREATE_SYSTEM, version, 0,
+            self.flags, _ZIP_DEFLATED, self.dos_time, self.dos_date,
+            self.crc, compress_size, file_size, len(self.name), len(extra), 0,
+            0, 0, self.external_attr, header_offset) + self.name + extra
+
+
+def _compress_file(filename):
+    """
+    Compress a file with raw DEFLATE as used in ZIP archives.
+    @return a tuple (uncompressed size, CRC, compressed data), or None for large files
+    """
+    if os.path.getsize(filename) > _MAX_PRECOMPRESSED_SIZE:
+        return None
+    with open(filename, 'rb') as f:
+        content = f.read()
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    data = compressor.compress(content) + compressor.flush()
+    return (len(content), zlib.crc32(content) & 0xffffffff, data)
@@ -22,6 +22,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import collections
 import logging
 import os
+import re
 import time
 import sys
 from xml.etree import ElementTree
@@ -235,6 +236,9 @@ class Benchmark(object):
         # get columns
         self.columns = Benchmark.load_columns(rootTag.find("columns"))
 
+        # get additional metrics, None if they are not defined
+        self.metrics = Benchmark.load_metrics(rootTag.find("metrics"))
+
         # get global source files, they are used in all run sets
         globalSourcefilesTags = rootTag.findall("tasks") + rootTag.findall("sourcefiles")
 
@@ -328,6 +332,27 @@ class Benchmark(object):
                               column.text, column.title)
         return columns
 
+    @staticmethod
+    def load_metrics(metricsTag):
+        """
+        @param metricsTag: the metricsTag from the XML file
+        @return: a list of Metrics(), or None if there is no metricsTag
+        """
+        if metricsTag is None: # metricsTag is optional in XML file
+            return None
+        metrics = []
+        for metricTag in metricsTag.findall("metric"):
+            title = metricTag.get("title")
+            if not title:
+                sys.exit('Metric with pattern "{}" has no title.'.format(metricTag.text))
+            try:
+                metrics.append(Metric(title, metricTag.text or ""))
+            except re.error as e:
+                sys.exit('Invalid pattern for metric "{}": {}'.format(title, e))
+            logging.debug('Metric "%s" with pattern "%s" loaded from XML file.',
+                          title, metricTag.text)
+        return metrics
+
 
 class RunSet(object):
     """
@@ -819,6 +844,29 @@ class Column(object):
         self.value = ""
 
 
+class Metric(object):
+    """
+    The class Metric contains the title and the pattern of an additional metric
+    that is extracted from the output of a run.
+    The value of the metric is the first group of the pattern
+    (or the whole match if the pattern has no groups)
+    in the last line of the output that matches the pattern.
+    """
+
+    def __init__(self, title, pattern):
+        self.title = title
+        self.pattern = re.compile(pattern)
+
+    def get_value_from_line(self, line):
+        """
+        @return: the value of this metric in the given line, or None
+        """
+        match = self.pattern.search(line)
+        if not match:
+            return None
+        return match.group(1) if self.pattern.groups else match.group(0)
+
+
 class Requirements(object):
     '''
     This class wrappes the values for the requirements.
@@ -1,105 +1,137 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import csv
+import logging
+import queue
+import threading
+
+from benchexec.model import Metric
+
+# Metrics that are used if the benchmark definition does not define any,
+# these match the statistics output of CPAchecker.
+DEFAULT_METRICS = [
+    Metric("NoR", r"Number of successful refinements:.*?(\S+)\s*$"),
+    Metric("RLen", r"Length of refined path \(in blocks\):\s*(\S+)"),
+    Metric("RLeninBlkAvg", r"Length of refined path \(in blocks\):.*?(\S*)\S\s*$"),
+    Metric("AFC", r"Attempted forced coverings:.*?(\S+)\s*$"),
+    Metric("SFC", r"Successful forced coverings:\s*(\S+)"),
+    Metric("ComS", r"Number of computed successors:.*?(\S+)\s*$"),
+    Metric("TfR", r"Time for refinement:.*?(\S*)\S\s*$"),
+    Metric("TTfCPA", r"Total time for CPA algorithm:\s*(\S*)\S"),
+    Metric("TfFC", r"Time for forced covering:\s*(\S*)\S"),
+    Metric("TfTran", r"Time for transfer relation:\s*(\S*)\S"),
+    Metric("TfSMTwoitp", r"Total time for SMT solver \(w/o itp\):\s*(\S*)\S"),
+    Metric("NoAbs", r"Number of abstractions:\s*(\S+)"),
+    ]
+
+MISSING_VALUE = "none"
+
+_STOP = None
 
-class Othermetricswriter(object):
-
-    def __init__(self, runSet):
 
+class Othermetricswriter(object):
+    """
+    Writes additional metrics that are extracted from the output of each run
+    into a CSV file for each run set.
+    The file is kept open while the run set is executed,
+    and rows are written by a background thread and flushed in batches,
+    such that calls from several worker threads do not block each other.
+    """
+
+    def __init__(self, runSet, batch_size=20):
+        """
+        @param runSet: the run set, its benchmark defines the metrics
+        @param batch_size: the maximal number of rows that are written without flushing
+        """
         self.runSet = runSet
-        self.fieldnames = ["FileName","NoR","RLen","RLeninBlkAvg","AFC","SFC","ComS","TfR","TTfCPA","TfFC","TfTran","TfSMTwoitp","NoAbs"]
-        self.filename = runSet.log_folder+"csv"
+        self.metrics = runSet.benchmark.metrics
+        if self.metrics is None:
+            self.metrics = DEFAULT_METRICS
+        self.fieldnames = ["FileName"] + [metric.title for metric in self.metrics]
+        self.filename = runSet.log_folder + "csv"
+        self._batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
 
     def other_before_runset(self):
-
-        print(self.filename)
-
-        f = open(self.filename, 'w')
-        writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-        writer.writeheader()
-
-        f.close()
-
-
-    def other_after_run(self, run):
-
-        print(run.log_file)
-
-        f = open(run.log_file,"r")
-        lines = f.readlines()
-        f.close()
-
-        dic = {}
-
-        dic[self.fieldnames[0]] = run.identifier
-
-        # loop for extracting other metrics
-
-        for line in lines:
-            if line.find("Number of successful refinements:") >= 0:
-                tokens = line.split()
-                dic["NoR"] = tokens[len(tokens)-1]
-
-            if line.find("Length of refined path (in blocks):") >= 0:
-                tokens = line.split()
-                dic["RLen"] = tokens[6]
-                rtoken = tokens[len(tokens)-1]
-                dic["RLeninBlkAvg"] = rtoken[0:len(rtoken)-1]
-
-            if line.find("Attempted forced coverings:") >= 0:
-                tokens = line.split()
-                dic["AFC"] = tokens[len(tokens)-1]
-
-            # successful forced covering can be none if attempted forced covering is zero
-            # if no successful forced covering, how?
-            if line.find("Successful forced coverings:") >= 0: 
-                tokens = line.split()
-                dic["SFC"] = tokens[3]
-
-            if line.find("Number of computed successors:") >= 0:
-                tokens = line.split()
-                dic["ComS"] = tokens[len(tokens)-1]
-
-            if line.find("Time for refinement:") >= 0:
-                tokens = line.split()
-                rtoken = tokens[len(tokens)-1]
-                dic["TfR"] = rtoken[0:len(rtoken)-1]
-
-            if line.find("Total time for CPA algorithm:") >= 0:
-                tokens = line.split()
-                rtoken = tokens[5]
-                dic["TTfCPA"] = rtoken[0:len(rtoken)-1]
-
-            if line.find("Time for forced covering:") >= 0:
-                tokens = line.split()
-                rtoken = tokens[4]
-                dic["TfFC"] = rtoken[0:len(rtoken)-1]
-
-            if line.find("Time for transfer relation:") >= 0:
-                tokens = line.split()
-                rtoken = tokens[4]
-                dic["TfTran"] = rtoken[0:len(rtoken)-1]
-
-            if line.find("Total time for SMT solver (w/o itp):") >= 0:
-                tokens = line.split()
-                rtoken = tokens[7]
-                dic["TfSMTwoitp"] = rtoken[0:len(rtoken)-1]
-
-            if line.find("Number of abstractions:") >= 0:
-                tokens = line.split()
-                dic["NoAbs"] = tokens[3]
+        """Create the CSV file and start writing."""
+        self._file = open(self.filename, 'w')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        self._writer.writeheader()
+        self._file.flush()
+
+        self._thread = threading.Thread(target=self._write_rows, name="metrics-writer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def other_after_run(self, run, log_file=None):
+        """
+        Extract the metrics from the output of a run and schedule them for writing.
+        This method is thread-safe and can be used as post-run hook.
+        @param log_file: the log file of the run, if different from run.log_file
+        """
+        log_file = log_file or run.log_file
+        row = {"FileName": run.identifier}
+        try:
+            with open(log_file, errors='replace') as log:
+                for line in log:
+                    for metric in self.metrics:
+                        value = metric.get_value_from_line(line)
+                        if value is not None:
+                            row[metric.title] = value
+        except EnvironmentError as e:
+            logging.warning("Could not read metrics from log file %s: %s", log_file, e)
 
         for field in self.fieldnames:
-            if dic.get(field) is None:
-                dic[field] = "none"
-
-        f = open(self.filename, 'a')
-        writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-        writer.writerow(dic)
-        f.close()
+            if row.get(field) is None:
+                row[field] = MISSING_VALUE
+        self._queue.put(row)
 
+    def flush(self):
+        """Wait until all rows that were scheduled so far are written to disk."""
+        self._queue.join()
 
     def other_after_runset(self):
-
-        pass
+        """Write all pending rows and close the CSV file."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+
+    def _write_rows(self):
+        unflushed_rows = 0
+        while True:
+            row = self._queue.get()
+            try:
+                if row is _STOP:
+                    self._file.flush()
+                    return
+                self._writer.writerow(row)
+                unflushed_rows += 1
+                # flush if no more rows are waiting, or at least after each batch
+                if unflushed_rows >= self._batch_size or self._queue.empty():
+                    self._file.flush()
+                    unflushed_rows = 0
+            finally:
+                self._queue.task_done()
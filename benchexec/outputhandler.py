@@ -26,15 +26,16 @@ import os
 import threading
 import time
 import sys
-from xml.dom import minidom
 from xml.etree import ElementTree as ET
-import zipfile
 
 import benchexec
 from benchexec.model import MEMLIMIT, TIMELIMIT, SOFTTIMELIMIT, CORELIMIT
 from benchexec import filewriter
 from benchexec import intel_cpu_energy
+from benchexec import logarchiver
 from benchexec import result
+from benchexec import resultdb
+from benchexec import resultjournal
 from benchexec import util
 
 RESULT_XML_PUBLIC_ID = '+//IDN sosy-lab.org//DTD BenchExec result 1.9//EN'
@@ -119,10 +120,14 @@ class OutputHandler(object):
         self.xml_file_names = []
 
         if compress_results:
-            self.log_zip = zipfile.ZipFile(benchmark.log_zip, mode="w",
-                                           compression=zipfile.ZIP_DEFLATED)
+            self.log_archiver = logarchiver.LogArchiver(benchmark.log_zip, benchmark.num_of_threads)
             self.all_created_files.add(benchmark.log_zip)
 
+        self.result_db = None
+        if getattr(benchmark.config, 'result_database', None):
+            self.result_db = resultdb.ResultDatabase(benchmark.config.result_database)
+            self.result_db_benchmark_id = self.result_db.add_benchmark(self.xml_header)
+
 
     def store_system_info(self, opSystem, cpu_model, cpu_number_of_cores, cpu_max_frequency, memory, hostname,
                           runSet=None, environment={},
@@ -308,8 +313,9 @@ class OutputHandler(object):
         self.writeRunSetInfoToLog(runSet)
 
         # prepare information for text output
-        for run in runSet.runs:
+        for index, run in enumerate(runSet.runs):
             run.resultline = self.format_sourcefile_name(run.identifier, runSet)
+            run.resultline_index = index
 
             if run.sourcefiles:
                 adjusted_identifier = util.relative_path(run.identifier, xml_file_name)
@@ -333,13 +339,19 @@ class OutputHandler(object):
         block_name = runSet.blocks[0].name if len(runSet.blocks) == 1 else None
         runSet.xml = self.runs_to_xml(runSet, runSet.runs, block_name)
 
-        # write (empty) results to txt_file and XML
-        self.txt_file.append(self.run_set_to_text(runSet), False)
+        # write (empty) results to txt_file,
+        # the line of each run will be updated in place when the run is finished
+        self.txt_file.append_updatable_lines(self.run_set_to_lines(runSet))
         runSet.xml_file_name = xml_file_name
-        self._write_rough_result_xml_to_file(runSet.xml, runSet.xml_file_name)
-        runSet.xml_file_last_modified_time = util.read_monotonic_time()
-        self.all_created_files.add(runSet.xml_file_name)
+        # The XML file is written only at the end of the run set,
+        # until then the results are stored in the journal.
+        runSet.journal = resultjournal.ResultJournal(
+            xml_file_name + resultjournal.JOURNAL_FILE_SUFFIX, runSet.xml)
+        self.all_created_files.add(runSet.journal.filename)
         self.xml_file_names.append(runSet.xml_file_name)
+        if self.result_db:
+            runSet.result_db_id = self.result_db.add_run_set(
+                self.result_db_benchmark_id, runSet.xml, xml_file_name)
 
 
     def output_for_skipping_run_set(self, runSet, reason=None):
@@ -415,10 +427,12 @@ class OutputHandler(object):
             OutputHandler.print_lock.release()
 
 
-    def output_after_run(self, run):
+    def output_after_run(self, run, log_file_in_use=False):
         """
         The method output_after_run() prints filename, result, time and status
         of a run to terminal and stores all data in XML
+        @param log_file_in_use: whether the log file of the run is still needed,
+            in this case the caller needs to call release_log_file() later
         """
 
         # format times, type is changed from float to string!
@@ -458,29 +472,33 @@ class OutputHandler(object):
                 timeStr = time.strftime("%H:%M:%S", time.localtime()) + " "*14
                 util.printOut(timeStr + self.format_sourcefile_name(run.identifier, run.runSet) + valueStr)
 
-            # write result in txt_file and XML
-            self.txt_file.append(self.run_set_to_text(run.runSet), False)
+            # write result in txt_file and journal
+            self.txt_file.update_line(run.resultline_index, run.resultline)
             self.statistics.add_result(run)
-
-            # we don't want to write this file to often, it can slow down the whole script,
-            # so we wait at least 10 seconds between two write-actions
-            currentTime = util.read_monotonic_time()
-            if currentTime - run.runSet.xml_file_last_modified_time > 60:
-                self._write_rough_result_xml_to_file(run.runSet.xml, run.runSet.xml_file_name)
-                run.runSet.xml_file_last_modified_time = util.read_monotonic_time()
+            run.runSet.journal.append(run.xml)
+            if self.result_db:
+                self.result_db.add_run(run.runSet.result_db_id, run.xml)
 
         finally:
             OutputHandler.print_lock.release()
 
-        if self.compress_results:
-            self.log_zip.write(run.log_file, os.path.relpath(run.log_file, os.path.join(self.benchmark.log_folder, os.pardir))) 
-            os.remove(run.log_file)
-        else:
-            self.all_created_files.add(run.log_file)
+        if not log_file_in_use:
+            self.release_log_file(run)
 
         if os.path.isdir(run.result_files_folder):
             self.all_created_files.add(run.result_files_folder)
 
+    def release_log_file(self, run):
+        """
+        Store the log file of a run as part of the results.
+        If results are compressed, the log file is moved into the archive.
+        """
+        if self.compress_results:
+            # archived and deleted in the background
+            self.log_archiver.add(run.log_file, os.path.relpath(run.log_file, os.path.join(self.benchmark.log_folder, os.pardir)))
+        else:
+            self.all_created_files.add(run.log_file)
+
     def output_after_run_set(self, runSet, cputime=None, walltime=None, energy={}):
         """
         The method output_after_run_set() stores the times of a run set in XML.
@@ -491,6 +509,11 @@ class OutputHandler(object):
 
         # write results to files
         self._write_pretty_result_xml_to_file(runSet.xml, runSet.xml_file_name)
+        with OutputHandler.print_lock:
+            runSet.journal.remove()
+        self.all_created_files.discard(runSet.journal.filename)
+        if self.result_db:
+            self.result_db.finish_run_set(runSet.result_db_id, runSet.xml)
 
         if len(runSet.blocks) > 1:
             for block in runSet.blocks:
@@ -503,6 +526,9 @@ class OutputHandler(object):
 
 
     def run_set_to_text(self, runSet, finished=False, cputime=0, walltime=0, energy={}):
+        return "\n".join(self.run_set_to_lines(runSet, finished, cputime, walltime, energy)) + "\n"
+
+    def run_set_to_lines(self, runSet, finished=False, cputime=0, walltime=0, energy={}):
         lines = []
 
         # store values of each run
@@ -521,7 +547,7 @@ class OutputHandler(object):
             lines.append(self.create_output_line(runSet, endline, "done", cputime_str,
                              walltime_str, "-", []))
 
-        return "\n".join(lines) + "\n"
+        return lines
 
     def runs_to_xml(self, runSet, runs, blockname=None):
         """
@@ -647,6 +673,9 @@ class OutputHandler(object):
 
 
     def output_after_benchmark(self, isStoppedByInterrupt):
+        if self.compress_results:
+            self.log_archiver.flush()
+
         stats = str(self.statistics)
         util.printOut(stats)
         self.txt_file.append(stats)
@@ -687,7 +716,9 @@ class OutputHandler(object):
     def close(self):
         """Do all necessary cleanup."""
         if self.compress_results:
-            self.log_zip.close()
+            self.log_archiver.close()
+        if self.result_db:
+            self.result_db.close()
 
 
     def get_filename(self, runSetName, fileExtension):
@@ -713,20 +744,6 @@ class OutputHandler(object):
         return fileName.ljust(runSet.max_length_of_filename + 4)
 
 
-    def _write_rough_result_xml_to_file(self, xml, filename):
-        """Write a rough string version of the XML (for temporary files)."""
-        # Write content to temp file first
-        error = xml.get('error', None)
-        xml.set('error', 'incomplete') # Mark result file as incomplete
-        temp_filename = filename + ".tmp"
-        with open(temp_filename, 'wb') as file:
-            ET.ElementTree(xml).write(file, encoding='utf-8', xml_declaration=True)
-        os.rename(temp_filename, filename)
-        if error is not None:
-            xml.set('error', error)
-        else:
-            del xml.attrib['error']
-
     def _write_pretty_result_xml_to_file(self, xml, filename):
         """Writes a nicely formatted XML file with DOCTYPE, and compressed if necessary."""
         if self.compress_results:
@@ -740,12 +757,7 @@ class OutputHandler(object):
             open_func = open
 
         with io.TextIOWrapper(open_func(actual_filename, 'wb'), encoding='utf-8') as file:
-            rough_string = ET.tostring(xml, encoding='unicode')
-            reparsed = minidom.parseString(rough_string)
-            doctype = minidom.DOMImplementation().createDocumentType(
-                    'result', RESULT_XML_PUBLIC_ID, RESULT_XML_SYSTEM_ID)
-            reparsed.insertBefore(doctype, reparsed.documentElement)
-            reparsed.writexml(file, indent="", addindent="  ", newl="\n", encoding="utf-8")
+            _write_pretty_xml(xml, file.write)
 
         if self.compress_results:
             # try to delete uncompressed file (would have been overwritten in no-compress-mode)
@@ -762,6 +774,67 @@ class OutputHandler(object):
         return filename
 
 
+# Older versions of minidom and ElementTree sort the attributes by name.
+_sorted_xml_attributes = sorted if sys.version_info < (3, 8) else list
+
+
+def _escape_xml(data):
+    """Escape a string for use as XML text or attribute value (like minidom does)."""
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+
+def _normalize_xml_text(text):
+    """Normalize line breaks in XML text like an XML parser does."""
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _write_pretty_xml(xml, write):
+    """
+    Write an XML tree as a nicely formatted document with DOCTYPE.
+    The output is the same as if the tree would be serialized, re-parsed with minidom,
+    and written with writexml(indent="", addindent="  ", newl="\n"),
+    but the document is streamed element by element
+    instead of creating a (large) copy of the whole tree in memory.
+    @param xml: the root element of the result XML
+    @param write: a function that accepts the output string piece by piece
+    """
+    write('<?xml version="1.0" encoding="utf-8"?>\n')
+    write("<!DOCTYPE result\n  PUBLIC '{0}'\n  '{1}'>\n".format(RESULT_XML_PUBLIC_ID, RESULT_XML_SYSTEM_ID))
+    _write_pretty_xml_element(xml, write, "")
+
+
+def _write_pretty_xml_element(elem, write, indent):
+    parts = [indent, "<", elem.tag]
+    for name in _sorted_xml_attributes(elem.keys()):
+        parts.extend((' ', name, '="', _escape_xml(elem.get(name)), '"'))
+
+    # minidom represents text and tail strings as separate text nodes
+    children = []
+    if elem.text:
+        children.append(elem.text)
+    for child in elem:
+        children.append(child)
+        if child.tail:
+            children.append(child.tail)
+
+    if not children:
+        parts.append("/>\n")
+        write("".join(parts))
+    elif len(children) == 1 and not ET.iselement(children[0]):
+        parts.extend((">", _escape_xml(_normalize_xml_text(children[0])), "</", elem.tag, ">\n"))
+        write("".join(parts))
+    else:
+        parts.append(">\n")
+        write("".join(parts))
+        child_indent = indent + "  "
+        for child in children:
+            if ET.iselement(child):
+                _write_pretty_xml_element(child, write, child_indent)
+            else:
+                write(_escape_xml(child_indent + _normalize_xml_text(child) + "\n"))
+        write(indent + "</" + elem.tag + ">\n")
+
+
 class Statistics(object):
 
     def __init__(self):
@@ -218,18 +218,14 @@ def get_memory_banks_per_run(coreAssignment, cgroups):
         # read list of available memory banks
         allMems = set(cgroups.read_allowed_memory_banks())
 
-        result = []
+        # read mapping of core to memory banks on the same NUMA node
+        mems_of_core = {}
         for cores in coreAssignment:
-            mems = set()
             for core in cores:
                 coreDir = '/sys/devices/system/cpu/cpu{0}/'.format(core)
-                mems.update(_get_memory_banks_listed_in_dir(coreDir))
-            allowedMems = sorted(mems.intersection(allMems))
-            logging.debug("Memory banks for cores %s are %s, of which we can use %s.", cores, list(mems), allowedMems)
+                mems_of_core[core] = _get_memory_banks_listed_in_dir(coreDir)
 
-            result.append(allowedMems)
-
-        assert len(result) == len(coreAssignment)
+        result = _get_memory_banks_per_run0(coreAssignment, allMems, mems_of_core)
 
         if any(result) and os.path.isdir('/sys/devices/system/node/'):
             return result
@@ -241,6 +237,28 @@ def get_memory_banks_per_run(coreAssignment, cgroups):
         sys.exit("Could not read memory information from kernel: {0}".format(e))
 
 
+def _get_memory_banks_per_run0(coreAssignment, allMems, mems_of_core):
+    """This method does the actual work of get_memory_banks_per_run
+    without reading the machine architecture from the file system
+    in order to be testable. For description, c.f. above.
+    @param allMems: the set of memory banks that may be used
+    @param mems_of_core: a mapping from each core to the list of memory banks local to this core
+    @return a list of lists, where each inner list contains the memory banks for one run
+    """
+    result = []
+    for cores in coreAssignment:
+        mems = set()
+        for core in cores:
+            mems.update(mems_of_core[core])
+        allowedMems = sorted(mems.intersection(allMems))
+        logging.debug("Memory banks for cores %s are %s, of which we can use %s.", cores, list(mems), allowedMems)
+
+        result.append(allowedMems)
+
+    assert len(result) == len(coreAssignment)
+    return result
+
+
 def _get_memory_banks_listed_in_dir(path):
     """Get all memory banks the kernel lists in a given directory.
     Such a directory can be /sys/devices/system/node/ (contains all memory banks)
@@ -19,7 +19,9 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import functools
 import os
+import re
 import sys
 
 # CONSTANTS
@@ -163,6 +165,14 @@ _FILE_RESULTS = {
               '_unsat':                (RESULT_UNSAT, {_PROP_SAT}),
               }
 
+# Regular expression that finds all keys of _FILE_RESULTS in a file name in one pass.
+# As no key overlaps with another one (or itself), finding non-overlapping occurrences is enough.
+_FILE_RESULTS_PATTERN = re.compile(
+    '|'.join(re.escape(part) for part in sorted(_FILE_RESULTS, key=len, reverse=True)))
+
+# Number of (file name, properties) pairs for which the expected result is cached
+_EXPECTED_RESULT_CACHE_SIZE = 100000
+
 # Map a property to all possible results for it.
 _VALID_RESULTS_PER_PROPERTY = {
     _PROP_ASSERT:      {RESULT_TRUE_PROP, RESULT_FALSE_REACH},
@@ -192,10 +202,15 @@ _SCORE_WRONG_TRUE = -32
 
 
 def _expected_result(filename, checked_properties):
+    return _expected_result_for_properties(filename, tuple(checked_properties))
+
+
+@functools.lru_cache(maxsize=_EXPECTED_RESULT_CACHE_SIZE)
+def _expected_result_for_properties(filename, checked_properties):
     results = []
-    for (filename_part, (expected_result, for_properties)) in _FILE_RESULTS.items():
-        if filename_part in filename \
-                and for_properties.intersection(checked_properties):
+    for filename_part in set(_FILE_RESULTS_PATTERN.findall(filename)):
+        expected_result, for_properties = _FILE_RESULTS[filename_part]
+        if for_properties.intersection(checked_properties):
             results.append(expected_result)
     if not results:
         # No expected result for any of the properties
@@ -0,0 +1,312 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Storage of benchmark results in an SQLite database.
+
+The database can be filled by benchexec in addition to the result XML files
+and can hold the results of many benchmark executions,
+such that they can be queried efficiently with SQL.
+The tables are:
+- benchmark: one row per execution of a benchmark definition
+- runset: one row per run set, with the header of the result XML
+  (all attributes and child elements except the runs)
+- run: one row per run, with its name, status, and category
+- value: one row per result value of a run (the "column" tags in the result XML)
+
+table-generator can read run sets from such a database like from result XML files.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import threading
+from xml.etree import ElementTree as ET
+
+_SQLITE_HEADER = b"SQLite format 3\0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS benchmark (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    tool TEXT,
+    version TEXT,
+    toolmodule TEXT,
+    generator TEXT
+);
+CREATE TABLE IF NOT EXISTS runset (
+    id INTEGER PRIMARY KEY,
+    benchmark_id INTEGER NOT NULL REFERENCES benchmark(id),
+    name TEXT,
+    result_file TEXT NOT NULL,
+    header TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY,
+    runset_id INTEGER NOT NULL REFERENCES runset(id),
+    name TEXT NOT NULL,
+    files TEXT,
+    options TEXT,
+    properties TEXT,
+    status TEXT,
+    category TEXT
+);
+CREATE TABLE IF NOT EXISTS value (
+    run_id INTEGER NOT NULL REFERENCES run(id),
+    title TEXT NOT NULL,
+    value TEXT,
+    hidden INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runset_benchmark_index ON runset(benchmark_id);
+CREATE INDEX IF NOT EXISTS run_runset_index ON run(runset_id);
+CREATE INDEX IF NOT EXISTS run_name_index ON run(name);
+CREATE INDEX IF NOT EXISTS run_status_index ON run(status);
+CREATE INDEX IF NOT EXISTS run_category_index ON run(category);
+CREATE INDEX IF NOT EXISTS value_run_index ON value(run_id);
+"""
+
+_RUN_ATTRIBUTES = ['name', 'files', 'options', 'properties']
+
+
+class ResultDatabase(object):
+    """
+    Writer for a result database.
+    Runs are not inserted immediately, but in batches of several runs per transaction.
+    All methods are thread-safe.
+    """
+
+    def __init__(self, filename, batch_size=100):
+        """
+        Open a result database, and create it if necessary.
+        @param filename: the file name of the database
+        @param batch_size: the number of runs that are inserted with one transaction
+        """
+        self.filename = filename
+        self._batch_size = batch_size
+        self._pending_runs = []
+        self._lock = threading.Lock()
+        # The connection is used from several threads, but only while holding our lock.
+        import sqlite3
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def add_benchmark(self, result_xml):
+        """
+        Add a benchmark execution.
+        @param result_xml: the result element with the attributes of the benchmark
+        @return the id of the benchmark in the database
+        """
+        with self._lock, self._connection:
+            return self._connection.execute(
+                "INSERT INTO benchmark (name, date, tool, version, toolmodule, generator) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [result_xml.get(attr) for attr in
+                 ['benchmarkname', 'date', 'tool', 'version', 'toolmodule', 'generator']]
+                ).lastrowid
+
+    def add_run_set(self, benchmark_id, result_xml, result_file):
+        """
+        Add a run set of a benchmark execution.
+        @param benchmark_id: the id of the benchmark as returned by add_benchmark()
+        @param result_xml: the result element of the run set
+        @param result_file: the name of the result XML file of the run set,
+            which is used for resolving relative paths when reading the run set
+        @return the id of the run set in the database
+        """
+        result_file = os.path.relpath(result_file, os.path.dirname(os.path.abspath(self.filename)))
+        with self._lock, self._connection:
+            return self._connection.execute(
+                "INSERT INTO runset (benchmark_id, name, result_file, header, error) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (benchmark_id, result_xml.get('name'), result_file,
+                 _header_to_string(result_xml), result_xml.get('error'))
+                ).lastrowid
+
+    def add_run(self, run_set_id, run_xml):
+        """
+        Add the result of a finished run.
+        The run is stored in the database at the latest when flush() is called.
+        @param run_set_id: the id of the run set as returned by add_run_set()
+        @param run_xml: the run element with all result values
+        """
+        columns = run_xml.findall('column')
+        values = {column.get('title'): column.get('value') for column in columns}
+        run_row = ([run_set_id] + [run_xml.get(attr) for attr in _RUN_ATTRIBUTES]
+                   + [values.get('status'), values.get('category')])
+        value_rows = [(column.get('title'), column.get('value'), column.get('hidden') == 'true')
+                      for column in columns]
+        with self._lock:
+            self._pending_runs.append((run_row, value_rows))
+            if len(self._pending_runs) >= self._batch_size:
+                self._flush()
+
+    def finish_run_set(self, run_set_id, result_xml):
+        """
+        Store all pending runs and update the run set
+        with the values that are known only after all runs were executed.
+        @param run_set_id: the id of the run set as returned by add_run_set()
+        @param result_xml: the result element of the run set
+        """
+        with self._lock:
+            self._flush()
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE runset SET header = ?, error = ? WHERE id = ?",
+                    (_header_to_string(result_xml), result_xml.get('error'), run_set_id))
+
+    def flush(self):
+        """Store all pending runs in the database."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending_runs:
+            return
+        with self._connection:
+            for run_row, value_rows in self._pending_runs:
+                run_id = self._connection.execute(
+                    "INSERT INTO run (runset_id, name, files, options, properties, status, category) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    run_row).lastrowid
+                self._connection.executemany(
+                    "INSERT INTO value (run_id, title, value, hidden) VALUES (?, ?, ?, ?)",
+                    [(run_id,) + value_row for value_row in value_rows])
+        self._pending_runs = []
+
+    def close(self):
+        """Store all pending runs and close the database."""
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+
+def _header_to_string(result_xml):
+    header = ET.Element(result_xml.tag, result_xml.attrib)
+    header.extend(elem for elem in result_xml if elem.tag != 'run')
+    return ET.tostring(header, encoding='unicode')
+
+
+def is_database(filename):
+    """Check whether a file is an SQLite database."""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+    except EnvironmentError:
+        return False
+
+
+def _split_run_set_reference(name):
+    database, sep, run_set_id = name.rpartition(':')
+    if sep and run_set_id.isdigit() and is_database(database):
+        return database, int(run_set_id)
+    return None
+
+
+def is_run_set_reference(name):
+    """
+    Check whether a name references a run set in a result database,
+    as returned by get_run_set_references().
+    """
+    return _split_run_set_reference(name) is not None
+
+
+def get_run_set_references(database):
+    """
+    Get names for all run sets in a result database,
+    which can be passed to load_run_set().
+    The names have the form "<database>:<run-set id>".
+    """
+    import sqlite3
+    connection = sqlite3.connect(database)
+    try:
+        return ["{}:{}".format(database, row[0])
+                for row in connection.execute("SELECT id FROM runset ORDER BY id")]
+    finally:
+        connection.close()
+
+
+def load_run_set(reference):
+    """
+    Read a run set from a result database.
+    @param reference: a name as returned by get_run_set_references()
+    @return a tuple with the name of the result XML file of the run set
+        and the result element (as it would be in the result XML file)
+    """
+    database, run_set_id = _split_run_set_reference(reference)
+    import sqlite3
+    connection = sqlite3.connect(database)
+    try:
+        result_file, header = _get_run_set_row(connection, database, run_set_id, "result_file, header")
+        result_file = os.path.normpath(os.path.join(os.path.dirname(database), result_file))
+        result_xml = ET.fromstring(header)
+
+        # In result files, the runs are followed by the values of the run set.
+        run_set_values = result_xml.findall('column')
+        position = list(result_xml).index(run_set_values[0]) if run_set_values else len(result_xml)
+
+        runs = {}
+        for run_id, name, files, options, properties in connection.execute(
+                "SELECT id, name, files, options, properties FROM run WHERE runset_id = ? ORDER BY id",
+                (run_set_id,)):
+            run_xml = ET.Element('run', {'name': name})
+            for attr, value in zip(_RUN_ATTRIBUTES[1:], [files, options, properties]):
+                if value is not None:
+                    run_xml.set(attr, value)
+            result_xml.insert(position, run_xml)
+            position += 1
+            runs[run_id] = run_xml
+
+        for run_id, title, value, hidden in connection.execute(
+                "SELECT value.run_id, value.title, value.value, value.hidden "
+                "FROM value JOIN run ON value.run_id = run.id "
+                "WHERE run.runset_id = ? ORDER BY value.rowid",
+                (run_set_id,)):
+            column = ET.SubElement(runs[run_id], 'column', {'title': title, 'value': value})
+            if hidden:
+                column.set('hidden', 'true')
+    finally:
+        connection.close()
+
+    return result_file, result_xml
+
+
+def load_run_set_file_name(reference):
+    """
+    Get the name of the result XML file of a run set in a result database.
+    @param reference: a name as returned by get_run_set_references()
+    """
+    database, run_set_id = _split_run_set_reference(reference)
+    import sqlite3
+    connection = sqlite3.connect(database)
+    try:
+        result_file, = _get_run_set_row(connection, database, run_set_id, "result_file")
+    finally:
+        connection.close()
+    return os.path.normpath(os.path.join(os.path.dirname(database), result_file))
+
+
+def _get_run_set_row(connection, database, run_set_id, columns):
+    row = connection.execute(
+        "SELECT " + columns + " FROM runset WHERE id = ?", (run_set_id,)).fetchone()
+    if row is None:
+        raise ValueError("Run set {} does not exist in result database {}.".format(run_set_id, database))
+    return row
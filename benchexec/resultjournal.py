@@ -0,0 +1,150 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Append-only journal of the results of a run set.
+
+While a run set is executed, the result of each finished run is appended
+to the journal file, such that the results are not lost if benchexec crashes
+without the costs of rewriting the whole result XML file regularly.
+The journal consists of the XML declaration, the start tag of the result element
+(marked as incomplete), the header elements of the result (columns, systeminfo, etc.),
+and one run element per finished run.
+Because the result element is never closed, the journal is not valid XML,
+but it can be read with read_journal() even if the last entry is truncated.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+from xml.etree import ElementTree as ET
+
+JOURNAL_FILE_SUFFIX = ".journal"
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+class ResultJournal(object):
+    """
+    Writer for the journal of a run set.
+    This class is not thread-safe, callers need to synchronize calls to append().
+    """
+
+    def __init__(self, filename, result_xml):
+        """
+        Create a new journal file and write the header of the result into it.
+        @param filename: the name of the journal file
+        @param result_xml: the result element of the run set, run elements are ignored
+        """
+        self.filename = filename
+        self._file = open(filename, 'wb')
+
+        start_tag = ET.Element(result_xml.tag, result_xml.attrib)
+        start_tag.set('error', 'incomplete')
+        # serialization of an empty element is "<tag ... />", we need "<tag ...>"
+        start_tag = ET.tostring(start_tag, encoding='unicode')
+        start_tag = start_tag[:-2].rstrip() + '>'
+
+        header = ['<?xml version="1.0" encoding="utf-8"?>\n', start_tag, '\n']
+        for elem in result_xml:
+            if elem.tag != 'run':
+                header.append(ET.tostring(elem, encoding='unicode').strip())
+                header.append('\n')
+        self._write(''.join(header))
+
+    def append(self, run_xml):
+        """
+        Append the result of a finished run to the journal
+        and ensure that it is stored on disk.
+        @param run_xml: the run element with all result values
+        """
+        if self._file.closed:
+            return # run finished after the end of the run set, e.g., after an interrupt
+        self._write(ET.tostring(run_xml, encoding='unicode').strip() + '\n')
+
+    def _write(self, content):
+        self._file.write(content.encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def remove(self):
+        """Close and delete the journal file."""
+        self.close()
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
+
+
+def read_journal(file):
+    """
+    Read the results from a journal file.
+    Run elements that are incomplete because the journal is truncated are ignored.
+    @param file: a binary file object with the content of a journal
+    @return the result element with all runs of the journal
+    """
+    builder = _JournalTreeBuilder()
+    # The parser passes each element to the builder as soon as it was parsed,
+    # and it is never closed because the result element is not closed in the journal.
+    parser = ET.XMLParser(target=builder)
+    try:
+        for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), b''):
+            parser.feed(chunk)
+    except ET.ParseError:
+        # Garbage at the end of the file, e.g., from a crash while writing.
+        # Everything that was read completely up to here is still usable.
+        pass
+
+    root = builder.root
+    if root is None:
+        raise ET.ParseError('journal does not contain a result element')
+    for elem in list(root):
+        if id(elem) not in builder.complete_elements:
+            root.remove(elem)
+    return root
+
+
+class _JournalTreeBuilder(ET.TreeBuilder):
+    """
+    Builder for the tree of a journal, which keeps track of the root element
+    and of the children of the root element that were read completely.
+    """
+
+    def __init__(self):
+        super(_JournalTreeBuilder, self).__init__()
+        self.root = None
+        self.complete_elements = set()
+        self._depth = 0
+
+    def start(self, tag, attrs):
+        elem = super(_JournalTreeBuilder, self).start(tag, attrs)
+        if self.root is None:
+            self.root = elem
+        self._depth += 1
+        return elem
+
+    def end(self, tag):
+        elem = super(_JournalTreeBuilder, self).end(tag)
+        self._depth -= 1
+        if self._depth == 1:
+            self.complete_elements.add(id(elem))
+        return elem
@@ -0,0 +1,137 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Support for post-run hooks, i.e., functions that analyze the results of each run
+after it was executed, for example to extract additional statistics from its log file.
+
+A post-run hook is a function that accepts two arguments:
+the run (with its result values already set) and the name of its log file.
+Hooks are executed in background threads such that the next run can start immediately.
+They can be given as "package.module:function" or as the name of an entry point
+in the group "benchexec.post_run_hooks".
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from concurrent import futures
+import importlib
+import logging
+import sys
+import threading
+
+ENTRY_POINT_GROUP = "benchexec.post_run_hooks"
+
+
+def load_hook(name):
+    """
+    Load a post-run hook.
+    @param name: either "package.module:function" or the name of an entry point
+    @return: the hook function
+    """
+    module_name, sep, function_name = name.partition(':')
+    try:
+        if sep:
+            return getattr(importlib.import_module(module_name), function_name)
+
+        try:
+            import pkg_resources
+        except ImportError:
+            sys.exit('Post-run hook "{0}" needs to be given as "module:function" '
+                     'because setuptools is not installed.'.format(name))
+        for entry_point in pkg_resources.iter_entry_points(ENTRY_POINT_GROUP, name):
+            return entry_point.load()
+        sys.exit('Unknown post-run hook "{0}", '
+                 'give it as "module:function" or install a package that provides it.'.format(name))
+    except (ImportError, AttributeError) as e:
+        sys.exit('Could not load post-run hook "{0}": {1}'.format(name, e))
+
+
+class PostRunHookRunner(object):
+    """
+    Executes post-run hooks in a pool of threads.
+    For each run, all hooks are called in the given order.
+    Exceptions of hooks are logged and do not affect other hooks or runs.
+    The number of runs that wait for their hooks is bounded,
+    such that submit() blocks if the hooks cannot keep up with the runs.
+    """
+
+    def __init__(self, hooks, max_workers=1, max_pending=None):
+        """
+        @param hooks: a list of hook functions
+        @param max_workers: the number of threads for executing hooks
+        @param max_pending: the maximal number of runs whose hooks are not yet finished
+        """
+        self.hooks = list(hooks)
+        self.failures = 0
+        self._executor = futures.ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max(1, max_workers))
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def submit(self, run, callback=None):
+        """
+        Schedule the execution of all hooks for a run.
+        @param run: the finished run
+        @param callback: an optional function that is called with the run
+            after all hooks for this run were executed
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._execute_hooks, run, callback)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def _execute_hooks(self, run, callback):
+        for hook in self.hooks:
+            try:
+                hook(run, run.log_file)
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                logging.warning('Post-run hook %s failed for run %s.',
+                                getattr(hook, '__name__', hook), run.identifier, exc_info=True)
+        if callback:
+            try:
+                callback(run)
+            except Exception:
+                logging.exception('Error after post-run hooks for run %s.', run.identifier)
+
+    def wait(self):
+        """
+        Wait until the hooks for all submitted runs were executed.
+        @return: the number of failed hook executions so far
+        """
+        with self._lock:
+            pending = list(self._pending)
+        futures.wait(pending)
+        return self.failures
+
+    def shutdown(self):
+        """Wait for all hooks and release the threads."""
+        self._executor.shutdown(wait=True)
@@ -25,27 +25,34 @@ import collections
 import copy
 from decimal import Decimal, InvalidOperation
 import gzip
+import html
 import io
 import itertools
+import json
+import locale
 import logging
 import os.path
 import signal
-import subprocess
 import sys
+import tempfile
 import time
 import math
+import operator
 import urllib.parse
-import urllib.request
 from xml.etree import ElementTree
 
-import tempita
 from functools import reduce
 
 from benchexec import __version__
 import benchexec.result as result
+from benchexec import resultdb
+from benchexec import resultjournal
+from benchexec.tablegenerator import logarchive
+from benchexec.tablegenerator import remote
+from benchexec.tablegenerator import resultcache
+from benchexec.tablegenerator import templates
 from benchexec.tablegenerator import util as Util
 from benchexec.tablegenerator.columns import Column, ColumnType, get_column_type
-import zipfile
 
 # Process pool for parallel work.
 # Some of our loops are CPU-bound (e.g., statistics calculations), thus we use
@@ -60,12 +67,38 @@ NAME_START = "results" # first part of filename of table
 
 DEFAULT_OUTPUT_PATH = "results/"
 
+# Seconds between checks for changes of result files with --watch
+DEFAULT_WATCH_INTERVAL = 10
+
+# Port of the HTTP server for --serve
+DEFAULT_SERVER_PORT = 8000
+
+# Minimal relative difference (in percent) that is a significant slowdown with --baseline
+DEFAULT_REGRESSION_THRESHOLD = 5
+
+# Directory (inside the cache directory) for downloaded remote files
+REMOTE_CACHE_DIR_NAME = "remote"
+
+# Directory (inside the cache directory) for compiled templates
+TEMPLATE_CACHE_DIR_NAME = "templates"
+
+# Directory (inside the cache directory) for the indices of log archives
+LOG_INDEX_CACHE_DIR_NAME = "logindex"
+
+# Local result files that are smaller than this (in total) are processed without worker processes
+PARALLEL_MIN_INPUT_SIZE = 1000 * 1000 # bytes
+
+# Number of runs whose log files are processed together in one task of the process pool
+LOG_VALUES_CHUNK_SIZE = 500
+
 LIB_URL = "https://cdn.jsdelivr.net"
 LIB_URL_OFFLINE = "lib/javascript"
 
 TEMPLATE_FILE_NAME = os.path.join(os.path.dirname(__file__), 'template.{format}')
 TEMPLATE_FORMATS = ['html', 'csv']
-TEMPLATE_ENCODING = 'UTF-8'
+LAZY_HTML_TEMPLATE_FORMAT = 'lazy.html'
+LAZY_HTML_CHUNK_SIZE = 1000 # rows per data file of HTML tables with --lazy-html
+LAZY_HTML_CHUNK_FILE_NAME = 'rows-{:05d}.js'
 TEMPLATE_NAMESPACE={
    'flatten': Util.flatten,
    'json': Util.to_json,
@@ -122,6 +155,11 @@ def load_results_from_table_definition(table_definition, table_definition_file,
     default_columns = extract_columns_from_table_definition_file(table_definition, table_definition_file)
     columns_relevant_for_diff = _get_columns_relevant_for_diff(default_columns)
 
+    remote.prefetch(
+        resultsFile
+        for tag in table_definition.iter('result')
+        for resultsFile in get_file_list_from_result_tag(tag, table_definition_file))
+
     results = []
     for tag in table_definition:
         if tag.tag == 'result':
@@ -129,7 +167,8 @@ def load_results_from_table_definition(table_definition, table_definition_file,
             run_set_id = tag.get('id')
             for resultsFile in get_file_list_from_result_tag(tag, table_definition_file):
                 results.append(parallel.submit(
-                    load_result, resultsFile, options, run_set_id, columns, columns_relevant_for_diff))
+                    load_result, resultsFile, options, run_set_id, columns, columns_relevant_for_diff,
+                    True))
 
         elif tag.tag == 'union':
             results.append(parallel.submit(
@@ -178,7 +217,8 @@ def load_results_with_table_definition(result_files, table_definition, table_def
         result_files,
         options=options,
         columns=columns,
-        columns_relevant_for_diff=columns_relevant_for_diff)
+        columns_relevant_for_diff=columns_relevant_for_diff,
+        defer_log_values=True)
 
 
 def extract_columns_from_table_definition_file(xmltag, table_definition_file):
@@ -248,11 +288,16 @@ def load_tool(result):
     """
     Load the module with the tool-specific code.
     """
+    tool_module = result.attributes['toolmodule'][0] if 'toolmodule' in result.attributes else None
+    return _load_tool(tool_module, result.attributes.get('name', []))
+
+
+def _load_tool(tool_module, run_set_names):
     def load_tool_module(tool_module):
         if not tool_module:
             logging.warning('Cannot extract values from log files for benchmark results %s '
                             '(missing attribute "toolmodule" on tag "result").',
-                            Util.prettylist(result.attributes['name']))
+                            Util.prettylist(run_set_names))
             return None
         try:
             logging.debug('Loading %s', tool_module)
@@ -268,7 +313,6 @@ def load_tool(result):
                 tool_module)
         return None
 
-    tool_module = result.attributes['toolmodule'][0] if 'toolmodule' in result.attributes else None
     if tool_module in loaded_tools:
         return loaded_tools[tool_module]
     else:
@@ -290,6 +334,53 @@ class RunSetResult(object):
         self.columns = copy.deepcopy(columns)  # Copy the columns since they may be modified
         self.summary = summary
         self.columns_relevant_for_diff = columns_relevant_for_diff
+        # If True, the values of columns from log files are extracted later
+        # by collect_values_from_logs().
+        self.log_values_pending = False
+        self._cache_key = None
+
+    def __getstate__(self):
+        # Pickling thousands of RunResult objects is slow and needs much space
+        # (e.g., when sending results from worker processes or storing them in the cache),
+        # so their attributes are stored column-wise if possible.
+        # The pickled results are still sent through the pipe of the process pool:
+        # shared memory or memory-mapped files would not help because most of the time
+        # is spent on creating the objects, not on copying the pickled data.
+        state = self.__dict__.copy()
+        results = state.get('results')
+        if results and self._can_encode_results(results):
+            del state['results']
+            state['_encoded_results'] = [
+                [getattr(run, attr) for run in results] for attr in RunResult.ENCODED_ATTRIBUTES]
+        return state
+
+    def __setstate__(self, state):
+        encoded_results = state.pop('_encoded_results', None)
+        self.__dict__.update(state)
+        if encoded_results is not None:
+            shared_attributes = {
+                'columns': self.columns,
+                'columns_relevant_for_diff': self.columns_relevant_for_diff,
+                '_values': None,
+                '_values_by_column': self.values_by_column,
+                }
+            self.results = []
+            for attributes in zip(*encoded_results):
+                run = RunResult.__new__(RunResult)
+                run_state = shared_attributes.copy()
+                run_state.update(zip(RunResult.ENCODED_ATTRIBUTES, attributes))
+                run.__dict__ = run_state
+                self.results.append(run)
+
+    def _can_encode_results(self, results):
+        """Check whether all runs store their values in the column-wise storage of this run set
+        and share the other attributes that are not part of the encoding."""
+        values_by_column = getattr(self, 'values_by_column', None)
+        return values_by_column is not None and all(
+            run._values_by_column is values_by_column
+            and run.columns is self.columns
+            and run.columns_relevant_for_diff is self.columns_relevant_for_diff
+            for run in results)
 
     def get_tasks(self):
         """
@@ -315,32 +406,41 @@ class RunSetResult(object):
         This may take some time if many log files have to be opened and parsed.
         """
         self.results = []
-
-        def get_value_from_logfile(lines, identifier):
-            """
-            This method searches for values in lines of the content.
-            It uses a tool-specific method to so.
-            """
-            return load_tool(self).get_value_from_output(lines, identifier)
+        self.values_by_column = ValuesByColumn(len(self.columns))
 
         # Opening the ZIP archive with the logs for every run is too slow, we cache it.
         log_zip_cache = {}
         try:
             for xml_result, result_file in self._xml_results:
-                self.results.append(RunResult.create_from_xml(
-                    xml_result, get_value_from_logfile, self.columns,
-                    correct_only, log_zip_cache, self.columns_relevant_for_diff, result_file))
+                self.results.append(self._create_run_result(
+                    xml_result, result_file, correct_only, log_zip_cache))
         finally:
             for file in log_zip_cache.values():
                 file.close()
 
-        for column in self.columns:
-            column_values = (run_result.values[run_result.columns.index(column)] for run_result in self.results)
-            column.type, column.unit, column.source_unit, column.scale_factor = get_column_type(column, column_values)
-
-
+        if not self.log_values_pending:
+            self._determine_column_types()
         del self._xml_results
 
+    def _get_value_from_logfile(self, lines, identifier):
+        """
+        This method searches for values in lines of the content.
+        It uses a tool-specific method to so.
+        """
+        return load_tool(self).get_value_from_output(lines, identifier)
+
+    def _create_run_result(self, xml_result, result_file, correct_only, log_zip_cache):
+        run_result = RunResult.create_from_xml(
+            xml_result, None if self.log_values_pending else self._get_value_from_logfile,
+            self.columns,
+            correct_only, log_zip_cache, self.columns_relevant_for_diff, result_file)
+        run_result.store_values_in(self.values_by_column)
+        return run_result
+
+    def _determine_column_types(self):
+        for column, column_values in zip(self.columns, self.values_by_column.raw):
+            column.type, column.unit, column.source_unit, column.scale_factor = get_column_type(column, column_values)
+
     @staticmethod
     def create_from_xml(resultFile, resultElem, columns=None,
                         all_columns=False, columns_relevant_for_diff=set()):
@@ -369,14 +469,10 @@ class RunSetResult(object):
             logging.warning("Result file '%s' is empty.", resultFile)
             return []
         else: # show all available columns
-            column_names = set(
-                c.get('title') for s in run_results for c in s.findall('column')
-                    if all_columns or c.get('hidden') != 'true')
-
-            # Put main columns first, then rest sorted alphabetically
-            columns = ([column for column in MAIN_COLUMNS if column in column_names] +
-                       sorted(column_names.difference(MAIN_COLUMNS)))
-            return [Column(title, None, None, None) for title in columns]
+            column_names = set()
+            for run_result in run_results:
+                column_names.update(_get_column_titles_of_run(run_result, all_columns))
+            return _create_columns_from_titles(column_names)
 
     @staticmethod
     def _extract_attributes_from_result(resultFile, resultTag):
@@ -424,19 +520,33 @@ def _get_run_tags_from_xml(result_elem):
     return result_elem.findall('run') + result_elem.findall('sourcefile')
 
 
+def _get_column_titles_of_run(run_elem, all_columns):
+    return (c.get('title') for c in run_elem.findall('column')
+            if all_columns or c.get('hidden') != 'true')
+
+
+def _create_columns_from_titles(column_names):
+    # Put main columns first, then rest sorted alphabetically
+    columns = ([column for column in MAIN_COLUMNS if column in column_names] +
+               sorted(column_names.difference(MAIN_COLUMNS)))
+    return [Column(title, None, None, None) for title in columns]
+
+
 def load_results(result_files, options, run_set_id=None, columns=None,
-                 columns_relevant_for_diff=set()):
+                 columns_relevant_for_diff=set(), defer_log_values=False):
     """Version of load_result for multiple input files that will be loaded concurrently."""
+    remote.prefetch(result_files)
     return parallel.map(
         load_result,
         result_files,
         itertools.repeat(options),
         itertools.repeat(run_set_id),
         itertools.repeat(columns),
-        itertools.repeat(columns_relevant_for_diff))
+        itertools.repeat(columns_relevant_for_diff),
+        itertools.repeat(defer_log_values))
 
 def load_result(result_file, options, run_set_id=None, columns=None,
-                columns_relevant_for_diff=set()):
+                columns_relevant_for_diff=set(), defer_log_values=False):
     """
     Completely handle loading a single result file.
     @param result_file the file to parse
@@ -445,63 +555,308 @@ def load_result(result_file, options, run_set_id=None, columns=None,
     @param columns the list of columns
     @param columns_relevant_for_diff a set of columns that is relevant for
                                      the diff table
+    @param defer_log_values whether values from log files should not be extracted yet,
+                            such that this can be done in parallel with collect_values_from_logs()
     @return a fully ready RunSetResult instance or None
+    @raise ResultFileError if the result file cannot be read or is invalid
     """
+    if not options.cache_dir:
+        return _load_result(
+            result_file, options, run_set_id, columns, columns_relevant_for_diff, defer_log_values)
+
+    cache = resultcache.ResultCache(options.cache_dir)
+    cache_key = cache.get_key(result_file, (
+        run_set_id, columns, columns_relevant_for_diff,
+        options.all_columns, options.correct_only, options.ignore_errors))
+    if cache_key:
+        result = cache.load(cache_key)
+        if result is not None:
+            logging.info('    %s (cached)', result_file)
+            return result
+
+    result = _load_result(
+        result_file, options, run_set_id, columns, columns_relevant_for_diff, defer_log_values)
+    if cache_key and result is not None:
+        if result.log_values_pending:
+            result._cache_key = cache_key # stored by store_results_in_cache() later
+        else:
+            cache.store(cache_key, result)
+    return result
+
+
+def _load_result(result_file, options, run_set_id, columns, columns_relevant_for_diff,
+                 defer_log_values=False):
+    if not (resultdb.is_run_set_reference(result_file)
+            or result_file.endswith(resultjournal.JOURNAL_FILE_SUFFIX)):
+        return _load_result_incrementally(
+            result_file, options, run_set_id, columns, columns_relevant_for_diff,
+            defer_log_values)
+
     xml = parse_results_file(result_file, run_set_id=run_set_id, ignore_errors=options.ignore_errors)
     if xml is None:
         return None
 
+    if resultdb.is_run_set_reference(result_file):
+        result_file = resultdb.load_run_set_file_name(result_file)
     result = RunSetResult.create_from_xml(
         result_file, xml, columns=columns, all_columns=options.all_columns,
         columns_relevant_for_diff=columns_relevant_for_diff)
+    result.log_values_pending = defer_log_values and bool(_get_log_column_indices(result.columns))
     result.collect_data(options.correct_only)
     return result
 
 
-def parse_results_file(resultFile, run_set_id=None, ignore_errors=False):
-    '''
-    This function parses an XML file that contains the results of the execution of a run set.
-    It returns the "result" XML tag.
-    @param resultFile: The file name of the XML file that contains the results.
-    @param run_set_id: An optional identifier of this set of results.
-    '''
-    logging.info('    %s', resultFile)
-    url = Util.make_url(resultFile)
+def _load_result_incrementally(result_file, options, run_set_id, columns,
+                               columns_relevant_for_diff, defer_log_values=False):
+    """
+    Version of load_result that does not keep the XML tree of the result file in memory.
+    The file is parsed incrementally, and each run is converted into a RunResult
+    as soon as its XML element is complete, afterwards the element is discarded.
+    If the columns are not given and need to be taken from the result file,
+    the runs are only reduced to the XML columns that will be shown
+    and converted after the whole file was read.
+    """
+    logging.info('    %s', result_file)
+    # runs are returned in the same order as by _get_run_tags_from_xml
+    run_results = collections.OrderedDict([('run', []), ('sourcefile', [])])
+    reduced_runs = collections.OrderedDict([('run', []), ('sourcefile', [])])
+    column_names = set()
+    log_zip_cache = {}
+    try:
+        with Util.open_path_or_url(result_file) as f:
+            depth = 0
+            for event, elem in ElementTree.iterparse(
+                    _open_uncompressed(f), events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 1:
+                        # attributes of start tags are complete, but not yet their children,
+                        # so the system info is added to the attributes only at the end
+                        result_elem = elem
+                        if not _check_result_elem(result_file, result_elem, options.ignore_errors):
+                            return None
+                        log_folder = _get_log_folder(result_file, result_elem)
+                        attributes = collections.defaultdict(list, (
+                            (attrib, [value]) for attrib, value in result_elem.attrib.items()))
+                        result = RunSetResult(
+                            [], attributes, columns or [],
+                            columns_relevant_for_diff=columns_relevant_for_diff)
+                        result.values_by_column = ValuesByColumn(len(result.columns))
+                        result.log_values_pending = \
+                            defer_log_values and bool(_get_log_column_indices(result.columns))
+                    continue
+
+                depth -= 1
+                if depth != 1 or elem.tag not in run_results:
+                    continue
+                result_elem.remove(elem)
+                if run_set_id is not None:
+                    elem.set('runset', run_set_id)
+                _insert_logfile_name(result_file, log_folder, elem)
+
+                if columns:
+                    run_results[elem.tag].append(result._create_run_result(
+                        elem, result_file, options.correct_only, log_zip_cache))
+                else:
+                    column_names.update(_get_column_titles_of_run(elem, options.all_columns))
+                    reduced_runs[elem.tag].append(_reduce_run_elem(elem, options.all_columns))
+
+        if not columns:
+            if not any(reduced_runs.values()):
+                logging.warning("Result file '%s' is empty.", result_file)
+            else:
+                result.columns = _create_columns_from_titles(column_names)
+                result.values_by_column = ValuesByColumn(len(result.columns))
+            for tag, runs in reduced_runs.items():
+                run_results[tag] = [
+                    result._create_run_result(elem, result_file, options.correct_only, log_zip_cache)
+                    for elem in runs]
+                del runs[:]
+    except IOError as e:
+        raise Util.ResultFileError('Could not read result file {}: {}'.format(result_file, e))
+    except ElementTree.ParseError as e:
+        raise Util.ResultFileError('Result file {} is invalid: {}'.format(result_file, e))
+    finally:
+        for file in log_zip_cache.values():
+            file.close()
+
+    # the header elements (system info, summary columns) are still present
+    result.attributes = RunSetResult._extract_attributes_from_result(result_file, result_elem)
+    result.summary = RunSetResult._extract_summary_from_result(result_elem, result.columns)
+    result.results = list(itertools.chain.from_iterable(run_results.values()))
+    if not result.log_values_pending:
+        result._determine_column_types()
+    del result._xml_results
+    return result
 
+
+def _get_log_column_indices(columns):
+    """Return the indices of those columns whose values are extracted from log files."""
+    return [i for i, column in enumerate(columns)
+            if column.title.lower() not in ['score', 'status'] and column.pattern and not column.href]
+
+
+def collect_values_from_logs(runSetResults, correct_only):
+    """
+    Extract the values of columns from log files for all results where this was deferred.
+    The runs are split into chunks that are processed concurrently
+    (this also parallelizes the work for a single large result file,
+    and a single chunk is processed directly).
+    """
+    pending_results = [r for r in runSetResults if r.log_values_pending]
+    _prefetch_log_archives(pending_results)
+    chunks = []
+    chunk_args = []
+    for run_set_result in pending_results:
+        column_indices = _get_log_column_indices(run_set_result.columns)
+        patterns = [run_set_result.columns[i].pattern for i in column_indices]
+        tool_module = run_set_result.attributes['toolmodule'][0] \
+            if 'toolmodule' in run_set_result.attributes else None
+        run_set_names = run_set_result.attributes.get('name', [])
+        for start in range(0, len(run_set_result.results), LOG_VALUES_CHUNK_SIZE):
+            runs = run_set_result.results[start:start + LOG_VALUES_CHUNK_SIZE]
+            log_files = [
+                (run.log_file or '') if not correct_only or run.category == result.CATEGORY_CORRECT
+                else None
+                for run in runs]
+            chunks.append((runs, column_indices))
+            chunk_args.append((tool_module, run_set_names, patterns, log_files))
+
+    chunk_values = parallel.map(_get_values_from_logfiles, *zip(*chunk_args)) if chunk_args else []
+    for (runs, column_indices), values_of_runs in zip(chunks, chunk_values):
+        for run, values in zip(runs, values_of_runs):
+            for index, value in zip(column_indices, values):
+                run.set_value(index, value)
+
+    for run_set_result in pending_results:
+        run_set_result.log_values_pending = False
+        run_set_result._determine_column_types()
+
+
+def _prefetch_log_archives(runSetResults):
+    """
+    Download the archives with the log files of remote results concurrently,
+    before the log files are read by several processes.
+    """
+    log_files_by_dir = {}
+    for run_set_result in runSetResults:
+        if any(Util.is_url(f) for f in run_set_result.attributes.get('filename', [])):
+            for run in run_set_result.results:
+                if run.log_file:
+                    log_files_by_dir.setdefault(os.path.dirname(run.log_file), run.log_file)
+    remote.prefetch(_get_log_zip_url(log_file)[1] for log_file in log_files_by_dir.values())
+
+
+def _get_values_from_logfiles(tool_module, run_set_names, patterns, log_files):
+    """
+    Extract the values for the given patterns from each of the given log files.
+    @param log_files: a list of log-file names, or None for runs without values
+    @return: a list with a list of values for each log file
+    """
+    tool = _load_tool(tool_module, run_set_names)
+    # Opening the ZIP archive with the logs for every run is too slow, we cache it.
+    log_zip_cache = {}
+    try:
+        values = []
+        for log_file in log_files:
+            if log_file is None:
+                values.append([None] * len(patterns))
+            else:
+                lines = _read_logfile_lines(log_file, log_zip_cache)
+                values.append([tool.get_value_from_output(lines, pattern) for pattern in patterns])
+        return values
+    finally:
+        for file in log_zip_cache.values():
+            file.close()
+
+
+def store_results_in_cache(runSetResults, options):
+    """
+    Store those results in the cache that could not be stored when loading them
+    because their values from log files were not yet extracted.
+    """
+    cache = resultcache.ResultCache(options.cache_dir)
+    for run_set_result in runSetResults:
+        cache_key = run_set_result._cache_key
+        if cache_key:
+            run_set_result._cache_key = None
+            cache.store(cache_key, run_set_result)
+
+
+def _reduce_run_elem(run_elem, all_columns):
+    """
+    Create a copy of a run tag that contains only the columns
+    that are shown or needed for computing the score.
+    """
+    reduced = ElementTree.Element(run_elem.tag, run_elem.attrib)
+    reduced.extend(
+        c for c in run_elem.findall('column')
+        if all_columns or c.get('hidden') != 'true' or c.get('title') in ['status', 'category'])
+    return reduced
+
+
+def _open_uncompressed(f):
+    """
+    Return a file-like object with the uncompressed content
+    of a (possibly gzip- or bz2-compressed) result file.
+    """
+    magic = f.read(3)
+    f.seek(0)
+    if magic.startswith(b'\x1f\x8b'):
+        return gzip.GzipFile(fileobj=f)
+    elif magic == b'BZh':
+        return bz2.BZ2File(f)
+    return f
+
+
+def _read_results_file(resultFile):
     parse = ElementTree.ElementTree().parse
     try:
-        with Util.open_url_seekable(url, mode='rb') as f:
-            try:
+        with Util.open_path_or_url(resultFile) as f:
+            if resultFile.endswith(resultjournal.JOURNAL_FILE_SUFFIX):
+                # journal of a run set that is still running or was aborted
+                resultElem = resultjournal.read_journal(f)
+            else:
                 try:
-                    resultElem = parse(gzip.GzipFile(fileobj=f))
+                    try:
+                        resultElem = parse(gzip.GzipFile(fileobj=f))
+                    except IOError:
+                        f.seek(0)
+                        try:
+                            resultElem = parse(bz2.BZ2File(f))
+                        except TypeError:
+                            # Python 3.2 does not support giving a file-like object to BZ2File
+                            resultElem = parse(io.BytesIO(bz2.decompress(f.read())))
                 except IOError:
                     f.seek(0)
-                    try:
-                        resultElem = parse(bz2.BZ2File(f))
-                    except TypeError:
-                        # Python 3.2 does not support giving a file-like object to BZ2File
-                        resultElem = parse(io.BytesIO(bz2.decompress(f.read())))
-            except IOError:
-                f.seek(0)
-                resultElem = parse(f)
+                    resultElem = parse(f)
     except IOError as e:
-        logging.error('Could not read result file %s: %s', resultFile, e)
-        exit(1)
+        raise Util.ResultFileError('Could not read result file {}: {}'.format(resultFile, e))
     except ElementTree.ParseError as e:
-        logging.error('Result file %s is invalid: %s', resultFile, e)
-        exit(1)
+        raise Util.ResultFileError('Result file {} is invalid: {}'.format(resultFile, e))
 
-    if resultElem.tag not in ['result', 'test']:
-        logging.error("XML file with benchmark results seems to be invalid.\n"
-                      "The root element of the file is not named 'result' or 'test'.\n"
-                      "If you want to run a table-definition file,\n"
-                      "you should use the option '-x' or '--xml'.")
-        exit(1)
+    return resultElem
 
-    if ignore_errors and 'error' in resultElem.attrib:
-        logging.warning('Ignoring file "%s" because of error: %s',
-                        resultFile,
-                        resultElem.attrib['error'])
+
+def parse_results_file(resultFile, run_set_id=None, ignore_errors=False):
+    '''
+    This function parses an XML file that contains the results of the execution of a run set.
+    It returns the "result" XML tag.
+    @param resultFile: The file name of the XML file that contains the results,
+        or a reference to a run set in a result database.
+    @param run_set_id: An optional identifier of this set of results.
+    '''
+    logging.info('    %s', resultFile)
+    if resultdb.is_run_set_reference(resultFile):
+        # use name of original result file for resolving relative paths
+        try:
+            resultFile, resultElem = resultdb.load_run_set(resultFile)
+        except ValueError as e:
+            raise Util.ResultFileError(str(e))
+    else:
+        resultElem = _read_results_file(resultFile)
+
+    if not _check_result_elem(resultFile, resultElem, ignore_errors):
         return None
 
     if run_set_id is not None:
@@ -512,7 +867,34 @@ def parse_results_file(resultFile, run_set_id=None, ignore_errors=False):
     return resultElem
 
 
+def _check_result_elem(resultFile, resultElem, ignore_errors):
+    """
+    Check the root element of a result file.
+    @return: False if the file should be ignored because of errors
+    @raise ResultFileError: if the file is invalid
+    """
+    if resultElem.tag not in ['result', 'test']:
+        raise Util.ResultFileError(
+            "XML file {} with benchmark results seems to be invalid.\n"
+            "The root element of the file is not named 'result' or 'test'.\n"
+            "If you want to run a table-definition file,\n"
+            "you should use the option '-x' or '--xml'.".format(resultFile))
+
+    if ignore_errors and 'error' in resultElem.attrib:
+        logging.warning('Ignoring file "%s" because of error: %s',
+                        resultFile,
+                        resultElem.attrib['error'])
+        return False
+    return True
+
+
 def insert_logfile_names(resultFile, resultElem):
+    log_folder = _get_log_folder(resultFile, resultElem)
+    for sourcefile in _get_run_tags_from_xml(resultElem):
+        _insert_logfile_name(resultFile, log_folder, sourcefile)
+
+
+def _get_log_folder(resultFile, resultElem):
     # get folder of logfiles (truncate end of XML file name and append .logfiles instead)
     log_folder = resultFile[0:resultFile.rfind('.results.')] + '.logfiles/'
 
@@ -528,14 +910,16 @@ def insert_logfile_names(resultFile, resultElem):
             assert runSetName.endswith("." + blockname)
             runSetName = runSetName[:-(1 + len(blockname))] # remove last chars
             log_folder += runSetName + "."
+    return log_folder
 
-    # for each file: append original filename and insert log_file_name into sourcefileElement
-    for sourcefile in _get_run_tags_from_xml(resultElem):
-        if 'logfile' in sourcefile.attrib:
-            log_file = urllib.parse.urljoin(resultFile, sourcefile.get('logfile'))
-        else:
-            log_file = log_folder + os.path.basename(sourcefile.get('name')) + ".log"
-        sourcefile.set('logfile', log_file)
+
+def _insert_logfile_name(resultFile, log_folder, sourcefile):
+    # append original filename and insert log_file_name into sourcefileElement
+    if 'logfile' in sourcefile.attrib:
+        log_file = urllib.parse.urljoin(resultFile, sourcefile.get('logfile'))
+    else:
+        log_file = log_folder + os.path.basename(sourcefile.get('name')) + ".log"
+    sourcefile.set('logfile', log_file)
 
 
 def merge_tasks(runset_results):
@@ -545,24 +929,40 @@ def merge_tasks(runset_results):
     and add dummy elements to the results.
     It also ensures the same order of tasks.
     """
-    task_list = []
-    task_set = set()
-    for runset in runset_results:
-        index = -1
+    task_list = _merge_task_lists_preserving_order(
+        runset.get_tasks() for runset in runset_results)
+    merge_task_lists(runset_results, task_list)
+
+
+def _merge_task_lists_preserving_order(task_lists):
+    """
+    Compute the union of several lists of tasks, keeping the order of each list.
+    Tasks that are missing in the merged list are inserted directly after
+    the preceding task of the current list (or at the front).
+    The merged list is kept as a linked list (a dict from each task to its successor),
+    such that each insertion is cheap and merging takes linear time.
+    """
+    head = object() # sentinel in front of first task
+    next_task = {head: None}
+    for tasks in task_lists:
+        previous = head
         currentresult_taskset = set()
-        for task in runset.get_tasks():
+        for task in tasks:
             if task in currentresult_taskset:
                 logging.warning("Task '%s' is present twice, skipping it.", task[0])
             else:
                 currentresult_taskset.add(task)
-                if task not in task_set:
-                    task_list.insert(index+1, task)
-                    task_set.add(task)
-                    index += 1
-                else:
-                    index = task_list.index(task)
+                if task not in next_task:
+                    next_task[task] = next_task[previous]
+                    next_task[previous] = task
+                previous = task
 
-    merge_task_lists(runset_results, task_list)
+    task_list = []
+    task = next_task[head]
+    while task is not None:
+        task_list.append(task)
+        task = next_task[task]
+    return task_list
 
 
 def merge_task_lists(runset_results, tasks):
@@ -601,10 +1001,122 @@ def find_common_tasks(runset_results):
         merge_task_lists(runset_results, task_list)
 
 
+def _get_log_zip_url(log_file):
+    """
+    Get the URLs of a log file and of the ZIP archive that may contain it instead.
+    @return: a tuple of the URL of the log file, the URL of the archive, and the path in the archive
+    """
+    log_file_url = Util.make_url(log_file)
+    url_parts = urllib.parse.urlparse(log_file_url, allow_fragments=False)
+    log_zip_path = os.path.dirname(url_parts.path) + ".zip"
+    log_zip_url = urllib.parse.urlunparse((url_parts.scheme, url_parts.netloc,
+        log_zip_path, url_parts.params, url_parts.query, url_parts.fragment))
+    path_in_zip = urllib.parse.unquote(
+        os.path.relpath(url_parts.path, os.path.dirname(log_zip_path)))
+    if log_zip_url.startswith("file:///") and not log_zip_path.startswith("/"):
+        # Replace file:/// with file: for relative paths,
+        # otherwise opening fails.
+        log_zip_url = "file:" + log_zip_url[8:]
+    return log_file_url, log_zip_url, path_in_zip
+
+
+def _read_logfile_lines(log_file, log_zip_cache):
+    if not log_file:
+        return []
+    log_file_url, log_zip_url, path_in_zip = _get_log_zip_url(log_file)
+
+    try:
+        if log_zip_url in log_zip_cache and remote.is_supported_url(log_file_url):
+            # avoid a failing request for each remote log file if the archive is known to exist
+            raise IOError()
+        with Util.open_url_seekable(log_file_url, 'rt') as logfile:
+            return logfile.readlines()
+    except IOError as unused_e1:
+        try:
+            if log_zip_url not in log_zip_cache:
+                log_zip_cache[log_zip_url] = logarchive.open_archive(log_zip_url)
+            log_zip = log_zip_cache[log_zip_url]
+
+            try:
+                content = log_zip.read(path_in_zip)
+                # the same as reading with io.TextIOWrapper, but without incremental decoding
+                return io.StringIO(content.decode(locale.getpreferredencoding(False)),
+                                   newline=None).readlines()
+            except KeyError:
+                logging.warning("Could not find logfile '%s' in archive '%s'.",
+                                log_file, log_zip_url)
+                return []
+
+        except IOError as unused_e2:
+            logging.warning("Could not find logfile '%s' nor log archive '%s'.",
+                            log_file, log_zip_url)
+            return []
+
+
+class ValuesByColumn(object):
+    """
+    The class ValuesByColumn stores the values of all runs of a run set column-wise:
+    for each column there is one list with the values of all runs (as strings),
+    and each run is identified by its row index in these lists.
+    The values of a column are converted to numbers only once, when they are first needed.
+    """
+    def __init__(self, column_count):
+        self.raw = [[] for _ in range(column_count)]
+        self.row_count = 0
+        # For each column the list of its values as Decimal,
+        # None if not yet computed, or False if not all values are numeric.
+        self._numbers = [None] * column_count
+
+    def __getstate__(self):
+        # The numbers are cheaper to compute again than to pickle.
+        state = self.__dict__.copy()
+        state['_numbers'] = [None] * len(self.raw)
+        return state
+
+    def append_row(self, values):
+        """Add the values of one run and return the index of its row."""
+        assert len(values) == len(self.raw)
+        for column_values, value in zip(self.raw, values):
+            column_values.append(value)
+        self.row_count += 1
+        return self.row_count - 1
+
+    def set_value(self, row, index, value):
+        self.raw[index][row] = value
+        self._numbers[index] = None
+
+    def get_number(self, row, index):
+        """
+        Return the value of the given row and column as Decimal (or None if it is missing).
+        @raise InvalidOperation: if the value is not a number
+        """
+        numbers = self._numbers[index]
+        if numbers is None:
+            try:
+                numbers = list(map(Util.to_decimal, self.raw[index]))
+            except InvalidOperation:
+                numbers = False
+            self._numbers[index] = numbers
+        if numbers is False:
+            # some other value of this column is no number, but this one might be
+            return Util.to_decimal(self.raw[index][row])
+        return numbers[row]
+
+
+def _intern(value):
+    return sys.intern(value) if value is not None else None
+
+
 class RunResult(object):
     """
     The class RunResult contains the results of a single verification run.
+    Its values are stored in the ValuesByColumn instance of its run set
+    once store_values_in() was called.
     """
+    # attributes that differ between runs of a run set, cf. RunSetResult.__getstate__()
+    ENCODED_ATTRIBUTES = ('task_id', 'status', 'category', 'score', 'log_file', 'sourcefiles_exist',
+                          '_row')
+
     def __init__(self, task_id, status, category, score, log_file, columns,
                  values, columns_relevant_for_diff=set(), sourcefiles_exist=True):
         assert(len(columns) == len(values))
@@ -613,11 +1125,49 @@ class RunResult(object):
         self.status = status
         self.log_file = log_file
         self.columns = columns
-        self.values = values
+        self._values = values
+        self._values_by_column = None
+        self._row = None
         self.category = category
         self.score = score
         self.columns_relevant_for_diff = columns_relevant_for_diff
 
+    @property
+    def values(self):
+        """The list of values of this run, one for each column."""
+        if self._values_by_column is None:
+            return self._values
+        row = self._row
+        return [column_values[row] for column_values in self._values_by_column.raw]
+
+    def store_values_in(self, values_by_column):
+        """Move the values of this run into the given column-wise storage."""
+        assert self._values_by_column is None
+        self._row = values_by_column.append_row(self._values)
+        self._values_by_column = values_by_column
+        self._values = None
+
+    def get_value(self, index):
+        """Return the value of the column with the given index."""
+        if self._values_by_column is None:
+            return self._values[index]
+        return self._values_by_column.raw[index][self._row]
+
+    def set_value(self, index, value):
+        if self._values_by_column is None:
+            self._values[index] = value
+        else:
+            self._values_by_column.set_value(self._row, index, value)
+
+    def get_number(self, index):
+        """
+        Return the value of the column with the given index as Decimal (or None if it is missing).
+        @raise InvalidOperation: if the value is not a number
+        """
+        if self._values_by_column is None:
+            return Util.to_decimal(self._values[index])
+        return self._values_by_column.get_number(self._row, index)
+
     @staticmethod
     def create_from_xml(sourcefileTag, get_value_from_logfile, listOfColumns,
                         correct_only, log_zip_cache, columns_relevant_for_diff,
@@ -625,48 +1175,13 @@ class RunResult(object):
         '''
         This function collects the values from one run.
         Only columns that should be part of the table are collected.
+        If get_value_from_logfile is None, the values of columns from log files are left empty.
         '''
 
-        def read_logfile_lines(log_file):
-            if not log_file:
-                return []
-            log_file_url = Util.make_url(log_file)
-            url_parts = urllib.parse.urlparse(log_file_url, allow_fragments=False)
-            log_zip_path = os.path.dirname(url_parts.path) + ".zip"
-            log_zip_url = urllib.parse.urlunparse((url_parts.scheme, url_parts.netloc,
-                log_zip_path, url_parts.params, url_parts.query, url_parts.fragment))
-            path_in_zip = urllib.parse.unquote(
-                os.path.relpath(url_parts.path, os.path.dirname(log_zip_path)))
-            if log_zip_url.startswith("file:///") and not log_zip_path.startswith("/"):
-                # Replace file:/// with file: for relative paths,
-                # otherwise opening fails.
-                log_zip_url = "file:" + log_zip_url[8:]
-
-            try:
-                with Util.open_url_seekable(log_file_url, 'rt') as logfile:
-                    return logfile.readlines()
-            except IOError as unused_e1:
-                try:
-                    if log_zip_url not in log_zip_cache:
-                        log_zip_cache[log_zip_url] = zipfile.ZipFile(
-                            Util.open_url_seekable(log_zip_url, 'rb'))
-                    log_zip = log_zip_cache[log_zip_url]
-
-                    try:
-                        with io.TextIOWrapper(log_zip.open(path_in_zip)) as logfile:
-                            return logfile.readlines()
-                    except KeyError:
-                        logging.warning("Could not find logfile '%s' in archive '%s'.",
-                                        log_file, log_zip_url)
-                        return []
-
-                except IOError as unused_e2:
-                    logging.warning("Could not find logfile '%s' nor log archive '%s'.",
-                                    log_file, log_zip_url)
-                    return []
-
-        status = Util.get_column_value(sourcefileTag, 'status', '')
-        category = Util.get_column_value(sourcefileTag, 'category', result.CATEGORY_MISSING)
+        # Status and category have few distinct values, interning them saves memory
+        # and lets pickle store each of them only once.
+        status = _intern(Util.get_column_value(sourcefileTag, 'status', ''))
+        category = _intern(Util.get_column_value(sourcefileTag, 'category', result.CATEGORY_MISSING))
         score = result.score_for_task(sourcefileTag.get('name'),
                                       sourcefileTag.get('properties', '').split(),
                                       category,
@@ -687,9 +1202,9 @@ class RunResult(object):
                     # collect values from XML
                     value = Util.get_column_value(sourcefileTag, column.title)
 
-                else: # collect values from logfile
+                elif get_value_from_logfile: # collect values from logfile
                     if logfileLines is None: # cache content
-                        logfileLines = read_logfile_lines(sourcefileTag.get('logfile'))
+                        logfileLines = _read_logfile_lines(sourcefileTag.get('logfile'), log_zip_cache)
 
                     value = get_value_from_logfile(logfileLines, column.pattern)
 
@@ -763,35 +1278,7 @@ def filter_rows_with_differences(rows):
         # table with single column
         return []
 
-
-    def get_index_of_column(name, cols):
-        for i in range(0, len(cols)):
-            if cols[i].title == name:
-                return i
-        return -1
-
-
-    def all_equal_result(listOfResults):
-        relevant_columns = set()
-        for res in listOfResults:
-            for relevant_column in res.columns_relevant_for_diff:
-                relevant_columns.add(relevant_column)
-        if len(relevant_columns) == 0:
-            relevant_columns.add("status")
-
-        status = []
-        for col in relevant_columns:
-            # It's necessary to search for the index of a column every time
-            # because they can differ between results
-            status.append(
-                set(
-                    res.values[get_index_of_column(col, res.columns)]
-                    for res in listOfResults))
-
-        return reduce(lambda x, y: x and (len(y) <= 1), status, True)
-
-
-    rowsDiff = [row for row in rows if not all_equal_result(row.results)]
+    rowsDiff = [row for row in rows if results_differ(row.results)]
 
     if len(rowsDiff) == 0:
         logging.info("---> NO DIFFERENCE FOUND IN SELECTED COLUMNS")
@@ -802,6 +1289,36 @@ def filter_rows_with_differences(rows):
     return rowsDiff
 
 
+def results_differ(listOfResults):
+    """
+    Check whether the given results of one task differ in any of the columns relevant for diff
+    (by default only the status column).
+    """
+    def get_value_of_column(name, res):
+        for i in range(0, len(res.columns)):
+            if res.columns[i].title == name:
+                return res.get_value(i)
+        return None # e.g., for the journal of a run set that has not produced any results yet
+
+    relevant_columns = set()
+    for res in listOfResults:
+        for relevant_column in res.columns_relevant_for_diff:
+            relevant_columns.add(relevant_column)
+    if len(relevant_columns) == 0:
+        relevant_columns.add("status")
+
+    status = []
+    for col in relevant_columns:
+        # It's necessary to search for the index of a column every time
+        # because they can differ between results
+        status.append(
+            set(
+                get_value_of_column(col, res)
+                for res in listOfResults))
+
+    return not reduce(lambda x, y: x and (len(y) <= 1), status, True)
+
+
 def get_table_head(runSetResults, commonFileNamePrefix):
 
     # This list contains the number of columns each run set has
@@ -870,13 +1387,13 @@ def get_table_head(runSetResults, commonFileNamePrefix):
         valuesAndWidths = list(Util.collapse_equal_values(values, runSetWidths)) \
                           if collapse else list(zip(values, runSetWidths))
 
-        return tempita.bunch(id=rowName.lower().split(' ')[0],
+        return templates.bunch(id=rowName.lower().split(' ')[0],
                              name=rowName,
                              content=valuesAndWidths)
 
     titles      = [column.format_title() for runSetResult in runSetResults for column in runSetResult.columns]
     runSetWidths1 = [1]*sum(runSetWidths)
-    titleRow    = tempita.bunch(id='columnTitles', name=commonFileNamePrefix,
+    titleRow    = templates.bunch(id='columnTitles', name=commonFileNamePrefix,
                                 content=list(zip(titles, runSetWidths1)))
 
     return {'tool':    get_row('Tool', '{tool} {version}', collapse=True),
@@ -934,9 +1451,12 @@ def _contains_unconfirmed_results(rows_for_stats):
     return False
 
 
-def get_stats(rows, local_summary, correct_only):
+def get_stats(rows, local_summary, correct_only, stats_cache=None):
     result_cols = list(rows_to_columns(rows))  # column-wise
-    stats = list(parallel.map(get_stats_of_run_set, result_cols, [correct_only] * len(result_cols)))
+    if stats_cache is None:
+        stats = list(parallel.map(get_stats_of_run_set, result_cols, [correct_only] * len(result_cols)))
+    else:
+        stats = stats_cache.get_stats_of_run_sets(result_cols, correct_only)
     rowsForStats = list(map(Util.flatten, zip(*stats)))  # row-wise
 
     # find out column types for statistics columns
@@ -955,13 +1475,13 @@ def get_stats(rows, local_summary, correct_only):
     task_counts = 'in total {0} true tasks, {1} false tasks'.format(count_true, count_false)
 
     if max_score:
-        score_row = tempita.bunch(id='score',
+        score_row = templates.bunch(id='score',
                                   title='score ({0} tasks, max score: {1})'.format(len(rows), max_score),
                                   description=task_counts,
                                   content=rowsForStats[10])
 
     if local_summary:
-        summary_row = tempita.bunch(id=None, title='local summary',
+        summary_row = templates.bunch(id=None, title='local summary',
             description='(This line contains some statistics from local execution. Only trust those values, if you use your own computer.)',
             content=local_summary)
 
@@ -969,40 +1489,77 @@ def get_stats(rows, local_summary, correct_only):
         return '&nbsp;'*(n*4)
 
     stats_info_correct = [
-            tempita.bunch(id=None, title=indent(1)+'correct results', description='(property holds + result is true) OR (property does not hold + result is false)', content=rowsForStats[1]),
-            tempita.bunch(id=None, title=indent(2)+'correct true', description='property holds + result is true', content=rowsForStats[2]),
-            tempita.bunch(id=None, title=indent(2)+'correct false', description='property does not hold + result is false', content=rowsForStats[3]),
+            templates.bunch(id=None, title=indent(1)+'correct results', description='(property holds + result is true) OR (property does not hold + result is false)', content=rowsForStats[1]),
+            templates.bunch(id=None, title=indent(2)+'correct true', description='property holds + result is true', content=rowsForStats[2]),
+            templates.bunch(id=None, title=indent(2)+'correct false', description='property does not hold + result is false', content=rowsForStats[3]),
             ]
     stats_info_correct_unconfirmed = [
-            tempita.bunch(id=None, title=indent(1)+'correct-unconfimed results', description='(property holds + result is true) OR (property does not hold + result is false), but unconfirmed', content=rowsForStats[4]),
-            tempita.bunch(id=None, title=indent(2)+'correct-unconfirmed true', description='property holds + result is true, but unconfirmed', content=rowsForStats[5]),
-            tempita.bunch(id=None, title=indent(2)+'correct-unconfirmed false', description='property does not hold + result is false, but unconfirmed', content=rowsForStats[6]),
+            templates.bunch(id=None, title=indent(1)+'correct-unconfimed results', description='(property holds + result is true) OR (property does not hold + result is false), but unconfirmed', content=rowsForStats[4]),
+            templates.bunch(id=None, title=indent(2)+'correct-unconfirmed true', description='property holds + result is true, but unconfirmed', content=rowsForStats[5]),
+            templates.bunch(id=None, title=indent(2)+'correct-unconfirmed false', description='property does not hold + result is false, but unconfirmed', content=rowsForStats[6]),
             ]
     stats_info_wrong = [
-            tempita.bunch(id=None, title=indent(1)+'incorrect results', description='(property holds + result is false) OR (property does not hold + result is true)', content=rowsForStats[7]),
-            tempita.bunch(id=None, title=indent(2)+'incorrect true', description='property does not hold + result is true', content=rowsForStats[8]),
-            tempita.bunch(id=None, title=indent(2)+'incorrect false', description='property holds + result is false', content=rowsForStats[9]),
+            templates.bunch(id=None, title=indent(1)+'incorrect results', description='(property holds + result is false) OR (property does not hold + result is true)', content=rowsForStats[7]),
+            templates.bunch(id=None, title=indent(2)+'incorrect true', description='property does not hold + result is true', content=rowsForStats[8]),
+            templates.bunch(id=None, title=indent(2)+'incorrect false', description='property holds + result is false', content=rowsForStats[9]),
             ]
     if _contains_unconfirmed_results(rowsForStats):
         stats_info = stats_info_correct + stats_info_correct_unconfirmed + stats_info_wrong
     else:
         stats_info = stats_info_correct + stats_info_wrong
-    return [tempita.bunch(id=None, title='total', description=task_counts, content=rowsForStats[0]),
+    return [templates.bunch(id=None, title='total', description=task_counts, content=rowsForStats[0]),
             ] + ([summary_row] if local_summary else []) + stats_info + ([score_row] if max_score else []), stats_columns
 
 
+class StatsCache(object):
+    """
+    Remembers the statistics of the columns of results of one table generation
+    such that they need not be computed again in the next generation
+    for columns whose results are unchanged.
+    Entries that are not used in a generation are dropped afterwards.
+    """
+    def __init__(self):
+        self._previous = {}
+        self._current = {}
+
+    def next_generation(self):
+        self._previous = self._current
+        self._current = {}
+
+    def get_stats_of_run_sets(self, result_cols, correct_only):
+        """Return the result of get_stats_of_run_set() for each of the given columns of results."""
+        keys = [StatsCache._get_key(runResults, correct_only) for runResults in result_cols]
+        missing = [(key, runResults) for key, runResults in zip(keys, result_cols)
+                   if key not in self._current and key not in self._previous]
+        computed_stats = parallel.map(get_stats_of_run_set,
+                                      [runResults for unused_key, runResults in missing],
+                                      [correct_only] * len(missing))
+        for (key, runResults), stats in zip(missing, computed_stats):
+            self._current[key] = (runResults, stats)
+
+        for key in keys:
+            if key not in self._current:
+                self._current[key] = self._previous[key]
+        return [self._current[key][1] for key in keys]
+
+    @staticmethod
+    def _get_key(runResults, correct_only):
+        # Results of loaded runs never change and are identified by their storage,
+        # which is kept alive by the cache entry such that its id is not reused.
+        # Dummy results for missing runs are created for each generation anew
+        # and are identified by their task.
+        return (correct_only, id(runResults[0].columns), tuple(
+            run_result.task_id if run_result._values_by_column is None
+            else (id(run_result._values_by_column), run_result._row)
+            for run_result in runResults))
+
+
 def get_stats_of_run_set(runResults, correct_only):
     """
     This function returns the numbers of the statistics.
     @param runResults: All the results of the execution of one run set (as list of RunResult objects)
     """
 
-    # convert:
-    # [['TRUE', 0,1], ['FALSE', 0,2]] -->  [['TRUE', 'FALSE'], [0,1, 0,2]]
-    # in python2 this is a list, in python3 this is the iterator of the list
-    # this works, because we iterate over the list some lines below
-    listsOfValues = zip(*[runResult.values for runResult in runResults])
-
     columns = runResults[0].columns
     main_status_list = [(runResult.category, runResult.status) for runResult in runResults]
 
@@ -1020,7 +1577,7 @@ def get_stats_of_run_set(runResults, correct_only):
     scoreRow = []
 
     status_col_index = 0  # index of 'status' column
-    for index, (column, values) in enumerate(zip(columns, listsOfValues)):
+    for index, column in enumerate(columns):
         col_type = column.type.type
         if col_type != ColumnType.text:
             if col_type == ColumnType.main_status or col_type == ColumnType.status:
@@ -1030,9 +1587,9 @@ def get_stats_of_run_set(runResults, correct_only):
                 else:
                     score = None
 
-                total   = StatValue(len([runResult.values[index] for runResult in runResults if runResult.status]))
+                total   = StatValue(len([runResult for runResult in runResults if runResult.status]))
 
-                curr_status_list = [(runResult.category, runResult.values[index]) for runResult in runResults]
+                curr_status_list = [(runResult.category, runResult.get_value(index)) for runResult in runResults]
 
                 counts = collections.Counter((category, result.get_result_classification(status))
                                              for category, status in curr_status_list)
@@ -1058,7 +1615,8 @@ def get_stats_of_run_set(runResults, correct_only):
                 total, correct, correctTrue, correctFalse,\
                        correctUnconfirmed, correctUnconfirmedTrue, correctUnconfirmedFalse,\
                        incorrect, wrongTrue, wrongFalse =\
-                    get_stats_of_number_column(values, main_status_list, column.title, correct_only)
+                    get_stats_of_number_column(runResults, main_status_list, column.title, correct_only,
+                                               to_number=operator.methodcaller('get_number', index))
 
                 score = None
 
@@ -1170,10 +1728,52 @@ class StatValue(object):
                          )
 
 
-def get_stats_of_number_column(values, categoryList, columnTitle, correct_only):
+def get_stats_of_partitions(values, partitions_of_values, partition_count):
+    """
+    Compute the statistics for several (possibly overlapping) partitions of a list of values
+    with StatValue.from_list for each partition.
+    Values that belong to the same partitions are collected in one pass,
+    such that the partitions of each value need to be looked at only once.
+    @param values: a list of Decimal values (None values are ignored)
+    @param partitions_of_values: for each value a (hashable) sequence of the indices
+        of the partitions that it belongs to
+    @param partition_count: the number of partitions
+    @return: a list with a StatValue for each partition
+    """
+    values_of_group = collections.defaultdict(list)
+    for value, group in zip(values, partitions_of_values):
+        values_of_group[group].append(value)
+
+    values_of_partition = [[] for unused_i in range(partition_count)]
+    for group, group_values in values_of_group.items():
+        for partition in group:
+            values_of_partition[partition].extend(group_values)
+    return [StatValue.from_list(partition_values) for partition_values in values_of_partition]
+
+
+# Indices of the statistics returned by get_stats_of_number_column
+# that each combination of category and result class contributes to.
+_STATS_OF_RESULT_CLASSES = {
+    (result.CATEGORY_CORRECT,             result.RESULT_CLASS_TRUE):  (0, 1, 2),
+    (result.CATEGORY_CORRECT,             result.RESULT_CLASS_FALSE): (0, 1, 3),
+    (result.CATEGORY_CORRECT_UNCONFIRMED, result.RESULT_CLASS_TRUE):  (0, 4, 5),
+    (result.CATEGORY_CORRECT_UNCONFIRMED, result.RESULT_CLASS_FALSE): (0, 4, 6),
+    (result.CATEGORY_WRONG,               result.RESULT_CLASS_TRUE):  (0, 7, 8),
+    (result.CATEGORY_WRONG,               result.RESULT_CLASS_FALSE): (0, 7, 9),
+    }
+_STATS_OF_OTHER_RESULTS = (0,)
+
+
+def get_stats_of_number_column(values, categoryList, columnTitle, correct_only,
+                               to_number=Util.to_decimal):
+    """
+    Compute the statistics of a numeric column, for all runs and for each class of results.
+    @param values: the values of the column
+    @param to_number: the function that converts each of the values to a Decimal
+    """
     assert len(values) == len(categoryList)
     try:
-        valueList = [Util.to_decimal(v) for v in values]
+        valueList = list(map(to_number, values))
     except InvalidOperation as e:
         if columnTitle != "host" and not columnTitle.endswith('status'): # We ignore values of columns 'host' and 'status'.
             logging.warning("%s. Statistics may be wrong.", e)
@@ -1181,27 +1781,20 @@ def get_stats_of_number_column(values, categoryList, columnTitle, correct_only):
                               StatValue(0), StatValue(0), StatValue(0),\
                               StatValue(0), StatValue(0), StatValue(0))
 
-    valuesPerCategory = collections.defaultdict(list)
-    for value, catStat in zip(valueList, categoryList):
-        category, status = catStat
+    # the same statuses occur many times, so we classify each of them only once
+    stats_of_status = {}
+    for category, status in set(categoryList):
         if status is None:
-            continue
-        valuesPerCategory[category, result.get_result_classification(status)].append(value)
-
-    return (StatValue.from_list(valueList),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_CORRECT, result.RESULT_CLASS_TRUE]
-                              + valuesPerCategory[result.CATEGORY_CORRECT, result.RESULT_CLASS_FALSE]),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_CORRECT, result.RESULT_CLASS_TRUE]),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_CORRECT, result.RESULT_CLASS_FALSE]),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_CORRECT_UNCONFIRMED, result.RESULT_CLASS_TRUE]
-                              + valuesPerCategory[result.CATEGORY_CORRECT_UNCONFIRMED, result.RESULT_CLASS_FALSE]),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_CORRECT_UNCONFIRMED, result.RESULT_CLASS_TRUE]),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_CORRECT_UNCONFIRMED, result.RESULT_CLASS_FALSE]),
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_WRONG, result.RESULT_CLASS_TRUE]
-                              + valuesPerCategory[result.CATEGORY_WRONG, result.RESULT_CLASS_FALSE]) if not correct_only else None,
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_WRONG, result.RESULT_CLASS_TRUE]) if not correct_only else None,
-            StatValue.from_list(valuesPerCategory[result.CATEGORY_WRONG, result.RESULT_CLASS_FALSE]) if not correct_only else None,
-            )
+            stats_of_status[category, status] = _STATS_OF_OTHER_RESULTS
+        else:
+            stats_of_status[category, status] = _STATS_OF_RESULT_CLASSES.get(
+                (category, result.get_result_classification(status)), _STATS_OF_OTHER_RESULTS)
+
+    stats = get_stats_of_partitions(
+        valueList, list(map(stats_of_status.__getitem__, categoryList)), 10)
+    if correct_only:
+        stats[7] = stats[8] = stats[9] = None
+    return tuple(stats)
 
 
 def get_regression_count(rows, ignoreFlappingTimeouts): # for options.dump_counts
@@ -1284,9 +1877,11 @@ def get_summary(runSetResults):
     return summaryStats if available else None
 
 
-def create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePattern, options):
+def create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePattern, options,
+                  stats_cache=None):
     '''
     Create tables and write them to files.
+    @param stats_cache: an optional StatsCache with statistics of previously created tables
     @return a list of futures to allow waiting for completion
     '''
 
@@ -1328,7 +1923,7 @@ def create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePat
         # calculate statistics if necessary
         if not options.format == ['csv']:
             local_summary = get_summary(runSetResults) if use_local_summary else None
-            stats, stats_columns = get_stats(rows, local_summary, options.correct_only)
+            stats, stats_columns = get_stats(rows, local_summary, options.correct_only, stats_cache)
         else:
             stats = stats_columns = None
 
@@ -1337,17 +1932,25 @@ def create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePat
                 outfile = None
                 logging.info('Writing %s to stdout...', template_format.upper().ljust(4))
             else:
-                outfile = os.path.join(outputPath, outputFilePattern.format(name=name, type=table_type, ext=template_format))
+                ext = template_format + '.gz' if template_format == 'csv' and options.gzip else template_format
+                outfile = os.path.join(outputPath, outputFilePattern.format(name=name, type=table_type, ext=ext))
                 logging.info('Writing %s into %s ...', template_format.upper().ljust(4), outfile)
 
             this_template_values = dict(title=title, body=rows, foot=stats, foot_columns=stats_columns)
             this_template_values.update(template_values.__dict__)
 
-            futures.append(parallel.submit(
-                write_table_in_format,
-                template_format, outfile, this_template_values,
-                options.show_table and template_format == 'html',
-                ))
+            if template_format == 'html' and options.lazy_html:
+                futures.append(parallel.submit(
+                    write_lazy_html_table, outfile, this_template_values, options.show_table))
+            elif template_format == 'csv':
+                futures.append(parallel.submit(
+                    write_csv_table, outfile, this_template_values, options.gzip))
+            else:
+                futures.append(parallel.submit(
+                    write_table_in_format,
+                    template_format, outfile, this_template_values,
+                    options.show_table and template_format == 'html',
+                    ))
 
     # write normal tables
     write_table("table", name, rows,
@@ -1361,26 +1964,19 @@ def create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePat
 
 
 def write_table_in_format(template_format, outfile, template_values, show_table):
-    # read template
-    Template = tempita.HTMLTemplate if template_format == 'html' else tempita.Template
-    template_file = TEMPLATE_FILE_NAME.format(format=template_format)
-    try:
-        template_content = __loader__.get_data(template_file).decode(TEMPLATE_ENCODING)
-    except NameError:
-        with open(template_file, mode='r') as f:
-            template_content = f.read()
-    template = Template(template_content, namespace=TEMPLATE_NAMESPACE)
-
-    result = template.substitute(**template_values)
+    template = templates.get_template(
+        TEMPLATE_FILE_NAME.format(format=template_format), html=template_format.endswith('html'))
+    # like the namespace of tempita, the given values take precedence
+    result = template.substitute(**dict(TEMPLATE_NAMESPACE, **template_values))
 
     # write file
     if not outfile:
         print(result, end='')
     else:
-        with open(outfile, 'w') as file:
-            file.write(result)
+        Util.write_file_atomically(result, outfile)
 
         if show_table:
+            import subprocess
             try:
                 with open(os.devnull, 'w') as devnull:
                     subprocess.Popen(['xdg-open', outfile],
@@ -1389,7 +1985,119 @@ def write_table_in_format(template_format, outfile, template_values, show_table)
                 pass
 
 
+def write_csv_table(outfile, template_values, compress=False):
+    """
+    Write a table as tab-separated CSV file.
+    This does not use a template, but writes each row directly as soon as it is formatted,
+    which is much faster for large tables and does not keep the whole content in memory.
+    @param outfile: the file to write to, or None for stdout
+    @param compress: whether to compress the file with gzip
+    """
+    if not outfile:
+        _write_csv_lines(sys.stdout, template_values)
+    else:
+        with Util.open_file_atomically(outfile, compress) as f:
+            _write_csv_lines(f, template_values)
+
+
+def _write_csv_lines(f, template_values):
+    head = template_values['head']
+    relevant_id_columns = template_values['relevant_id_columns']
+    id_columns_prefix = '\t' * relevant_id_columns[1:].count(True)
+    for line in ['tool', 'runset', 'title']:
+        if head.get(line):
+            f.write(head[line].name.lower())
+            f.write('\t')
+            f.write(id_columns_prefix)
+            f.write('\t'.join(value for value, width in head[line].content for unused in range(width)))
+            f.write('\n')
+
+    for row in template_values['body']:
+        f.write(row.short_filename)
+        f.write('\t')
+        for id, show in zip(row.id[1:], relevant_id_columns[1:]):
+            if show:
+                f.write(id or '')
+                f.write('\t')
+        f.write('\t'.join(
+            column.format_value(value or '', False, 'csv')
+            for run_result in row.results
+            for value, column in zip(run_result.values, run_result.columns)))
+        f.write('\n')
+
+
+def write_lazy_html_table(outfile, template_values, show_table):
+    """
+    Write an HTML table that does not contain the rows itself,
+    but loads them lazily from data files in a directory next to it
+    and shows only those rows that are currently visible.
+    The data files are scripts with the rows as JSON,
+    such that they can also be loaded if the table is opened as local file.
+    Only the head and foot of the table are rendered with the template.
+    """
+    data_dir = os.path.splitext(outfile)[0] + '.data'
+    os.makedirs(data_dir, exist_ok=True)
+
+    rows = template_values['body']
+    cell_classes = {}
+    chunk_count = 0
+    for start in range(0, len(rows), LAZY_HTML_CHUNK_SIZE):
+        chunk = [_get_lazy_html_row(row, template_values, cell_classes)
+                 for row in rows[start:start + LAZY_HTML_CHUNK_SIZE]]
+        chunk_file = os.path.join(data_dir, LAZY_HTML_CHUNK_FILE_NAME.format(chunk_count))
+        Util.write_file_atomically(
+            'benchexecTable.addRows({}, {});\n'.format(
+                chunk_count, json.dumps(chunk, separators=(',', ':'))),
+            chunk_file)
+        chunk_count += 1
+
+    template_values = dict(template_values,
+        body=[],
+        data_dir=os.path.basename(data_dir),
+        chunk_count=chunk_count,
+        row_count=len(rows),
+        cell_classes=sorted(cell_classes, key=cell_classes.get),
+        count_columns=template_values['count_id_columns'] + sum(map(len, template_values['columns'])),
+        )
+    write_table_in_format(LAZY_HTML_TEMPLATE_FORMAT, outfile, template_values, show_table)
+
+
+def _get_lazy_html_row(row, template_values, cell_classes):
+    """
+    Create the data for one row of an HTML table with --lazy-html,
+    with the same content as the row of a regular HTML table.
+    @param cell_classes: a dict with the index of each CSS class of cells, will be extended
+    """
+    base_dir = template_values['base_dir']
+    ids = [id for id, show in zip(row.id[1:], template_values['relevant_id_columns'][1:]) if show]
+    cells = []
+    for run_result in row.results:
+        for column, value in zip(run_result.columns, run_result.values):
+            css_class = run_result.category + ' ' + str(column.type.type)
+            href = None
+            if column.title.endswith('status') or column.href:
+                text = (value or column.pattern or '-').lower()
+                if run_result.log_file or column.href:
+                    css_class += ' link'
+                    href = Util.create_link(column.href or run_result.log_file, base_dir,
+                                            run_result, template_values['href_base'])
+            else:
+                if value is None or value == '':
+                    css_class += ' novalue'
+                # the rows are shown as text, not HTML
+                text = html.unescape(column.format_value(value, True, 'html_cell') or '')
+            cell = [text, cell_classes.setdefault(css_class, len(cell_classes))]
+            if href:
+                cell.append(href)
+            cells.append(cell)
+
+    file_href = Util.create_link(row.filename, base_dir) if row.has_sourcefile else None
+    return [row.short_filename, file_href, ids, cells]
+
+
 def basename_without_ending(file):
+    if resultdb.is_run_set_reference(file):
+        file = resultdb.load_run_set_file_name(file)
     name = os.path.basename(file)
     if name.endswith(".xml"):
         name = name[:-4]
@@ -1474,6 +2182,61 @@ def create_argument_parser():
         help="Expect JS libs in libs/javascript/ instead of retrieving them from a CDN. "
             "Currently does not work for all libs."
     )
+    parser.add_argument("--cache-dir",
+        metavar="DIR",
+        help="Cache the loaded results of result files (and files downloaded from HTTP servers) "
+            "in this directory such that generating tables from the same files again is faster."
+    )
+    parser.add_argument("--cache-size",
+        type=int,
+        metavar="MB",
+        default=resultcache.DEFAULT_CACHE_SIZE,
+        help="Maximal size of the result cache in MB (default: %(default)s)."
+    )
+    parser.add_argument("--gzip",
+        action="store_true",
+        help="Compress CSV tables with gzip (the file names end with '.csv.gz')."
+    )
+    parser.add_argument("--lazy-html",
+        action="store_true",
+        help="Write HTML tables that load their rows from separate data files "
+            + "and show only the currently visible rows. "
+            + "Useful for tables with many rows, but the table has fewer features (e.g., no plots)."
+    )
+    parser.add_argument("--watch",
+        type=float,
+        nargs="?",
+        const=DEFAULT_WATCH_INTERVAL,
+        metavar="SECONDS",
+        help="Keep running and regenerate the tables whenever the result files change, "
+            + "checking for changes every SECONDS seconds (default: %(const)s). "
+            + "Only changed result files are loaded again. "
+            + "Not supported for result files that are listed in a table-definition file."
+    )
+    parser.add_argument("--serve",
+        type=int,
+        nargs="?",
+        const=DEFAULT_SERVER_PORT,
+        metavar="PORT",
+        help="Do not write tables, but load the results and answer queries about them "
+            + "with JSON on http://localhost:PORT/ (default port: %(const)s) until interrupted."
+    )
+    parser.add_argument("--baseline",
+        action="append",
+        metavar="RESULT",
+        help="Instead of writing tables, compare the resource consumption of the given results "
+            + "(typically several repetitions) against the results of this baseline "
+            + "(may be given several times, wildcards are allowed) "
+            + "and write a regression report with all significant differences. "
+            + "The exit code is 1 if there are significant slowdowns."
+    )
+    parser.add_argument("--regression-threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        metavar="PERCENT",
+        help="Minimal relative difference that is reported as slowdown or speedup "
+            + "by --baseline (default: %(default)s)."
+    )
     parser.add_argument("--show",
         action="store_true", dest="show_table",
         help="Open the produced HTML table(s) in the default browser."
@@ -1493,7 +2256,40 @@ def sigint_handler(*args, **kwargs):
     sys.exit(1)
 
 
+def configure_process(remote_dir, template_dir, log_index_dir):
+    """
+    Configure the caches of the current process (this is also the initializer of the workers).
+    """
+    remote.configure(remote_dir)
+    templates.configure(template_dir)
+    logarchive.configure(log_index_dir)
+
+
+def is_small_input(result_files):
+    """
+    Check whether the given result files are local and so small
+    that processing them in parallel is not worth the cost of starting worker processes.
+    """
+    total_size = 0
+    for result_file in result_files:
+        if Util.is_url(result_file) or resultdb.is_run_set_reference(result_file):
+            return False
+        try:
+            total_size += os.path.getsize(result_file)
+        except OSError:
+            return False
+    return total_size < PARALLEL_MIN_INPUT_SIZE
+
+
 def main(args=None):
+    try:
+        return _main(args)
+    except Util.ResultFileError as e:
+        logging.error('%s', e)
+        exit(1)
+
+
+def _main(args):
     if sys.version_info < (3,):
         sys.exit('table-generator needs Python 3 to run.')
     signal.signal(signal.SIGINT, sigint_handler)
@@ -1505,14 +2301,29 @@ def main(args=None):
                         level=logging.WARNING if options.quiet else logging.INFO)
 
     global parallel
-    import concurrent.futures
     cpu_count = 1
     try:
         cpu_count = os.cpu_count() or 1
     except AttributeError:
         pass
+    template_dir = None
+    if options.cache_dir:
+        remote_dir = os.path.join(options.cache_dir, REMOTE_CACHE_DIR_NAME)
+        template_dir = os.path.join(options.cache_dir, TEMPLATE_CACHE_DIR_NAME)
+        log_index_dir = os.path.join(options.cache_dir, LOG_INDEX_CACHE_DIR_NAME)
+    else:
+        # remote files are downloaded and indices of log archives are built
+        # only once for all processes, but not kept
+        tmp_dir = tempfile.TemporaryDirectory(prefix='table-generator-')
+        remote_dir = os.path.join(tmp_dir.name, REMOTE_CACHE_DIR_NAME)
+        log_index_dir = os.path.join(tmp_dir.name, LOG_INDEX_CACHE_DIR_NAME)
+    configure_process(remote_dir, template_dir, log_index_dir)
     # Use up to cpu_count*2 workers because some tasks are I/O bound.
-    parallel = concurrent.futures.ProcessPoolExecutor(max_workers=cpu_count*2)
+    # The workers are started only when they are first needed.
+    process_pool = Util.LazyProcessPoolExecutor(
+        max_workers=cpu_count*2, initializer=configure_process,
+        initargs=(remote_dir, template_dir, log_index_dir))
+    parallel = process_pool
 
     name = options.output_name
     outputPath = options.outputPath
@@ -1520,9 +2331,27 @@ def main(args=None):
         # write to stdout
         outputFilePattern = '-'
         outputPath = '.'
+        if options.lazy_html:
+            arg_parser.error("--lazy-html cannot be used when writing to stdout.")
+        if options.gzip:
+            arg_parser.error("--gzip cannot be used when writing to stdout.")
+        if options.watch:
+            arg_parser.error("--watch cannot be used when writing to stdout.")
     else:
         outputFilePattern = "{name}.{type}.{ext}"
 
+    if options.serve is not None and options.watch:
+        arg_parser.error("--serve and --watch cannot be used together.")
+    if options.baseline:
+        if options.watch or options.serve is not None:
+            arg_parser.error("--baseline cannot be used together with --watch or --serve.")
+        if outputFilePattern == '-':
+            arg_parser.error("--baseline cannot be used when writing to stdout.")
+
+    # result files (and columns) of the table, if they can be watched for changes
+    watched_files = None
+    watched_columns = None
+
     if options.xmltablefile:
         try:
             table_definition = parse_table_definition_file(options.xmltablefile)
@@ -1531,6 +2360,9 @@ def main(args=None):
                 if options.tables:
                     arg_parser.error(
                         "Invalid additional arguments '{}'.".format(" ".join(options.tables)))
+                if options.watch:
+                    arg_parser.error(
+                        "--watch cannot be used for result files listed in a table-definition file.")
 
                 runSetResults = load_results_from_table_definition(
                     table_definition, options.xmltablefile, options)
@@ -1542,8 +2374,15 @@ def main(args=None):
                         "or with <result> tags in the table-definiton file.")
 
                 result_files = Util.extend_file_list(options.tables) # expand wildcards
-                runSetResults = load_results_with_table_definition(
-                    result_files, table_definition, options.xmltablefile, options)
+                if not options.watch and is_small_input(result_files):
+                    parallel = Util.DummyExecutor()
+                if options.watch:
+                    watched_files = options.tables
+                    watched_columns = extract_columns_from_table_definition_file(
+                        table_definition, options.xmltablefile)
+                else:
+                    runSetResults = load_results_with_table_definition(
+                        result_files, table_definition, options.xmltablefile, options)
 
         except Util.TableDefinitionError as e:
             logging.error('Fault in {}: {}'.format(options.xmltablefile, e.message))
@@ -1563,8 +2402,13 @@ def main(args=None):
             logging.info("Searching result files in '%s'...", searchDir)
             inputFiles = [os.path.join(searchDir, '*.results*.xml')]
 
+        if options.watch:
+            watched_files = inputFiles
         inputFiles = Util.extend_file_list(inputFiles) # expand wildcards
-        runSetResults = load_results(inputFiles, options)
+        if not options.watch and is_small_input(inputFiles):
+            parallel = Util.DummyExecutor()
+        if not options.watch:
+            runSetResults = load_results(inputFiles, options, defer_log_values=True)
 
         if len(inputFiles) == 1:
             if not name:
@@ -1585,11 +2429,57 @@ def main(args=None):
     if not outputPath:
         outputPath = '.'
 
+    if options.watch:
+        watch_result_files(
+            watched_files, watched_columns, name, outputPath, outputFilePattern, options)
+        return
+
     runSetResults = [r for r in runSetResults if r is not None]
+    # The size of the result files says nothing about the size of the baseline results
+    # and of the log files, so the process pool decides about parallelism for these.
+    small_input_executor = parallel
+    parallel = process_pool
+    baselineResults = []
+    if options.baseline:
+        baselineFiles = Util.extend_file_list(options.baseline) # expand wildcards
+        baselineResults = [r for r in load_results(baselineFiles, options, defer_log_values=True)
+                           if r is not None]
+    collect_values_from_logs(baselineResults + runSetResults, options.correct_only)
+    parallel = small_input_executor
+
+    if options.cache_dir:
+        store_results_in_cache(baselineResults + runSetResults, options)
+        resultcache.ResultCache(options.cache_dir).evict(options.cache_size * 1000 * 1000)
+        remote.evict(remote_dir, options.cache_size * 1000 * 1000)
+        logarchive.evict(log_index_dir, options.cache_size * 1000 * 1000)
+
     if not runSetResults:
         logging.error('No benchmark results found.')
         exit(1)
 
+    if options.baseline:
+        if not baselineResults:
+            logging.error('No baseline results found.')
+            exit(1)
+        slowdowns = generate_regression_report(
+            baselineResults, runSetResults, name, outputPath, options)
+        parallel.shutdown(wait=True)
+        if slowdowns:
+            exit(1)
+    elif options.serve is not None:
+        from benchexec.tablegenerator import server
+        server.serve(runSetResults, options)
+    else:
+        generate_tables(runSetResults, name, outputPath, outputFilePattern, options)
+
+    parallel.shutdown(wait=True)
+
+
+def generate_tables(runSetResults, name, outputPath, outputFilePattern, options, stats_cache=None):
+    """
+    Merge the given results and write all tables for them.
+    @param stats_cache: an optional StatsCache with statistics of previously created tables
+    """
     logging.info('Merging results...')
     if options.common:
         find_common_tasks(runSetResults)
@@ -1600,13 +2490,14 @@ def main(args=None):
     rows     = get_rows(runSetResults)
     if not rows:
         logging.warning('No results found, no tables produced.')
-        exit()
+        return
     rowsDiff = filter_rows_with_differences(rows) if options.write_diff_table else []
 
     logging.info('Generating table...')
     if not os.path.isdir(outputPath) and not outputFilePattern == '-':
         os.makedirs(outputPath)
-    futures = create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePattern, options)
+    futures = create_tables(name, runSetResults, rows, rowsDiff, outputPath, outputFilePattern, options,
+                            stats_cache)
 
     if options.dump_counts: # print some stats for Buildbot
         print ("REGRESSIONS {}".format(get_regression_count(rows, options.ignoreFlappingTimeouts)))
@@ -1619,8 +2510,176 @@ def main(args=None):
         f.result() # to get any exceptions that may have occurred
     logging.info('done')
 
-    parallel.shutdown(wait=True)
 
+def generate_regression_report(baselineResults, candidateResults, name, outputPath, options):
+    """
+    Compare the resource consumption of the candidate results against the baseline results
+    and write a report about the significant differences.
+    @return: the number of significant slowdowns
+    """
+    from benchexec.tablegenerator import regression
+
+    logging.info('Merging results...')
+    runSetResults = baselineResults + candidateResults
+    merge_tasks(runSetResults)
+    rows = get_rows(runSetResults)
+
+    logging.info('Comparing %s candidate results against %s baseline results...',
+                 len(candidateResults), len(baselineResults))
+    report = regression.analyze(
+        baselineResults, candidateResults, rows, options.regression_threshold / 100)
+    if not os.path.isdir(outputPath):
+        os.makedirs(outputPath)
+    regression.write_report(report, outputPath, name)
+
+    slowdowns = regression.count_slowdowns(report)
+    for title, column in report['columns'].items():
+        logging.info('%s: %s significant slowdowns, %s significant speedups',
+                     title, column['significant_slowdowns'], column['significant_speedups'])
+    logging.info('done')
+    return slowdowns
+
+
+def watch_result_files(result_patterns, columns, name, outputPath, outputFilePattern, options):
+    """
+    Generate the tables for the given result files,
+    and generate them again whenever some of the files change, until interrupted.
+    The patterns are expanded again each time, such that new result files are found,
+    and journals of run sets that are still running are used until the result file exists.
+    Only the changed result files are loaded again,
+    and statistics are computed again only for run sets whose results changed.
+    The tables are replaced atomically, such that readers never see incomplete tables.
+    @param result_patterns: the result files, possibly with wildcards
+    @param columns: the columns to show, or None for all columns of the result files
+    """
+    stamps = {}
+    # The RunSetResult of each result file together with its runs and attributes as loaded,
+    # because merging and creating the tables modifies them.
+    results = {}
+    stats_cache = StatsCache()
+
+    while True:
+        result_files = []
+        changed_files = []
+        for file in _find_watched_files(result_patterns):
+            stamp = _get_file_stamp(file)
+            if stamp is None:
+                continue # removed in the meantime
+            result_files.append(file)
+            if file not in stamps or stamp != stamps[file]:
+                changed_files.append((file, stamp))
+
+        removed_files = [file for file in stamps if file not in result_files]
+        for file in removed_files:
+            del stamps[file]
+            results.pop(file, None)
+
+        updated = bool(removed_files)
+        if changed_files:
+            updated = _reload_results(changed_files, columns, options, stamps, results) or updated
+
+        if updated:
+            runSetResults = []
+            for file in result_files:
+                if results.get(file):
+                    result, runs, attributes = results[file]
+                    result.results = list(runs)
+                    result.attributes = copy.deepcopy(attributes)
+                    runSetResults.append(result)
+
+            if runSetResults:
+                generate_tables(runSetResults, name, outputPath, outputFilePattern, options, stats_cache)
+                stats_cache.next_generation()
+                options.show_table = False # open tables only once
+            else:
+                logging.warning('No benchmark results found.')
+            logging.info('Waiting for changes of result files...')
+
+        time.sleep(options.watch)
+
+
+def _find_watched_files(result_patterns):
+    """
+    Expand the patterns of result files for watch_result_files().
+    A result file and the journal that is written while its run set is running
+    are treated as one input, and the result file is preferred once it exists.
+    Files that do not exist (yet) are silently ignored.
+    @return: a list of result files and journals
+    """
+    suffix = resultjournal.JOURNAL_FILE_SUFFIX
+    files = []
+    for pattern in result_patterns:
+        if Util.is_url(pattern) or resultdb.is_run_set_reference(pattern):
+            files.append(pattern)
+            continue
+        if pattern.endswith(suffix):
+            pattern = pattern[:-len(suffix)]
+        files_by_input = {}
+        for file in Util.get_file_list(pattern + suffix, warn_if_missing=False):
+            files_by_input[file[:-len(suffix)]] = file
+        for file in Util.get_file_list(pattern, warn_if_missing=False):
+            if not file.endswith(suffix):
+                files_by_input[file] = file
+        files.extend(file for unused_input, file in sorted(files_by_input.items()))
+    return list(collections.OrderedDict.fromkeys(files))
+
+
+def _reload_results(changed_files, columns, options, stamps, results):
+    """
+    Load the given changed result files for watch_result_files() and update stamps and results.
+    @return: whether any of the results changed
+    """
+    logging.info('Loading %s changed result file(s)...', len(changed_files))
+    columns_relevant_for_diff = _get_columns_relevant_for_diff(columns) if columns else set()
+    futures = [(file, stamp, parallel.submit(
+        _try_load_result, file, options, None, columns, columns_relevant_for_diff, True))
+        for file, stamp in changed_files]
+
+    updated = False
+    new_results = []
+    for file, stamp, future in futures:
+        result = future.result()
+        if result is False:
+            # probably the file is currently written, so we keep the old results
+            logging.warning("Could not load '%s', will try again later.", file)
+            continue
+        updated = True
+        stamps[file] = stamp
+        results[file] = None
+        if result is not None:
+            new_results.append((file, result))
+
+    collect_values_from_logs([result for unused_file, result in new_results], options.correct_only)
+    for file, result in new_results:
+        results[file] = (result, result.results, copy.deepcopy(result.attributes))
+
+    if options.cache_dir:
+        store_results_in_cache([result for unused_file, result in new_results], options)
+        resultcache.ResultCache(options.cache_dir).evict(options.cache_size * 1000 * 1000)
+    return updated
+
+
+def _get_file_stamp(file):
+    """
+    Return a value that changes whenever the given result file changes,
+    or None if the file does not exist.
+    """
+    if Util.is_url(file) or resultdb.is_run_set_reference(file):
+        return file # we cannot detect changes
+    try:
+        stat = os.stat(file)
+    except EnvironmentError:
+        return None
+    return (stat.st_size, stat.st_mtime)
+
+
+def _try_load_result(*args):
+    """Like load_result(), but return False instead of raising an exception if the result file is invalid."""
+    try:
+        return load_result(*args)
+    except Util.ResultFileError as e:
+        logging.warning('%s', e)
+        return False
 
 if __name__ == '__main__':
     sys.exit(main())
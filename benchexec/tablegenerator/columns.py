@@ -19,6 +19,8 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import collections
+import functools
 import re
 from math import floor, ceil, log10, isnan, isinf
 import logging
@@ -45,6 +47,10 @@ POSSIBLE_FORMAT_TARGETS = ['html', 'html_cell', 'tooltip', 'tooltip_stochastic',
 
 DEFAULT_NUMBER_OF_SIGNIFICANT_DIGITS = 3
 
+# Number of distinct cell values for which the result of parsing is cached
+# (values like counts or results of measurements with low precision repeat often).
+PARSE_CACHE_SIZE = 2 ** 16
+
 UNIT_CONVERSION = {
     's': {'ms': 1000, 'min': 1.0 / 60, 'h': 1.0 / 3600},
     'B': {'kB': 1.0 / 10 ** 3, 'MB': 1.0 / 10 ** 6, 'GB': 1.0 / 10 ** 9},
@@ -59,6 +65,39 @@ def enum(**enums):
     return type('Enum', (), enums)
 
 
+_ParsedNumber = collections.namedtuple('ParsedNumber',
+    'number_str number unit decimal_digits significant_digits')
+_ParsedNumber.__doc__ = """
+A cell value that is a number, with an optional unit:
+number_str is the value without unit, number its float value,
+decimal_digits the number of digits after the decimal point,
+and significant_digits the number of significant digits.
+"""
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_number(value):
+    """
+    Parse a cell value that consists of a number and an optional unit.
+    The results are cached, such that repeated values are parsed only once
+    for determining the column type and for formatting the value for all outputs.
+    @param value: the cell value as string
+    @return: a _ParsedNumber, or None if the value is not a number
+    """
+    match = REGEX_MEASURE.match(value)
+    if match is None:
+        return None
+    number_str = util.remove_unit(value.strip())
+    dec_part = match.group(GROUP_DEC_PART)
+    return _ParsedNumber(
+        number_str=number_str,
+        number=float(number_str),
+        unit=match.group(GROUP_UNIT),
+        decimal_digits=len(dec_part) - 1 if dec_part else 0, # - 1 since dec_part includes the point
+        significant_digits=_get_significant_digits(number_str),
+        )
+
+
 class ColumnEnumType(object):
 
     def __init__(self, _type, name):
@@ -184,8 +223,14 @@ class Column(object):
 
         # If the number ends with "s" or another unit, remove it.
         # Units should not occur in table cells, but in the table head.
-        number_str = util.remove_unit(str(value).strip())
-        number = float(number_str)
+        parsed = _parse_number(str(value))
+        if parsed:
+            number_str = parsed.number_str
+            number = parsed.number
+        else:
+            number_str = util.remove_unit(str(value).strip())
+            number = float(number_str)
+        original_number = number
 
         if isnan(number):
             return 'NaN'
@@ -209,11 +254,12 @@ class Column(object):
             max_dec_digits = self.type.max_decimal_digits
 
         if number_of_significant_digits is not None:
-            current_significant_digits = _get_significant_digits(number_str)
+            current_significant_digits = \
+                parsed.significant_digits if parsed else _get_significant_digits(number_str)
             return _format_number(number, current_significant_digits, number_of_significant_digits, max_dec_digits,
                                   isToAlign, format_target)
         else:
-            if number == float(number_str) or isnan(number) or isinf(number):
+            if number == original_number or isnan(number) or isinf(number):
                 # TODO remove as soon as scaled values are handled correctly
                 return number_str
             if int(number) == number:
@@ -395,13 +441,13 @@ def _get_column_type_heur(column, column_values):
         if value is None or value == '':
             continue
 
-        value_match = REGEX_MEASURE.match(str(value))
+        parsed_value = _parse_number(str(value))
 
         # As soon as one row's value is no number, the column type is 'text'
-        if value_match is None:
+        if parsed_value is None:
             return text_type_tuple
         else:
-            curr_column_unit = value_match.group(GROUP_UNIT)
+            curr_column_unit = parsed_value.unit
 
             # If the units in two different rows of the same column differ,
             # 1. Raise an error if an explicit unit is defined by the displayUnit attribute
@@ -426,25 +472,8 @@ def _get_column_type_heur(column, column_values):
             if column_scale_factor is None:
                 column_scale_factor = _get_scale_factor(column_unit, column_source_unit, column)
 
-            # Compute the number of decimal digits of the current value, considering the number of significant
-            # digits for this column.
-            # Use the column's scale factor for computing the decimal digits of the current value.
-            # Otherwise, they might be different from output.
-            scaled_value = float(util.remove_unit(str(value))) * column_scale_factor
-
-            # Due to the scaling operation above, floats in the exponent notation may be created. Since this creates
-            # special cases, immediately convert the value back to decimal notation.
-            if value_match.group(GROUP_DEC_PART):
-                dec_digits_before_scale = len(
-                    value_match.group(GROUP_DEC_PART)) - 1  # - 1 since GROUP_DEC_PART includes the point
-            else:
-                dec_digits_before_scale = 0
-            max_number_of_dec_digits_after_scale = max(0, dec_digits_before_scale - ceil(log10(column_scale_factor)))
-
-            scaled_value = "{0:.{1}f}".format(scaled_value, max_number_of_dec_digits_after_scale)
-            scaled_value_match = REGEX_MEASURE.match(scaled_value)
-
-            curr_dec_digits = _get_decimal_digits(scaled_value_match, column.number_of_significant_digits)
+            curr_dec_digits, scaled_value_is_integer = _get_scaled_decimal_digits(
+                parsed_value, column_scale_factor, column.number_of_significant_digits)
 
             try:
                 max_dec_digits = column_type.max_decimal_digits
@@ -455,9 +484,8 @@ def _get_column_type_heur(column, column_values):
                 max_dec_digits = curr_dec_digits
 
             if (column_type and column_type.type == ColumnType.measure) or \
-                    scaled_value_match.group(GROUP_DEC_PART) is not None or \
-                    value_match.group(GROUP_DEC_PART) is not None or \
-                    scaled_value_match.group(GROUP_SPECIAL_FLOATS_PART) is not None:
+                    not scaled_value_is_integer or \
+                    parsed_value.decimal_digits:
                 column_type = ColumnMeasureType(max_dec_digits)
 
             elif int(column_scale_factor) != column_scale_factor:
@@ -471,6 +499,32 @@ def _get_column_type_heur(column, column_values):
         return text_type_tuple
 
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _get_scaled_decimal_digits(parsed_value, scale_factor, number_of_significant_digits):
+    """
+    Compute the number of decimal digits of a value after scaling, considering the number of significant
+    digits for the column.
+    The scale factor needs to be used for computing the decimal digits of the value,
+    otherwise, they might be different from output.
+    @param parsed_value: the _ParsedNumber of the value
+    @return: a tuple of the number of decimal digits and whether the scaled value is an integer
+    """
+    scaled_value = parsed_value.number * scale_factor
+
+    # Due to the scaling operation above, floats in the exponent notation may be created. Since this creates
+    # special cases, immediately convert the value back to decimal notation.
+    max_number_of_dec_digits_after_scale = \
+        max(0, parsed_value.decimal_digits - ceil(log10(scale_factor)))
+
+    scaled_value = "{0:.{1}f}".format(scaled_value, max_number_of_dec_digits_after_scale)
+    scaled_value_match = REGEX_MEASURE.match(scaled_value)
+
+    curr_dec_digits = _get_decimal_digits(scaled_value_match, number_of_significant_digits)
+    scaled_value_is_integer = scaled_value_match.group(GROUP_DEC_PART) is None \
+        and scaled_value_match.group(GROUP_SPECIAL_FLOATS_PART) is None
+    return curr_dec_digits, scaled_value_is_integer
+
+
 # This function assumes that scale_factor is not defined.
 # Because of this, an error is raised if unit is defined, different from the source_unit, and
 # no conversion for these two units is known.
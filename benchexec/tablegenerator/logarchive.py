@@ -0,0 +1,233 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Access to the ZIP archives with log files that are written by benchexec.
+Archives are memory-mapped and their members are decompressed directly from the mapping.
+The index of the members of an archive (read from its central directory)
+is built only once per process and can additionally be kept in a cache directory,
+such that the central directory of huge archives does not need to be parsed repeatedly.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import logging
+import marshal
+import mmap
+import os
+import struct
+import zlib
+
+import benchexec.util
+from benchexec.tablegenerator import util as Util
+
+INDEX_FILE_SUFFIX = '.index'
+
+# Needs to be changed whenever the format of the index files changes
+_INDEX_FORMAT_VERSION = b'2'
+
+# Structure of the local file header of a member, cf. the ZIP specification
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_HEADER_SIGNATURE = b'PK\003\004'
+
+_ZIP_STORED = 0
+_ZIP_DEFLATED = 8
+
+# The directory for storing indices of archives, set by configure()
+_index_dir = None
+
+# Indices of archives that were used in this process
+_indices = {}
+
+
+def configure(directory):
+    """
+    Enable storing the indices of archives in the given directory
+    (which may be shared between processes).
+    @param directory: the cache directory, or None to keep indices only in memory
+    """
+    global _index_dir
+    _index_dir = directory
+
+
+def evict(directory, max_size):
+    """
+    Remove the least recently used index files from the given directory
+    until they use at most max_size bytes.
+    """
+    try:
+        names = os.listdir(directory)
+    except EnvironmentError:
+        return # no index was stored yet
+    entries = []
+    for name in names:
+        if name.endswith(INDEX_FILE_SUFFIX):
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except EnvironmentError:
+                continue # removed concurrently
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total_size = sum(size for unused_mtime, size, unused_name in entries)
+    for unused_mtime, size, name in sorted(entries):
+        if total_size <= max_size:
+            break
+        logging.debug("Evicting %s from cache of log-archive indices.", name)
+        try:
+            os.remove(os.path.join(directory, name))
+        except EnvironmentError:
+            pass
+        total_size -= size
+
+
+def open_archive(url):
+    """
+    Open a ZIP archive with log files.
+    @param url: the URL of the archive
+    @return: a LogArchive instance, which needs to be closed after use
+    """
+    f = Util.open_url_seekable(url, 'rb', random_access=True)
+    try:
+        return LogArchive(f, url)
+    except:
+        f.close()
+        raise
+
+
+class LogArchive(object):
+    """
+    A ZIP archive with log files, use open_archive() to create instances.
+    Archives that are not regular files (e.g., remote files that are read with range requests)
+    and members that are encrypted or compressed with other methods than deflate
+    are read with the module zipfile.
+    """
+
+    def __init__(self, file, url):
+        self._file = file
+        self._zip = None
+        self._mmap = None
+        self._index = None
+        try:
+            fileno = file.fileno()
+            stat = os.fstat(fileno)
+            self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except (AttributeError, io.UnsupportedOperation, EnvironmentError, ValueError):
+            self._get_zip() # not mappable, fail early for invalid archives
+            return
+        self._index = _get_index(file, url, stat)
+
+    def _get_zip(self):
+        if self._zip is None:
+            import zipfile
+            self._zip = zipfile.ZipFile(self._file)
+        return self._zip
+
+    def read(self, name):
+        """
+        Get the content of a member of the archive.
+        @param name: the name of the member
+        @return: the uncompressed content as bytes
+        @raise KeyError: if there is no such member
+        """
+        if self._index is None:
+            return self._get_zip().read(name)
+
+        header_offset, compress_type, compress_size, file_size, crc, encrypted = self._index[name]
+        if encrypted or compress_type not in (_ZIP_STORED, _ZIP_DEFLATED):
+            return self._get_zip().read(name)
+
+        header = self._mmap[header_offset:header_offset + _LOCAL_HEADER.size]
+        if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+            raise _bad_zip_file('Bad magic number for file header of {!r}'.format(name))
+        name_length, extra_length = _LOCAL_HEADER.unpack(header)[-2:]
+        start = header_offset + _LOCAL_HEADER.size + name_length + extra_length
+
+        content = self._mmap[start:start + compress_size]
+        if compress_type == _ZIP_DEFLATED:
+            content = zlib.decompress(content, -zlib.MAX_WBITS, max(file_size, 1))
+        if len(content) != file_size or zlib.crc32(content) != crc:
+            raise _bad_zip_file('Bad CRC-32 for file {!r}'.format(name))
+        return content
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+def _bad_zip_file(message):
+    import zipfile
+    return zipfile.BadZipFile(message)
+
+
+def _get_index(file, url, stat):
+    """
+    Get the index of an archive, which maps the name of each member
+    to a tuple of header offset, compression type, compressed size, size, CRC,
+    and whether the member is encrypted.
+    """
+    key = (url, stat.st_size, stat.st_mtime)
+    index = _indices.get(key)
+    if index is not None:
+        return index
+
+    index_file = None
+    if _index_dir:
+        import hashlib
+        key_hash = hashlib.sha256(_INDEX_FORMAT_VERSION)
+        key_hash.update(repr(key).encode('utf-8'))
+        index_file = os.path.join(_index_dir, key_hash.hexdigest() + INDEX_FILE_SUFFIX)
+        try:
+            with open(index_file, 'rb') as f:
+                index = marshal.load(f)
+            os.utime(index_file, None) # mark as recently used for eviction
+            logging.debug("Using index of log archive %s from cache.", url)
+        except (IOError, EOFError, ValueError, TypeError):
+            pass
+
+    if index is None:
+        import zipfile
+        with zipfile.ZipFile(file) as log_zip:
+            index = {
+                info.filename: (info.header_offset, info.compress_type, info.compress_size,
+                                info.file_size, info.CRC, bool(info.flag_bits & 0x1))
+                for info in log_zip.infolist()}
+        if index_file:
+            _write_index_file(index_file, index)
+
+    _indices[key] = index
+    return index
+
+
+def _write_index_file(index_file, index):
+    tmp_file = index_file + '.{}.tmp'.format(os.getpid())
+    try:
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            marshal.dump(index, f)
+        benchexec.util.replace_file(tmp_file, index_file)
+    except (IOError, ValueError) as e:
+        logging.debug("Could not store index of log archive in %s: %s", index_file, e)
+        try:
+            os.remove(tmp_file)
+        except EnvironmentError:
+            pass
@@ -0,0 +1,392 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Detection of statistically significant differences in resource consumption
+between two groups of result sets (baseline and candidate),
+each of which may consist of several repetitions of the same benchmark.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import collections
+import json
+import logging
+import math
+import os
+import random
+
+from benchexec import tablegenerator
+from benchexec.tablegenerator import util as Util
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Columns that are compared (if present in all result sets)
+REGRESSION_COLUMNS = ['cputime', 'walltime', 'memUsage']
+
+# Number of bootstrap samples for computing confidence intervals
+BOOTSTRAP_SAMPLES = 1000
+
+CONFIDENCE_LEVEL = 0.95
+
+REPORT_FILE_PATTERN = '{name}.regression.{ext}'
+HTML_TEMPLATE_FORMAT = 'regression.html'
+
+
+def analyze(baselineResults, candidateResults, rows, threshold,
+            confidence=CONFIDENCE_LEVEL, samples=BOOTSTRAP_SAMPLES, seed=0):
+    """
+    Compare the resource consumption of each task between baseline and candidate results.
+    Differences are relative to the baseline (0.1 means that the candidate needs 10% more).
+    Confidence intervals are computed with the bootstrap method
+    by resampling the result sets (repetitions) of each group with replacement,
+    such that the same resampled repetitions are used for all tasks
+    and the confidence interval of the aggregate difference (over all tasks) is consistent.
+    @param baselineResults: the RunSetResults of the baseline
+    @param candidateResults: the RunSetResults of the candidate
+    @param rows: the merged rows of all results, baseline results first
+    @param threshold: the minimal relative difference for a significant slowdown or speedup
+    @param seed: the seed for the random choices of the bootstrap samples
+    @return: a report as dict that can be converted to JSON
+    """
+    base_count = len(baselineResults)
+    cand_count = len(candidateResults)
+    run_sets = baselineResults + candidateResults
+    rng = random.Random(seed)
+    base_draws = _draw_resamples(base_count, samples, rng)
+    cand_draws = _draw_resamples(cand_count, samples, rng)
+    resampling = _Resampling(base_draws, cand_draws)
+    quantiles = ((1 - confidence) / 2, (1 + confidence) / 2)
+
+    columns = collections.OrderedDict()
+    tasks = [collections.OrderedDict([('task', row.filename), ('properties', row.id[1])])
+             for row in rows]
+    for title in REGRESSION_COLUMNS:
+        indices = [_get_column_index(run_set, title) for run_set in run_sets]
+        if None in indices:
+            logging.debug("Column %s is not present in all results.", title)
+            continue
+
+        values = [[_get_float(row.results[i], index) for i, index in enumerate(indices)]
+                  for row in rows]
+        base_values = [v[:base_count] for v in values]
+        cand_values = [v[base_count:] for v in values]
+        task_stats = _compute_task_statistics(base_values, cand_values, resampling, quantiles)
+        aggregate = _compute_aggregate(base_values, cand_values, resampling, quantiles)
+
+        slowdowns = speedups = 0
+        for task, base, cand, (base_mean, cand_mean, difference, low, high) \
+                in zip(tasks, base_values, cand_values, task_stats):
+            has_repetitions = _count_present(base) >= 2 and _count_present(cand) >= 2
+            slower = has_repetitions and low is not None and low > threshold
+            faster = has_repetitions and high is not None and high < -threshold
+            slowdowns += slower
+            speedups += faster
+            task[title] = collections.OrderedDict([
+                ('baseline', base_mean),
+                ('candidate', cand_mean),
+                ('difference', difference),
+                ('confidence_interval', [low, high]),
+                ('significant_slowdown', slower),
+                ('significant_speedup', faster),
+                ])
+
+        aggregate['significant_slowdowns'] = slowdowns
+        aggregate['significant_speedups'] = speedups
+        columns[title] = aggregate
+
+    return collections.OrderedDict([
+        ('baseline', [Util.prettylist(r.attributes.get('filename')) for r in baselineResults]),
+        ('candidate', [Util.prettylist(r.attributes.get('filename')) for r in candidateResults]),
+        ('confidence_level', confidence),
+        ('threshold', threshold),
+        ('bootstrap_samples', samples),
+        ('columns', columns),
+        ('tasks', tasks),
+        ])
+
+
+def count_slowdowns(report):
+    """Return the number of significant slowdowns (over all tasks and columns) in a report."""
+    return sum(column['significant_slowdowns'] for column in report['columns'].values())
+
+
+def write_report(report, outputPath, name):
+    """
+    Write a report as JSON file and as HTML table with the significant differences highlighted.
+    @return: the names of the written files
+    """
+    json_file = os.path.join(outputPath, REPORT_FILE_PATTERN.format(name=name, ext='json'))
+    html_file = os.path.join(outputPath, REPORT_FILE_PATTERN.format(name=name, ext='html'))
+    logging.info('Writing regression report into %s and %s ...', json_file, html_file)
+    Util.write_file_atomically(json.dumps(report, indent=1) + '\n', json_file)
+
+    def significance(task):
+        # significant changes first, then larger slowdowns first
+        stats = [task[title] for title in report['columns']]
+        return (not any(s['significant_slowdown'] for s in stats),
+                not any(s['significant_speedup'] for s in stats),
+                -max([s['difference'] for s in stats if s['difference'] is not None] or [0]))
+    tablegenerator.write_table_in_format(HTML_TEMPLATE_FORMAT, html_file, {
+        'title': name,
+        'version': tablegenerator.__version__,
+        'report': report,
+        'tasks': sorted(report['tasks'], key=significance),
+        'format_number': _format_number,
+        'format_difference': _format_difference,
+        }, False)
+    return json_file, html_file
+
+
+def _format_number(value):
+    return '' if value is None else '{:.4g}'.format(value)
+
+
+def _format_difference(value):
+    return '' if value is None else '{:+.1f}%'.format(value * 100)
+
+
+def _get_column_index(run_set, title):
+    for index, column in enumerate(run_set.columns):
+        if column.title == title:
+            return index
+    return None
+
+
+def _get_float(run_result, index):
+    try:
+        number = run_result.get_number(index)
+    except ArithmeticError:
+        return None
+    if number is None or not number.is_finite():
+        return None
+    return float(number)
+
+
+def _count_present(values):
+    return sum(value is not None for value in values)
+
+
+def _mean(values):
+    present = [value for value in values if value is not None]
+    return math.fsum(present) / len(present) if present else None
+
+
+def _relative_difference(base, cand):
+    if base is None or cand is None or base == 0:
+        return None
+    return cand / base - 1
+
+
+def _draw_resamples(count, samples, rng):
+    """
+    Draw bootstrap resamples of a group of repetitions.
+    @return: a list of resamples, each a sorted tuple of indices of the repetitions
+    """
+    return [tuple(sorted(rng.randrange(count) for unused_i in range(count)))
+            for unused_j in range(samples)]
+
+
+class _Resampling(object):
+    """
+    The bootstrap resamples of both groups.
+    The same resample occurs often, so the means of each task are computed only once
+    per distinct resample, and each pair of baseline and candidate resample is weighted
+    by how often it was drawn.
+    """
+
+    def __init__(self, base_draws, cand_draws):
+        self.base_resamples = sorted(set(base_draws))
+        self.cand_resamples = sorted(set(cand_draws))
+        base_positions = {r: i for i, r in enumerate(self.base_resamples)}
+        cand_positions = {r: i for i, r in enumerate(self.cand_resamples)}
+        pairs = collections.Counter(zip(base_draws, cand_draws))
+        self.pairs = [(base_positions[b], cand_positions[c]) for b, c in pairs]
+        self.weights = list(pairs.values())
+
+
+def _weighted_quantiles(values, weights, quantiles):
+    """
+    Compute quantiles of a distribution given as values with weights,
+    each quantile is the smallest value such that the values up to it have at least this share.
+    Values that are None are ignored.
+    """
+    present = sorted((v, w) for v, w in zip(values, weights) if v is not None)
+    total = sum(w for unused_v, w in present)
+    if not total:
+        return [None] * len(quantiles)
+    result = []
+    for quantile in quantiles:
+        cumulated = 0
+        for value, weight in present:
+            cumulated += weight
+            if cumulated >= quantile * total:
+                break
+        result.append(value)
+    return result
+
+
+def _compute_task_statistics(base_values, cand_values, resampling, quantiles):
+    """
+    Compute the means, relative difference, and confidence interval for each task.
+    @return: a list of tuples (baseline mean, candidate mean, difference, lower bound, upper bound)
+    """
+    if numpy and base_values:
+        return _compute_task_statistics_vectorized(base_values, cand_values, resampling, quantiles)
+
+    stats = []
+    for base, cand in zip(base_values, cand_values):
+        base_mean = _mean(base)
+        cand_mean = _mean(cand)
+        base_means = [_mean([base[i] for i in r]) for r in resampling.base_resamples]
+        cand_means = [_mean([cand[i] for i in r]) for r in resampling.cand_resamples]
+        differences = [_relative_difference(base_means[b], cand_means[c])
+                       for b, c in resampling.pairs]
+        low, high = _weighted_quantiles(differences, resampling.weights, quantiles)
+        stats.append(
+            (base_mean, cand_mean, _relative_difference(base_mean, cand_mean), low, high))
+    return stats
+
+
+def _compute_task_statistics_vectorized(base_values, cand_values, resampling, quantiles):
+    """Version of _compute_task_statistics that computes with arrays over all tasks."""
+    base = numpy.array(base_values, dtype=float) # None becomes nan
+    cand = numpy.array(cand_values, dtype=float)
+    base_indices, cand_indices = (numpy.array(x, dtype=int) for x in zip(*resampling.pairs))
+    weights = numpy.array(resampling.weights, dtype=float)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        base_mean = _resample_means(base, [range(base.shape[1])])[:, 0]
+        cand_mean = _resample_means(cand, [range(cand.shape[1])])[:, 0]
+        point_difference = _relative_differences(base_mean, cand_mean)
+        differences = _relative_differences(
+            _resample_means(base, resampling.base_resamples)[:, base_indices],
+            _resample_means(cand, resampling.cand_resamples)[:, cand_indices])
+    bounds = _weighted_quantiles_vectorized(differences, weights, quantiles)
+
+    return list(zip(_to_list(base_mean), _to_list(cand_mean), _to_list(point_difference),
+                    *map(_to_list, bounds)))
+
+
+def _resample_means(values, resamples):
+    """
+    Return an array with the mean of each task (rows of values) for each resample (columns),
+    nan values are ignored.
+    """
+    result = numpy.empty((values.shape[0], len(resamples)))
+    for i, resample in enumerate(resamples):
+        selected = values[:, list(resample)]
+        result[:, i] = numpy.nansum(selected, axis=1) / (~numpy.isnan(selected)).sum(axis=1)
+    return result
+
+
+def _relative_differences(base, cand):
+    """Version of _relative_difference for arrays, with nan instead of None."""
+    difference = cand / base - 1
+    difference[~numpy.isfinite(difference)] = numpy.nan
+    return difference
+
+
+def _weighted_quantiles_vectorized(values, weights, quantiles):
+    """
+    Version of _weighted_quantiles that computes the quantiles of each row of an array,
+    nan values are ignored.
+    @return: a list with an array for each quantile
+    """
+    # nan values are sorted last and have no weight
+    order = numpy.argsort(values, axis=1)
+    sorted_values = numpy.take_along_axis(values, order, axis=1)
+    sorted_weights = numpy.take_along_axis(
+        numpy.where(numpy.isnan(values), 0, weights[numpy.newaxis, :]), order, axis=1)
+    cumulated = numpy.cumsum(sorted_weights, axis=1)
+    total = cumulated[:, -1:]
+    rows = numpy.arange(values.shape[0])
+    result = []
+    for quantile in quantiles:
+        positions = numpy.argmax(cumulated >= quantile * total, axis=1)
+        bound = sorted_values[rows, positions]
+        bound[total[:, 0] == 0] = numpy.nan
+        result.append(bound)
+    return result
+
+
+def _to_list(array):
+    return [None if math.isnan(v) else float(v) for v in array]
+
+
+def _compute_aggregate(base_values, cand_values, resampling, quantiles):
+    """
+    Compute the relative difference of the sums over all tasks that have values
+    in all repetitions, and its confidence interval.
+    """
+    complete_base = []
+    complete_cand = []
+    for base, cand in zip(base_values, cand_values):
+        if None not in base and None not in cand:
+            complete_base.append(base)
+            complete_cand.append(cand)
+
+    base_sum = cand_sum = low = high = None
+    if complete_base and numpy:
+        base_sum, cand_sum, low, high = _compute_aggregate_vectorized(
+            complete_base, complete_cand, resampling, quantiles)
+    elif complete_base:
+        base_sum = math.fsum(map(_mean, complete_base))
+        cand_sum = math.fsum(map(_mean, complete_cand))
+
+        def sums(values, resamples):
+            return [math.fsum(_mean([v[i] for i in r]) for v in values) for r in resamples]
+        base_sums = sums(complete_base, resampling.base_resamples)
+        cand_sums = sums(complete_cand, resampling.cand_resamples)
+        differences = [_relative_difference(base_sums[b], cand_sums[c])
+                       for b, c in resampling.pairs]
+        low, high = _weighted_quantiles(differences, resampling.weights, quantiles)
+
+    return collections.OrderedDict([
+        ('tasks', len(complete_base)),
+        ('baseline', base_sum),
+        ('candidate', cand_sum),
+        ('difference', _relative_difference(base_sum, cand_sum)),
+        ('confidence_interval', [low, high]),
+        ])
+
+
+def _compute_aggregate_vectorized(base_values, cand_values, resampling, quantiles):
+    """
+    Version of the computation in _compute_aggregate with arrays,
+    for tasks that have values in all repetitions.
+    @return: a tuple (baseline sum, candidate sum, lower bound, upper bound)
+    """
+    base = numpy.array(base_values, dtype=float)
+    cand = numpy.array(cand_values, dtype=float)
+    base_indices, cand_indices = (numpy.array(x, dtype=int) for x in zip(*resampling.pairs))
+    weights = numpy.array(resampling.weights, dtype=float)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        base_sum = _resample_means(base, [range(base.shape[1])]).sum()
+        cand_sum = _resample_means(cand, [range(cand.shape[1])]).sum()
+        base_sums = _resample_means(base, resampling.base_resamples).sum(axis=0)
+        cand_sums = _resample_means(cand, resampling.cand_resamples).sum(axis=0)
+        differences = _relative_differences(base_sums[base_indices], cand_sums[cand_indices])
+    low, high = _weighted_quantiles_vectorized(differences[numpy.newaxis, :], weights, quantiles)
+
+    return (float(base_sum), float(cand_sum)) + tuple(_to_list(low) + _to_list(high))
@@ -0,0 +1,427 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Access to result files and log archives on HTTP(S) servers,
+with reused connections, concurrent downloads, a cache on disk,
+and reading parts of files with range requests.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import collections
+import contextlib
+import errno
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import urllib.error
+import urllib.parse
+
+import benchexec.util
+
+# Maximal number of idle connections that are kept open per server
+MAX_IDLE_CONNECTIONS = 8
+
+# Number of files that are downloaded concurrently by prefetch()
+PREFETCH_THREADS = 8
+
+# Number of bytes that are requested at once when reading parts of a file with range requests
+RANGE_BLOCK_SIZE = 64 * 1024
+
+MAX_REDIRECTS = 5
+
+TIMEOUT = 60 # seconds
+
+DATA_FILE_SUFFIX = ".cache"
+META_FILE_SUFFIX = ".meta"
+
+_REGEX_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+# Errors of requests on connections that were closed by the server
+_CONNECTION_CLOSED_ERRNOS = (errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED)
+
+# The RemoteFiles instance used by open_url() and prefetch(), set by configure()
+_remote_files = None
+
+
+def configure(directory):
+    """
+    Enable access to remote files through a cache in the given directory
+    (which may be shared between processes).
+    This needs to be called in each process, e.g., as initializer of a process pool.
+    @param directory: the cache directory, or None to disable this kind of access
+    """
+    global _remote_files
+    _remote_files = RemoteFiles(directory) if directory else None
+
+
+def open_url(url, random_access=False):
+    """
+    Open a remote file if access to remote files is configured.
+    @param random_access: whether only small parts of the file will be read,
+        such that they may be retrieved with range requests instead of downloading the whole file
+    @return: a seekable binary file-like object, or None if the URL is not handled
+    """
+    if _remote_files and is_supported_url(url):
+        return _remote_files.open(url, random_access)
+    return None
+
+
+def prefetch(urls):
+    """
+    Download the given files concurrently into the cache if access to remote files is configured,
+    such that they can later be opened quickly (also by other processes).
+    URLs that are not supported are ignored.
+    """
+    if _remote_files:
+        _remote_files.prefetch(urls)
+
+
+def evict(directory, max_size):
+    """
+    Remove the least recently used files from the cache in the given directory
+    until the cache uses at most max_size bytes.
+    The data and meta files of each remote file are removed together.
+    """
+    try:
+        names = os.listdir(directory)
+    except EnvironmentError:
+        return # nothing was downloaded yet
+    entries = {}
+    for name in names:
+        entry_name, suffix = os.path.splitext(name)
+        if suffix in (DATA_FILE_SUFFIX, META_FILE_SUFFIX):
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except EnvironmentError:
+                continue # removed concurrently
+            mtime, size, files = entries.get(entry_name, (None, 0, []))
+            if suffix == DATA_FILE_SUFFIX:
+                mtime = stat.st_mtime
+            # data file first, such that entries without data file are never used
+            files.insert(0 if suffix == DATA_FILE_SUFFIX else len(files), name)
+            entries[entry_name] = (mtime, size + stat.st_size, files)
+
+    total_size = sum(size for unused_mtime, size, unused_files in entries.values())
+    # meta files without data file are useless and sorted first
+    for mtime, size, files in sorted(entries.values(), key=lambda e: (e[0] is not None, e[0] or 0)):
+        if total_size <= max_size and mtime is not None:
+            break
+        logging.debug("Evicting %s from cache of remote files.", files[0])
+        for name in files:
+            try:
+                os.remove(os.path.join(directory, name))
+            except EnvironmentError:
+                pass
+        total_size -= size
+
+
+def is_supported_url(url):
+    """Check whether a URL points to a file that can be retrieved with this module."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        return False
+    from urllib.request import getproxies, proxy_bypass
+    # requests via proxies are left to urllib
+    return not getproxies().get(parts.scheme) or proxy_bypass(parts.hostname or '')
+
+
+class _RangesNotSupported(Exception):
+    pass
+
+
+class ConnectionPool(object):
+    """
+    A pool of HTTP(S) connections, such that connections to the same server are reused.
+    This class is thread-safe.
+    """
+
+    def __init__(self, max_idle_connections=MAX_IDLE_CONNECTIONS):
+        self.max_idle_connections = max_idle_connections
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def get(self, url, headers={}):
+        """
+        Send a GET request (following redirects) and provide the response.
+        The connection is returned to the pool afterwards if the response was read completely.
+        Errors of the server are not handled here, the status of the response needs to be checked.
+        Invalid or truncated responses (also while reading the response)
+        are reported as IOError like other network errors.
+        """
+        import http.client
+        try:
+            for unused_i in range(MAX_REDIRECTS + 1):
+                parts = urllib.parse.urlsplit(url)
+                key = (parts.scheme, parts.netloc)
+                path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+                connection, response = self._send(key, path, headers)
+
+                try:
+                    location = response.getheader('Location')
+                    if response.status in (301, 302, 303, 307, 308) and location:
+                        response.read()
+                        url = urllib.parse.urljoin(url, location)
+                    else:
+                        yield response
+                        location = None
+                except:
+                    connection.close()
+                    raise
+                self._release(key, connection, response)
+                if not location:
+                    return
+        except http.client.HTTPException as e:
+            raise IOError("Invalid response for '{}': {!r}".format(url, e)) from e
+
+        raise IOError("Too many redirects for {}".format(url))
+
+    def _send(self, key, path, headers):
+        import http.client
+        while True:
+            with self._lock:
+                idle = self._idle[key]
+                connection = idle.pop() if idle else None
+            reused = connection is not None
+            scheme, netloc = key
+            if not reused:
+                connection_class = \
+                    http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+                connection = connection_class(netloc, timeout=TIMEOUT)
+
+            try:
+                logging.debug("Making request to '%s://%s%s'", scheme, netloc, path)
+                connection.request('GET', path, headers=headers)
+                return connection, connection.getresponse()
+            except (http.client.BadStatusLine, EnvironmentError) as e:
+                connection.close()
+                if not reused or not (isinstance(e, http.client.BadStatusLine)
+                                      or e.errno in _CONNECTION_CLOSED_ERRNOS):
+                    raise
+                # the server has closed an idle connection, try again with another one
+            except:
+                connection.close()
+                raise
+
+    def _release(self, key, connection, response):
+        if not response.isclosed() or response.will_close:
+            connection.close()
+            return
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_connections:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for connection in idle:
+                    connection.close()
+            self._idle.clear()
+
+
+class RemoteFiles(object):
+    """
+    Remote files that are downloaded into a cache on disk.
+    Files in the cache are validated with the server (using ETag or Last-Modified)
+    once per process before they are used.
+    The cache directory may be used by several processes concurrently.
+    This class is thread-safe.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._pool = ConnectionPool()
+        self._validated = set() # URLs of files that are known to be up to date
+        self._lock = threading.Lock()
+
+    def _get_entry_files(self, url):
+        import hashlib
+        name = os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+        return name + DATA_FILE_SUFFIX, name + META_FILE_SUFFIX
+
+    def fetch(self, url):
+        """
+        Make sure that an up-to-date copy of a remote file is in the cache.
+        @return: the name of the file in the cache
+        """
+        data_file, meta_file = self._get_entry_files(url)
+        with self._lock:
+            if url in self._validated:
+                return data_file
+
+        meta = {}
+        if os.path.exists(data_file):
+            try:
+                with open(meta_file) as f:
+                    meta = json.load(f)
+            except (IOError, ValueError):
+                pass
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        with self._pool.get(url, headers) as response:
+            if response.status == 304 and headers:
+                response.read()
+                logging.debug("Cached copy of '%s' is up to date.", url)
+                try:
+                    os.utime(data_file, None) # mark as recently used for eviction
+                except EnvironmentError:
+                    pass
+            elif response.status == 200:
+                os.makedirs(self.directory, exist_ok=True)
+                meta = {'url': url,
+                        'etag': response.getheader('ETag'),
+                        'last_modified': response.getheader('Last-Modified')}
+                # write to temporary files first such that no incomplete entries can be read
+                tmp_suffix = '.{}.{}.tmp'.format(os.getpid(), threading.get_ident())
+                try:
+                    with open(data_file + tmp_suffix, 'wb') as f:
+                        shutil.copyfileobj(response, f)
+                    if response.length:
+                        # reading in chunks does not detect if the connection was closed early
+                        raise IOError("Incomplete download of '{}', {} bytes are missing."
+                                      .format(url, response.length))
+                    with open(meta_file + tmp_suffix, 'w') as f:
+                        json.dump(meta, f)
+                    benchexec.util.replace_file(data_file + tmp_suffix, data_file)
+                    benchexec.util.replace_file(meta_file + tmp_suffix, meta_file)
+                finally:
+                    for tmp_file in [data_file + tmp_suffix, meta_file + tmp_suffix]:
+                        if os.path.exists(tmp_file):
+                            os.remove(tmp_file)
+            else:
+                response.read()
+                raise urllib.error.HTTPError(
+                    url, response.status, response.reason, response.headers, None)
+
+        with self._lock:
+            self._validated.add(url)
+        return data_file
+
+    def open(self, url, random_access=False):
+        """
+        Open a remote file, which is downloaded into the cache if necessary.
+        @param random_access: whether only small parts of the file will be read,
+            such that they can be retrieved with range requests if the file is not yet cached
+        @return: a seekable binary file-like object
+        """
+        if random_access and url not in self._validated \
+                and not os.path.exists(self._get_entry_files(url)[0]):
+            try:
+                return _RangeFile(self._pool, url)
+            except _RangesNotSupported:
+                logging.debug("Server does not support range requests for '%s'.", url)
+        return open(self.fetch(url), 'rb')
+
+    def prefetch(self, urls):
+        """
+        Download the given files concurrently into the cache.
+        Errors are ignored here, they are reported when the files are opened.
+        """
+        urls = [url for url in collections.OrderedDict.fromkeys(urls) if is_supported_url(url)]
+        if not urls:
+            return
+        logging.debug("Prefetching %s remote files.", len(urls))
+
+        def try_fetch(url):
+            try:
+                self.fetch(url)
+            except IOError as e:
+                logging.debug("Could not prefetch '%s': %s", url, e)
+
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor(max_workers=PREFETCH_THREADS) as executor:
+            list(executor.map(try_fetch, urls))
+
+
+class _RangeFile(io.RawIOBase):
+    """
+    A seekable file-like object for a remote file that is read with HTTP range requests,
+    such that only the parts of the file that are actually used are retrieved.
+    """
+
+    def __init__(self, pool, url):
+        super(_RangeFile, self).__init__()
+        self._pool = pool
+        self.url = url
+        self._pos = 0
+        # Start with the end of the file, this is where ZIP archives have their index.
+        self._buffer_start, self._buffer, self._size = \
+            self._request('bytes=-{}'.format(RANGE_BLOCK_SIZE))
+
+    def _request(self, byte_range):
+        with self._pool.get(self.url, {'Range': byte_range}) as response:
+            match = _REGEX_CONTENT_RANGE.match(response.getheader('Content-Range') or '')
+            if response.status != 206 or not match:
+                if response.status >= 400 and response.status != 416:
+                    response.read()
+                    raise urllib.error.HTTPError(
+                        self.url, response.status, response.reason, response.headers, None)
+                raise _RangesNotSupported()
+            data = response.read()
+        return int(match.group(1)), data, int(match.group(3))
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError("Negative seek position {}".format(offset))
+        self._pos = offset
+        return offset
+
+    def readinto(self, b):
+        count = min(len(b), self._size - self._pos)
+        if count <= 0:
+            return 0
+        offset = self._pos - self._buffer_start
+        if offset < 0 or offset + count > len(self._buffer):
+            end = min(self._size, self._pos + max(count, RANGE_BLOCK_SIZE))
+            try:
+                self._buffer_start, self._buffer, unused_size = \
+                    self._request('bytes={}-{}'.format(self._pos, end - 1))
+            except _RangesNotSupported:
+                raise IOError("Range request for '{}' failed.".format(self.url))
+            offset = self._pos - self._buffer_start
+            count = min(count, len(self._buffer) - offset)
+        b[:count] = self._buffer[offset:offset + count]
+        self._pos += count
+        return count
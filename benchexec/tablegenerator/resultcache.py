@@ -0,0 +1,175 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import logging
+import os
+import tempfile
+import zlib
+
+from benchexec import __version__
+import benchexec.util
+from benchexec.tablegenerator import util as Util
+
+# Increase this if the stored data changes in an incompatible way.
+CACHE_FORMAT_VERSION = 3
+
+CACHE_FILE_SUFFIX = ".cache"
+
+DEFAULT_CACHE_SIZE = 1000 # MB
+
+
+class ResultCache(object):
+    """
+    A cache on disk for the fully loaded results of result files,
+    such that result files need neither be parsed nor have their log files read again
+    if the same table is generated another time.
+    There is one entry per result file and set of parameters for loading it,
+    it is valid as long as size, modification time, and content hash of the result file match.
+    The cache can be used from several processes concurrently.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, result_file, parameters):
+        """
+        Compute the key for the results of a given result file.
+        @param result_file: the name of the result file
+        @param parameters: all parameters that influence the loaded results
+        @return: the key, or None if the results of this file cannot be cached
+        """
+        if Util.is_url(result_file) or not os.path.isfile(result_file):
+            return None
+        path = os.path.abspath(result_file)
+        try:
+            stat = os.stat(path)
+            content_hash = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024*1024), b''):
+                    content_hash.update(block)
+        except EnvironmentError as e:
+            logging.debug("Not caching results of %s: %s", result_file, e)
+            return None
+
+        entry_name = hashlib.sha256(
+            repr((CACHE_FORMAT_VERSION, __version__, path, _describe(parameters)))
+            .encode('utf-8')).hexdigest()
+        stamp = (stat.st_size, stat.st_mtime, content_hash.hexdigest())
+        return (entry_name, stamp)
+
+    def _get_entry_file(self, key):
+        return os.path.join(self.directory, key[0] + CACHE_FILE_SUFFIX)
+
+    def load(self, key):
+        """
+        Return the cached results for the given key, or None if there are none.
+        Outdated and invalid entries are removed.
+        """
+        entry_file = self._get_entry_file(key)
+        try:
+            with open(entry_file, 'rb') as f:
+                data = f.read()
+        except EnvironmentError:
+            return None
+
+        import pickle
+        try:
+            stamp, results = pickle.loads(zlib.decompress(data))
+        except Exception as e:
+            logging.warning("Removing invalid entry %s from result cache: %s", entry_file, e)
+            _remove_file(entry_file)
+            return None
+
+        if stamp != key[1]:
+            logging.debug("Removing outdated entry %s from result cache.", entry_file)
+            _remove_file(entry_file)
+            return None
+
+        try:
+            os.utime(entry_file, None) # mark as recently used for eviction
+        except EnvironmentError:
+            pass
+        return results
+
+    def store(self, key, results):
+        """
+        Store the results for the given key, replacing any existing entry.
+        """
+        import pickle
+        data = zlib.compress(pickle.dumps((key[1], results), pickle.HIGHEST_PROTOCOL))
+        tmp_file = None
+        try:
+            # write to temporary file first such that no incomplete entries can be read
+            with tempfile.NamedTemporaryFile(
+                    dir=self.directory, suffix='.tmp', delete=False) as f:
+                tmp_file = f.name
+                f.write(data)
+            benchexec.util.replace_file(tmp_file, self._get_entry_file(key))
+        except EnvironmentError as e:
+            logging.warning("Could not write to result cache %s: %s", self.directory, e)
+            if tmp_file:
+                _remove_file(tmp_file)
+
+    def evict(self, max_size):
+        """
+        Remove the least recently used entries until the cache uses at most max_size bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_FILE_SUFFIX):
+                entry_file = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(entry_file)
+                except EnvironmentError:
+                    continue # removed concurrently
+                entries.append((stat.st_mtime, stat.st_size, entry_file))
+
+        total_size = sum(size for unused_mtime, size, unused_file in entries)
+        for unused_mtime, size, entry_file in sorted(entries):
+            if total_size <= max_size:
+                break
+            logging.debug("Evicting entry %s from result cache.", entry_file)
+            _remove_file(entry_file)
+            total_size -= size
+
+
+def _describe(value):
+    """
+    Create a string that describes a value including all attributes of contained objects,
+    such that it can be used as part of a cache key.
+    """
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_describe(v) for v in value) + "]"
+    elif isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(_describe(v) for v in value)) + "}"
+    elif hasattr(value, '__dict__'):
+        return type(value).__name__ + _describe(sorted(
+            (attr, str(v)) for attr, v in vars(value).items()))
+    return repr(value)
+
+
+def _remove_file(name):
+    try:
+        os.remove(name)
+    except EnvironmentError:
+        pass
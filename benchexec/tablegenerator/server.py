@@ -0,0 +1,308 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A local HTTP server that answers queries about loaded results with JSON,
+as an alternative to generating tables for exploring large results interactively.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from decimal import Decimal, InvalidOperation
+import http.server
+import json
+import logging
+import socketserver
+import urllib.parse
+
+from benchexec import tablegenerator
+from benchexec.tablegenerator import util as Util
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10000
+
+# Names of the statistics returned by get_stats_of_run_set, in the same order
+STATS_NAMES = ['total', 'correct', 'correct_true', 'correct_false',
+               'correct_unconfirmed', 'correct_unconfirmed_true', 'correct_unconfirmed_false',
+               'incorrect', 'wrong_true', 'wrong_false', 'score']
+
+
+class QueryError(ValueError):
+    """Exception for invalid queries, the message is sent to the client."""
+    pass
+
+
+class ResultTable(object):
+    """
+    The merged results of several run sets, and the queries that can be made about them.
+    All queries select a set of rows with the following (optional) parameters:
+    task (substring of the task name), category (category of the result of a run),
+    runset (index of the run set for the category, by default any run set matches),
+    diff (if "true", only rows with different results),
+    sort (column to sort by in the form RUNSET:TITLE), and order ("asc" or "desc").
+    """
+
+    def __init__(self, runSetResults, rows, correct_only=False):
+        self.run_sets = runSetResults
+        self.rows = rows
+        self.correct_only = correct_only
+        self._rows_with_differences = None
+
+    def describe(self):
+        """Return the run sets and their columns."""
+        return {
+            'rows': len(self.rows),
+            'runsets': [{
+                'name': Util.prettylist(
+                    run_set.attributes.get('name') or run_set.attributes.get('benchmarkname')),
+                'filename': Util.prettylist(run_set.attributes.get('filename')),
+                'columns': [{
+                    'title': column.title,
+                    'type': str(column.type.type) if column.type else None,
+                    'unit': column.unit,
+                    } for column in run_set.columns],
+                } for run_set in self.run_sets],
+            }
+
+    def get_rows(self, query):
+        """Return one page of the selected rows, paging is defined by offset and limit."""
+        offset = _get_int_parameter(query, 'offset', 0)
+        limit = min(_get_int_parameter(query, 'limit', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        selected = self.select_rows(query)
+        return {
+            'total': len(selected),
+            'offset': offset,
+            'rows': [self._row_to_json(index) for index in selected[offset:offset + limit]],
+            }
+
+    def get_stats(self, query):
+        """Return the statistics for all columns of all run sets for the selected rows."""
+        selected = self.select_rows(query)
+        runsets = []
+        for run_set_index, run_set in enumerate(self.run_sets):
+            runResults = [self.rows[index].results[run_set_index] for index in selected]
+            if runResults:
+                stats = tablegenerator.get_stats_of_run_set(runResults, self.correct_only)
+            else:
+                stats = [[None] * len(run_set.columns)] * len(STATS_NAMES)
+            runsets.append([
+                dict({'title': column.title},
+                     **{name: _stat_to_json(stats[i][column_index])
+                        for i, name in enumerate(STATS_NAMES)})
+                for column_index, column in enumerate(run_set.columns)])
+        return {'total': len(selected), 'runsets': runsets}
+
+    def get_log(self, query):
+        """Return the content of the log file of the run given by row and runset, or None."""
+        row = _get_int_parameter(query, 'row', None)
+        run_set = _get_int_parameter(query, 'runset', None)
+        if row is None or run_set is None:
+            raise QueryError("Parameters 'row' and 'runset' are required.")
+        if not 0 <= row < len(self.rows) or not 0 <= run_set < len(self.run_sets):
+            raise QueryError("Invalid row or run set.")
+
+        log_file = self.rows[row].results[run_set].log_file
+        if not log_file:
+            return None
+        log_zip_cache = {}
+        try:
+            lines = tablegenerator._read_logfile_lines(log_file, log_zip_cache)
+        finally:
+            for file in log_zip_cache.values():
+                file.close()
+        return ''.join(lines) if lines else None
+
+    def select_rows(self, query):
+        """Return the indices of the rows selected by the query, in the requested order."""
+        selected = range(len(self.rows))
+
+        if _get_parameter(query, 'diff', 'false') == 'true':
+            if self._rows_with_differences is None:
+                self._rows_with_differences = [
+                    index for index, row in enumerate(self.rows)
+                    if tablegenerator.results_differ(row.results)]
+            selected = self._rows_with_differences
+
+        task = _get_parameter(query, 'task')
+        if task:
+            selected = [index for index in selected if task in self.rows[index].filename]
+
+        category = _get_parameter(query, 'category')
+        if category:
+            run_set = self._get_run_set_index(_get_parameter(query, 'runset'))
+            selected = [index for index in selected
+                        if any(run_result.category == category
+                               for run_result in self._get_results(index, run_set))]
+
+        sort = _get_parameter(query, 'sort')
+        if sort:
+            selected = self._sort_rows(list(selected), sort,
+                                       _get_parameter(query, 'order', 'asc') == 'desc')
+        return list(selected)
+
+    def _get_run_set_index(self, value):
+        if value is None:
+            return None
+        try:
+            index = int(value)
+        except ValueError:
+            index = -1
+        if not 0 <= index < len(self.run_sets):
+            raise QueryError("Invalid run set '{}'.".format(value))
+        return index
+
+    def _get_results(self, row_index, run_set_index):
+        results = self.rows[row_index].results
+        return results if run_set_index is None else [results[run_set_index]]
+
+    def _sort_rows(self, selected, sort, reverse):
+        run_set, unused_sep, title = sort.partition(':')
+        run_set = self._get_run_set_index(run_set)
+        columns = self.run_sets[run_set].columns
+        column_index = next((i for i, column in enumerate(columns) if column.title == title), None)
+        if column_index is None:
+            raise QueryError("Unknown column '{}'.".format(title))
+
+        is_numeric = columns[column_index].is_numeric()
+        def sort_key(row_index):
+            run_result = self.rows[row_index].results[run_set]
+            if is_numeric:
+                try:
+                    value = run_result.get_number(column_index)
+                except InvalidOperation:
+                    value = None
+            else:
+                value = run_result.get_value(column_index)
+            # rows without value are always last
+            return (value is None) != reverse, value if value is not None else ''
+
+        return sorted(selected, key=sort_key, reverse=reverse)
+
+    def _row_to_json(self, index):
+        row = self.rows[index]
+        return {
+            'index': index,
+            'task': row.filename,
+            'id': list(row.id),
+            'results': [{
+                'category': run_result.category,
+                'status': run_result.status,
+                'values': [
+                    column.format_value(value, False, 'csv') if value is not None else None
+                    for column, value in zip(run_result.columns, run_result.values)],
+                } for run_result in row.results],
+            }
+
+
+def _get_parameter(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _get_int_parameter(query, name, default):
+    value = _get_parameter(query, name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise QueryError("Invalid value '{}' for parameter '{}'.".format(query[name][-1], name))
+    return value
+
+
+def _stat_to_json(stat):
+    if stat is None:
+        return None
+    return {key: str(value) if isinstance(value, (Decimal, float)) else value
+            for key, value in vars(stat).items()}
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        table = self.server.table
+        try:
+            if url.path == '/':
+                self._send_json(table.describe())
+            elif url.path == '/rows':
+                self._send_json(table.get_rows(query))
+            elif url.path == '/stats':
+                self._send_json(table.get_stats(query))
+            elif url.path == '/log':
+                log = table.get_log(query)
+                if log is None:
+                    self._send_json({'error': 'Log file not found.'}, status=404)
+                else:
+                    self._send(log.encode('utf-8'), 'text/plain; charset=utf-8')
+            else:
+                self._send_json({'error': 'Unknown path.'}, status=404)
+        except QueryError as e:
+            self._send_json({'error': str(e)}, status=400)
+
+    def _send_json(self, data, status=200):
+        self._send(json.dumps(data, separators=(',', ':')).encode('utf-8'),
+                   'application/json', status)
+
+    def _send(self, content, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+def create_server(table, port):
+    """
+    Create an HTTP server on localhost for the given ResultTable.
+    @param port: the port to listen on, or 0 for any free port
+    """
+    server = _Server(('localhost', port), _RequestHandler)
+    server.table = table
+    return server
+
+
+def serve(runSetResults, options):
+    """
+    Merge the given results and answer queries about them until interrupted.
+    """
+    logging.info('Merging results...')
+    if options.common:
+        tablegenerator.find_common_tasks(runSetResults)
+    else:
+        tablegenerator.merge_tasks(runSetResults)
+    rows = tablegenerator.get_rows(runSetResults)
+
+    server = create_server(ResultTable(runSetResults, rows, options.correct_only), options.serve)
+    logging.info('Serving results of %s tasks on http://localhost:%s/ (press Ctrl+C to stop)...',
+                 len(rows), server.server_address[1])
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
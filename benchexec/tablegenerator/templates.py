@@ -0,0 +1,245 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Loading of the Tempita templates for tables.
+Each template is parsed and its expressions are compiled only once per process,
+and the result can additionally be kept in a cache directory for later processes.
+Compiling the expressions relies on internals of tempita,
+if these are not present, plain tempita templates are used.
+This module is the only one that imports tempita, and only when a template is needed.
+"""
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import functools
+import logging
+import marshal
+import os
+import sys
+
+import benchexec.util
+
+TEMPLATE_ENCODING = 'UTF-8'
+
+CACHE_FILE_SUFFIX = '.template'
+
+# Needs to be changed whenever the format of the cache files changes
+_CACHE_FORMAT_VERSION = b'2'
+
+# Attributes of tempita.Template instances that are expected by _CompiledTemplateMixin
+_TEMPITA_TEMPLATE_ATTRIBUTES = {
+    'content', 'delimiters', '_unicode', 'name', '_parsed', 'namespace', 'get_template'}
+
+# The directory for caching compiled templates, set by configure()
+_cache_dir = None
+
+
+def configure(directory):
+    """
+    Enable caching of compiled templates in the given directory
+    (which may be shared between processes).
+    @param directory: the cache directory, or None to disable caching on disk
+    """
+    global _cache_dir
+    _cache_dir = directory
+
+
+def bunch(**kwargs):
+    """Create a dict whose items can also be accessed as attributes in templates."""
+    import tempita
+    return tempita.bunch(**kwargs)
+
+
+def html(value):
+    """Mark a string as HTML such that it is not escaped in HTML templates."""
+    import tempita
+    return tempita.html(value)
+
+
+@functools.lru_cache(maxsize=None)
+def get_template(template_file, html=False):
+    """
+    Get a template, which is loaded only once per process.
+    The returned template may be shared, so the caller must not modify it.
+    @param html: whether to create a tempita.HTMLTemplate instead of a tempita.Template
+    """
+    try:
+        content = __loader__.get_data(template_file).decode(TEMPLATE_ENCODING)
+    except NameError:
+        with open(template_file, mode='r') as f:
+            content = f.read()
+
+    template_classes = _get_template_classes()
+    if not template_classes:
+        import tempita
+        template_class = tempita.HTMLTemplate if html else tempita.Template
+        return template_class(content, name=template_file)
+    template_class = template_classes[html]
+
+    cache_file = None
+    tempita_key = _get_tempita_key()
+    if _cache_dir and tempita_key:
+        import hashlib
+        key = hashlib.sha256(_CACHE_FORMAT_VERSION)
+        # code objects depend on the Python version, parsed templates on the tempita version
+        key.update(sys.version.encode())
+        key.update(tempita_key)
+        key.update(str(html).encode())
+        key.update(content.encode(TEMPLATE_ENCODING))
+        cache_file = os.path.join(_cache_dir, key.hexdigest() + CACHE_FILE_SUFFIX)
+        try:
+            with open(cache_file, 'rb') as f:
+                parsed, code = marshal.load(f)
+            logging.debug("Using compiled template %s from cache.", template_file)
+            return template_class(content, template_file, parsed, code)
+        except (IOError, EOFError, ValueError, TypeError):
+            pass
+
+    template = template_class(content, template_file)
+    if cache_file:
+        _write_cache_file(cache_file, (template._parsed, template._code))
+    return template
+
+
+@functools.lru_cache(maxsize=None)
+def _get_template_classes():
+    """
+    Create the template classes that compile expressions,
+    if the internals of tempita are as expected.
+    @return: a pair of the classes for text and for HTML templates, or None
+    """
+    import tempita
+    try:
+        supported = (
+            all(callable(getattr(tempita.Template, name, None)) for name in ('_eval', '_exec'))
+            and set(vars(tempita.Template('', name='test'))) == _TEMPITA_TEMPLATE_ATTRIBUTES)
+    except Exception:
+        supported = False
+    if not supported:
+        logging.debug("Using tempita templates without compiling them in advance.")
+        return None
+
+    class CompiledTemplate(_CompiledTemplateMixin, tempita.Template):
+        pass
+
+    class CompiledHTMLTemplate(_CompiledTemplateMixin, tempita.HTMLTemplate):
+        pass
+
+    return CompiledTemplate, CompiledHTMLTemplate
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tempita_key():
+    """
+    Get a key that identifies the installed version of tempita
+    (which does not declare its version itself), or None if it cannot be determined.
+    """
+    import hashlib
+    import tempita
+    try:
+        with open(tempita.__file__, 'rb') as f:
+            return hashlib.sha256(f.read()).digest()
+    except (AttributeError, TypeError, EnvironmentError):
+        return None
+
+
+def _write_cache_file(cache_file, value):
+    tmp_file = cache_file + '.{}.tmp'.format(os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            marshal.dump(value, f)
+        benchexec.util.replace_file(tmp_file, cache_file)
+    except (IOError, ValueError) as e:
+        logging.debug("Could not cache compiled template in %s: %s", cache_file, e)
+        try:
+            os.remove(tmp_file)
+        except EnvironmentError:
+            pass
+
+
+class _CompiledTemplateMixin(object):
+    """
+    Mixin for tempita templates that compiles all expressions and statements
+    when the template is created instead of each time they are evaluated.
+    """
+
+    def __init__(self, content, name, parsed=None, code=None):
+        if parsed is None:
+            super(_CompiledTemplateMixin, self).__init__(content, name=name)
+        else:
+            # avoid parsing the content again
+            super(_CompiledTemplateMixin, self).__init__('', name=name)
+            self.content = content
+            self._parsed = parsed
+
+        if code is None:
+            code = {}
+            try:
+                sources = list(_get_sources(self._parsed))
+            except (IndexError, TypeError, ValueError):
+                sources = [] # unexpected structure, tempita evaluates the source code itself
+            for source, mode in sources:
+                try:
+                    code[(source, mode)] = compile(source, name, mode)
+                except SyntaxError:
+                    pass # let tempita report the error when the template is used
+        self._code = code
+
+    def _eval(self, code, ns, pos):
+        return super(_CompiledTemplateMixin, self)._eval(
+            self._code.get((code, 'eval'), code), ns, pos)
+
+    def _exec(self, code, ns, pos):
+        return super(_CompiledTemplateMixin, self)._exec(
+            self._code.get((code, 'exec'), code), ns, pos)
+
+
+def _get_sources(parsed):
+    """
+    Find all expressions and statements in a parsed tempita template.
+    @return: a generator of pairs of source code and compile mode
+    """
+    for node in parsed:
+        if isinstance(node, str):
+            continue
+        kind = node[0]
+        if kind == 'py':
+            yield node[2], 'exec'
+        elif kind == 'expr':
+            for part in node[2].split('|'):
+                yield part, 'eval'
+        elif kind == 'for':
+            yield node[3], 'eval'
+            for source in _get_sources(node[4]):
+                yield source
+        elif kind == 'cond':
+            for part in node[2:]:
+                if part[0] != 'else':
+                    yield part[2], 'eval'
+                for source in _get_sources(part[3]):
+                    yield source
+        elif kind == 'default':
+            yield node[3], 'eval'
+        elif kind == 'inherit':
+            yield node[2], 'eval'
+        elif kind == 'def':
+            for source in _get_sources(node[4]):
+                yield source
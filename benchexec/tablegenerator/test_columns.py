@@ -21,6 +21,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import unittest
 
+from benchexec.tablegenerator import columns
 from benchexec.tablegenerator.columns import Column, ColumnType, ColumnMeasureType, get_column_type
 from benchexec.tablegenerator.util import TableDefinitionError
 
@@ -363,3 +364,28 @@ class ColumnsTest(unittest.TestCase):
         values = ["1,2"]
         column_type, _, _, _ = get_column_type(self.empty_column, values)
         self.assertEqual(column_type, ColumnType.text, msg="Actual type: " + str(column_type))
+
+    def test_parse_number(self):
+        parsed = columns._parse_number(" 1.0500s ")
+        self.assertEqual(parsed.number_str, "1.0500")
+        self.assertEqual(parsed.number, 1.05)
+        self.assertEqual(parsed.unit, "s")
+        self.assertEqual(parsed.decimal_digits, 4)
+        self.assertEqual(parsed.significant_digits, 5)
+
+        parsed = columns._parse_number("42")
+        self.assertEqual(parsed.unit, "")
+        self.assertEqual(parsed.decimal_digits, 0)
+
+        self.assertIsNone(columns._parse_number("1,2"))
+        self.assertIsNone(columns._parse_number("true"))
+
+    def test_parse_number_cached(self):
+        self.assertIs(columns._parse_number("1.234567"), columns._parse_number("1.234567"))
+
+    def test_format_value_repeated_with_different_targets(self):
+        column = Column("CpuTime", None, 2, None, ColumnMeasureType(3), None, None, 1)
+        for unused in range(2):
+            self.assertEqual(column.format_value("0.1234", False, 'html'), "0.12")
+            self.assertEqual(column.format_value("0.1234", True, 'html_cell'), ".12&#x2007;")
+            self.assertEqual(column.format_value("0.1234", False, 'csv'), "0.12")
@@ -19,14 +19,18 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import gzip
+import json
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
 import unittest
+from xml.etree import ElementTree
 sys.dont_write_bytecode = True # prevent creation of .pyc files
 
+from benchexec import resultdb
 from benchexec import util
 
 here = os.path.relpath(os.path.dirname(__file__))
@@ -181,6 +185,38 @@ class TableGeneratorIntegrationTests(unittest.TestCase):
             'test.2015-03-03_1613.results.predicateAnalysis.all-columns',
             )
 
+    def create_result_database(self, *files):
+        db_dir = tempfile.mkdtemp(prefix="integration_test_db_", dir=here)
+        self.addCleanup(shutil.rmtree, db_dir)
+        db_file = os.path.join(db_dir, 'results.db')
+        db = resultdb.ResultDatabase(db_file)
+        for file in files:
+            xml = ElementTree.parse(file).getroot()
+            benchmark_id = db.add_benchmark(xml)
+            run_set_id = db.add_run_set(benchmark_id, xml, file)
+            for run in xml.findall('run'):
+                db.add_run(run_set_id, run)
+            db.finish_run_set(run_set_id, xml)
+        db.close()
+        return db_file
+
+    def test_simple_table_from_database(self):
+        db_file = self.create_result_database(
+            result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'))
+        self.generate_tables_and_compare_content(
+            [db_file],
+            'test.2015-03-03_1613.results.predicateAnalysis',
+            )
+
+    def test_multi_table_from_database(self):
+        db_file = self.create_result_database(
+            result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'),
+            result_file('test.2015-03-03_1815.results.predicateAnalysis.xml'))
+        self.generate_tables_and_compare_content(
+            ['--name', 'predicateAnalysis', db_file],
+            table_prefix='predicateAnalysis.table',
+            )
+
     def test_simple_table_xml(self):
         self.generate_tables_and_compare_content(
             ['-x', os.path.join(here, 'simple-table.xml')],
@@ -239,6 +275,33 @@ class TableGeneratorIntegrationTests(unittest.TestCase):
             table_prefix='test.2015-03-03_1613.table',
             )
 
+    def test_lazy_html(self):
+        files = [result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'),
+                 result_file('test.2015-03-03_1613.results.valueAnalysis.xml')]
+        lazy_dir = os.path.join(self.tmp, 'lazy')
+        self.run_cmd(*[tablegenerator, '--name', 'test', '--no-diff', '-f', 'html', '--lazy-html',
+                       '--outputpath', lazy_dir] + files)
+        self.run_cmd(*[tablegenerator, '--name', 'test', '--no-diff', '-f', 'html',
+                       '--outputpath', self.tmp] + files)
+        self.assertSetEqual({'test.table.html', 'test.table.data'}, set(os.listdir(lazy_dir)))
+
+        lazy_html = util.read_file(lazy_dir, 'test.table.html')
+        self.assertIn('var dataDir = "test.table.data";', lazy_html)
+        self.assertIn('var chunkCount = 1;', lazy_html)
+        chunk = util.read_file(lazy_dir, 'test.table.data', 'rows-00000.js')
+        prefix = 'benchexecTable.addRows(0, '
+        self.assertTrue(chunk.startswith(prefix))
+        rows = json.loads(chunk[len(prefix):].rstrip().rstrip(';').rstrip(')'))
+
+        # same rows and cells as in regular table
+        tbody = self.read_table_from_html(os.path.join(self.tmp, 'test.table.html'))
+        tbody = tbody[tbody.index('<tbody>'):tbody.index('</tbody>')]
+        regular_rows = tbody.split('<tr>')[1:]
+        self.assertEqual(len(regular_rows), len(rows))
+        for regular_row, row in zip(regular_rows, rows):
+            self.assertIn('>' + row[0] + '<', regular_row)
+            self.assertEqual(regular_row.count('<td'), 1 + len(row[2]) + len(row[3]))
+
     def test_multi_table_differing_files(self):
         self.generate_tables_and_compare_content(
             ['--name', 'test.2015-03-03_1613',
@@ -528,6 +591,16 @@ class TableGeneratorIntegrationTests(unittest.TestCase):
             formats=['csv'],
             )
 
+    def test_format_csv_gzip(self):
+        self.run_cmd(tablegenerator, '--outputpath', self.tmp, '-f', 'csv', '--gzip',
+                     result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'))
+        csv_file = os.path.join(self.tmp, 'test.2015-03-03_1613.results.predicateAnalysis.csv.gz')
+        self.assertListEqual([os.path.basename(csv_file)], os.listdir(self.tmp))
+        with gzip.open(csv_file, 'rt') as f:
+            generated_csv = f.read()
+        expected = util.read_file(here, 'expected', 'test.2015-03-03_1613.results.predicateAnalysis' + '.csv')
+        self.assertMultiLineEqual(generated_csv.strip(), expected)
+
     def test_format_html(self):
         self.generate_tables_and_check_produced_files(
             [result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'),
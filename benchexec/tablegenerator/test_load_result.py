@@ -0,0 +1,227 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+from decimal import Decimal, InvalidOperation
+import logging
+import os
+import pickle
+import sys
+import unittest
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import tablegenerator
+from benchexec.tablegenerator.columns import Column
+
+here = os.path.relpath(os.path.dirname(__file__))
+result_dir = os.path.join(here, 'test_integration', 'results')
+
+
+def result_file(name):
+    return os.path.join(result_dir, name)
+
+
+def load_result_completely(result_file, options, run_set_id=None, columns=None):
+    """Load a result file with the whole XML tree in memory."""
+    xml = tablegenerator.parse_results_file(
+        result_file, run_set_id=run_set_id, ignore_errors=options.ignore_errors)
+    if xml is None:
+        return None
+    result = tablegenerator.RunSetResult.create_from_xml(
+        result_file, xml, columns=columns, all_columns=options.all_columns)
+    result.collect_data(options.correct_only)
+    return result
+
+
+def column_to_dict(column):
+    return dict(column.__dict__, type=str(column.type))
+
+
+class TestLoadResultIncrementally(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def assertSameResult(self, result_file, run_set_id=None, columns=None, **options):
+        options = argparse.Namespace(**dict(
+            {'ignore_errors': False, 'all_columns': False, 'correct_only': False},
+            **options))
+        expected = load_result_completely(result_file, options, run_set_id, columns)
+        actual = tablegenerator._load_result_incrementally(
+            result_file, options, run_set_id, columns, set())
+        if expected is None:
+            self.assertIsNone(actual)
+            return
+
+        self.assertDictEqual(dict(expected.attributes), dict(actual.attributes))
+        self.assertDictEqual(dict(expected.summary), dict(actual.summary))
+        self.assertListEqual(
+            [column_to_dict(column) for column in expected.columns],
+            [column_to_dict(column) for column in actual.columns])
+        self.assertListEqual(
+            [(r.task_id, r.status, r.category, r.score, r.log_file, r.values, r.sourcefiles_exist)
+             for r in expected.results],
+            [(r.task_id, r.status, r.category, r.score, r.log_file, r.values, r.sourcefiles_exist)
+             for r in actual.results])
+
+    def test_plain_file(self):
+        self.assertSameResult(result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'))
+
+    def test_compressed_files(self):
+        self.assertSameResult(result_file('test.2015-03-03_1613.results.predicateAnalysis.xml.gz'))
+        self.assertSameResult(result_file('test.2015-03-03_1613.results.predicateAnalysis.xml.bz2'))
+
+    def test_legacy_file(self):
+        self.assertSameResult(result_file('test.2015-03-03_1613.results.predicateAnalysis-legacy.xml'))
+
+    def test_logfile_links(self):
+        self.assertSameResult(
+            result_file('test.2015-03-03_1613.results.predicateAnalysis-logfile-links.xml'))
+
+    def test_options(self):
+        name = result_file('integration-predicateAnalysis.2015-10-20_1355.results.xml.bz2')
+        self.assertSameResult(name, all_columns=True)
+        self.assertSameResult(name, correct_only=True)
+        self.assertSameResult(name, run_set_id='id')
+
+    def test_given_columns(self):
+        columns = [Column('status', None, None, None),
+                   Column('cputime', None, 2, None),
+                   Column('Time for analysis', 'Time for Analysis:', None, None),
+                   ]
+        self.assertSameResult(
+            result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'), columns=columns)
+
+    def test_deferred_log_values(self):
+        options = argparse.Namespace(
+            ignore_errors=False, all_columns=False, correct_only=False, cache_dir=None)
+        columns = [Column('status', None, None, None),
+                   Column('Time for analysis', 'Time for Analysis:', None, None),
+                   Column('Refinements', 'Number of refinements:', None, None),
+                   ]
+        for name in ['test.2015-03-03_1613.results.predicateAnalysis.xml',
+                     'test.2015-03-03_1613.results.predicateAnalysis-legacy.xml']:
+            for correct_only in [False, True]:
+                options.correct_only = correct_only
+                expected = load_result_completely(result_file(name), options, columns=columns)
+                actual = tablegenerator.load_result(
+                    result_file(name), options, columns=columns, defer_log_values=True)
+                self.assertTrue(actual.log_values_pending)
+                self.assertListEqual([None, None], [r.values[1] for r in actual.results[:2]])
+
+                tablegenerator.collect_values_from_logs([actual], correct_only)
+                self.assertFalse(actual.log_values_pending)
+                self.assertListEqual(
+                    [column_to_dict(column) for column in expected.columns],
+                    [column_to_dict(column) for column in actual.columns])
+                self.assertListEqual(
+                    [r.values for r in expected.results],
+                    [r.values for r in actual.results])
+
+    def test_deferred_log_values_in_chunks(self):
+        chunk_size = tablegenerator.LOG_VALUES_CHUNK_SIZE
+        tablegenerator.LOG_VALUES_CHUNK_SIZE = 2
+        try:
+            self.test_deferred_log_values()
+        finally:
+            tablegenerator.LOG_VALUES_CHUNK_SIZE = chunk_size
+
+    def test_ignore_errors(self):
+        name = result_file('test-error.2015-03-03_1613.results.predicateAnalysis.xml')
+        self.assertSameResult(name)
+        self.assertSameResult(name, ignore_errors=True)
+
+
+class TestValuesByColumn(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def test_row_views(self):
+        values_by_column = tablegenerator.ValuesByColumn(2)
+        runs = []
+        for values in [['1.5s', 'true'], [None, 'false'], ['2s', 'unknown']]:
+            run = tablegenerator.RunResult(('task', None), 'true', 'correct', 1, None,
+                                           ['cputime', 'status'], list(values))
+            run.store_values_in(values_by_column)
+            runs.append(run)
+            self.assertListEqual(values, run.values)
+
+        self.assertListEqual([['1.5s', None, '2s'], ['true', 'false', 'unknown']], values_by_column.raw)
+        self.assertEqual('false', runs[1].get_value(1))
+        self.assertEqual(Decimal('1.5'), runs[0].get_number(0))
+        self.assertIsNone(runs[1].get_number(0))
+
+        runs[1].set_value(0, '3s')
+        self.assertListEqual(['3s', 'false'], runs[1].values)
+        self.assertEqual(Decimal('3'), runs[1].get_number(0))
+
+    def test_non_numeric_values(self):
+        values_by_column = tablegenerator.ValuesByColumn(1)
+        runs = []
+        for value in ['1', '1.2.3']:
+            run = tablegenerator.RunResult(('task', None), 'true', 'correct', 1, None, ['c'], [value])
+            run.store_values_in(values_by_column)
+            runs.append(run)
+        self.assertEqual(Decimal('1'), runs[0].get_number(0))
+        self.assertRaises(InvalidOperation, runs[1].get_number, 0)
+
+    def test_loaded_values_are_stored_by_column(self):
+        options = argparse.Namespace(ignore_errors=False, all_columns=False, correct_only=False)
+        result = load_result_completely(
+            result_file('integration-predicateAnalysis.2015-10-20_1355.results.xml.bz2'), options)
+        self.assertEqual(len(result.results), result.values_by_column.row_count)
+        for index in range(len(result.columns)):
+            self.assertListEqual(
+                [run.values[index] for run in result.results], result.values_by_column.raw[index])
+
+    def test_pickled_result(self):
+        options = argparse.Namespace(ignore_errors=False, all_columns=False, correct_only=False)
+        expected = load_result_completely(
+            result_file('integration-predicateAnalysis.2015-10-20_1355.results.xml.bz2'), options)
+        actual = pickle.loads(pickle.dumps(expected, pickle.HIGHEST_PROTOCOL))
+
+        def run_to_dict(run):
+            return dict(vars(run), columns=None, _values_by_column=None, values=run.values)
+
+        self.assertDictEqual(dict(expected.attributes), dict(actual.attributes))
+        self.assertListEqual(
+            [column_to_dict(column) for column in expected.columns],
+            [column_to_dict(column) for column in actual.columns])
+        self.assertListEqual(expected.values_by_column.raw, actual.values_by_column.raw)
+        self.assertListEqual(
+            [run_to_dict(run) for run in expected.results],
+            [run_to_dict(run) for run in actual.results])
+        for run in actual.results:
+            self.assertIs(actual.values_by_column, run._values_by_column)
+            self.assertIs(actual.columns, run.columns)
+
+        actual.results[0].set_value(0, 'changed')
+        self.assertEqual('changed', actual.values_by_column.raw[0][0])
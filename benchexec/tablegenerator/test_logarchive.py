@@ -0,0 +1,125 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import zipfile
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec.tablegenerator import logarchive
+from benchexec.tablegenerator import util
+
+MEMBERS = {
+    'logs/stored.log': (b'stored content\n', zipfile.ZIP_STORED),
+    'logs/deflated.log': (b'deflated content\n' * 100, zipfile.ZIP_DEFLATED),
+    'logs/bzip2.log': (b'bzip2 content\n', zipfile.ZIP_BZIP2),
+    'logs/empty.log': (b'', zipfile.ZIP_DEFLATED),
+    }
+
+
+class TestLogArchive(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='BenchExec_test_logarchive_')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.addCleanup(logarchive.configure, None)
+        self.addCleanup(logarchive._indices.clear)
+        self.zip_file = os.path.join(self.tmp_dir, 'test.logfiles.zip')
+        with zipfile.ZipFile(self.zip_file, 'w') as log_zip:
+            for name, (content, compress_type) in sorted(MEMBERS.items()):
+                log_zip.writestr(name, content, compress_type)
+        self.url = util.make_url(self.zip_file)
+
+    def assertArchiveContent(self, archive):
+        try:
+            for name, (content, unused_compress_type) in MEMBERS.items():
+                self.assertEqual(content, archive.read(name), name)
+            self.assertRaises(KeyError, archive.read, 'logs/missing.log')
+        finally:
+            archive.close()
+
+    def test_read(self):
+        self.assertArchiveContent(logarchive.open_archive(self.url))
+
+    def test_read_without_mapping(self):
+        with open(self.zip_file, 'rb') as f:
+            content = f.read()
+        archive = logarchive.LogArchive(io.BytesIO(content), self.url)
+        self.assertIsNone(archive._index)
+        self.assertArchiveContent(archive)
+
+    def test_index_cache(self):
+        index_dir = os.path.join(self.tmp_dir, 'index')
+        logarchive.configure(index_dir)
+        self.assertArchiveContent(logarchive.open_archive(self.url))
+        index_files = os.listdir(index_dir)
+        self.assertEqual(1, len(index_files))
+        self.assertTrue(index_files[0].endswith(logarchive.INDEX_FILE_SUFFIX))
+
+        # like in another process, the index is now read from the cache
+        logarchive._indices.clear()
+        with mock.patch.object(zipfile, 'ZipFile', side_effect=AssertionError):
+            archive = logarchive.open_archive(self.url)
+            self.addCleanup(archive.close)
+            self.assertEqual(MEMBERS['logs/deflated.log'][0], archive.read('logs/deflated.log'))
+
+    def test_evict(self):
+        index_dir = os.path.join(self.tmp_dir, 'index')
+        os.mkdir(index_dir)
+        for i in range(4):
+            with open(os.path.join(index_dir, '{}{}'.format(i, logarchive.INDEX_FILE_SUFFIX)), 'wb') as f:
+                f.write(b'x' * 1000)
+            os.utime(f.name, (i, i))
+        other_file = os.path.join(index_dir, 'other.cache')
+        with open(other_file, 'wb') as f:
+            f.write(b'x' * 1000)
+
+        logarchive.evict(index_dir, 2000)
+        self.assertListEqual(
+            ['2' + logarchive.INDEX_FILE_SUFFIX, '3' + logarchive.INDEX_FILE_SUFFIX, 'other.cache'],
+            sorted(os.listdir(index_dir)))
+
+        logarchive.evict(os.path.join(self.tmp_dir, 'missing'), 0)
+
+    def test_corrupt_member(self):
+        with open(self.zip_file, 'r+b') as f:
+            content = f.read()
+            f.seek(content.index(b'stored content'))
+            f.write(b'STORED')
+        archive = logarchive.open_archive(self.url)
+        self.addCleanup(archive.close)
+        self.assertRaises(zipfile.BadZipFile, archive.read, 'logs/stored.log')
+        self.assertEqual(b'', archive.read('logs/empty.log'))
+
+    def test_invalid_archive(self):
+        with open(self.zip_file, 'wb') as f:
+            f.write(b'no zip file')
+        self.assertRaises(zipfile.BadZipFile, logarchive.open_archive, self.url)
@@ -0,0 +1,109 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import random
+import sys
+import unittest
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import tablegenerator
+
+
+def merge_with_list_insertion(task_lists):
+    """The previous quadratic implementation of the merge, used as reference."""
+    task_list = []
+    task_set = set()
+    for tasks in task_lists:
+        index = -1
+        currentresult_taskset = set()
+        for task in tasks:
+            if task not in currentresult_taskset:
+                currentresult_taskset.add(task)
+                if task not in task_set:
+                    task_list.insert(index+1, task)
+                    task_set.add(task)
+                    index += 1
+                else:
+                    index = task_list.index(task)
+    return task_list
+
+
+def task(name):
+    return (name, None)
+
+
+class TestMergeTasks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def assertMerged(self, task_lists, expected):
+        task_lists = [[task(name) for name in tasks] for tasks in task_lists]
+        self.assertListEqual(
+            [task(name) for name in expected],
+            tablegenerator._merge_task_lists_preserving_order(task_lists))
+
+    def test_empty(self):
+        self.assertMerged([], [])
+        self.assertMerged([[], []], [])
+
+    def test_single_list(self):
+        self.assertMerged([["a", "b", "c"]], ["a", "b", "c"])
+
+    def test_identical_lists(self):
+        self.assertMerged([["a", "b", "c"], ["a", "b", "c"]], ["a", "b", "c"])
+
+    def test_insert_after_preceding_task(self):
+        self.assertMerged([["a", "c"], ["a", "b"]], ["a", "b", "c"])
+        self.assertMerged([["b", "c"], ["a", "b"]], ["a", "b", "c"])
+        self.assertMerged([["a", "b"], ["c"]], ["c", "a", "b"])
+
+    def test_different_order(self):
+        self.assertMerged([["a", "b", "c"], ["c", "d", "a", "e"]],
+                          ["a", "e", "b", "c", "d"])
+
+    def test_duplicate_tasks_are_skipped(self):
+        self.assertMerged([["a", "b", "a"], ["b", "b", "c"]], ["a", "b", "c"])
+
+    def test_same_result_as_list_insertion(self):
+        rnd = random.Random(4711)
+        for unused_i in range(200):
+            names = ["t{}".format(i) for i in range(rnd.randint(0, 30))]
+            task_lists = []
+            for unused_j in range(rnd.randint(1, 5)):
+                tasks = [task(name) for name in names if rnd.random() < 0.7]
+                if rnd.random() < 0.3:
+                    rnd.shuffle(tasks)
+                if tasks and rnd.random() < 0.2:
+                    tasks.append(rnd.choice(tasks))
+                task_lists.append(tasks)
+            self.assertListEqual(
+                merge_with_list_insertion(task_lists),
+                tablegenerator._merge_task_lists_preserving_order(task_lists),
+                task_lists)
@@ -0,0 +1,154 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import tablegenerator
+from benchexec.tablegenerator import regression
+
+here = os.path.relpath(os.path.dirname(__file__))
+result_dir = os.path.join(here, 'test_integration', 'results')
+old_result_file = os.path.join(result_dir, 'test.2015-03-03_1613.results.predicateAnalysis.xml')
+new_result_file = os.path.join(result_dir, 'test.2015-03-03_1815.results.predicateAnalysis.xml')
+
+THRESHOLD = 0.05
+
+
+def load(result_file):
+    options = argparse.Namespace(
+        ignore_errors=False, all_columns=False, correct_only=False, cache_dir=None)
+    return tablegenerator.load_result(result_file, options)
+
+
+def analyze(baseline_files, candidate_files, **kwargs):
+    baseline = [load(f) for f in baseline_files]
+    candidate = [load(f) for f in candidate_files]
+    tablegenerator.merge_tasks(baseline + candidate)
+    rows = tablegenerator.get_rows(baseline + candidate)
+    return regression.analyze(baseline, candidate, rows, THRESHOLD, **kwargs)
+
+
+class TestRegression(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_weighted_quantiles(self):
+        self.assertListEqual(
+            [1, 3], regression._weighted_quantiles([3, None, 1, 2], [1, 5, 1, 2], [0.25, 1]))
+        self.assertListEqual([1, 2], regression._weighted_quantiles([1, 2], [1, 1], [0.5, 0.51]))
+        self.assertListEqual([None], regression._weighted_quantiles([None], [1], [0.5]))
+
+    def test_identical_results(self):
+        report = analyze([old_result_file] * 2, [old_result_file] * 3)
+        self.assertEqual(0, regression.count_slowdowns(report))
+        for column in report['columns'].values():
+            self.assertEqual(0, column['difference'])
+            self.assertListEqual([0, 0], column['confidence_interval'])
+            self.assertEqual(0, column['significant_speedups'])
+
+    def test_significant_changes(self):
+        report = analyze([new_result_file] * 2, [old_result_file] * 2)
+        self.assertListEqual(['cputime', 'walltime', 'memUsage'], list(report['columns']))
+        cputime = report['columns']['cputime']
+        self.assertEqual(5, cputime['tasks'])
+        self.assertAlmostEqual(10.919505907 / 9.389318338 - 1, cputime['difference'])
+        for task in report['tasks']:
+            stats = task['cputime']
+            self.assertEqual(stats['difference'] > THRESHOLD, stats['significant_slowdown'],
+                             task['task'])
+            self.assertFalse(stats['significant_speedup'], task['task'])
+        self.assertEqual(5, cputime['significant_slowdowns'])
+        self.assertEqual(0, report['columns']['memUsage']['significant_slowdowns'])
+
+        reverse_report = analyze([old_result_file] * 2, [new_result_file] * 2)
+        self.assertEqual(0, regression.count_slowdowns(reverse_report))
+        self.assertEqual(5, reverse_report['columns']['cputime']['significant_speedups'])
+
+    def test_no_repetitions(self):
+        report = analyze([new_result_file], [old_result_file])
+        self.assertEqual(0, regression.count_slowdowns(report),
+                         'changes without repetitions should not be significant')
+        self.assertGreater(report['columns']['cputime']['difference'], THRESHOLD)
+
+    def test_confidence_interval(self):
+        report = analyze([old_result_file, new_result_file] * 2, [new_result_file, old_result_file])
+        for task in report['tasks']:
+            low, high = task['cputime']['confidence_interval']
+            self.assertLessEqual(low, task['cputime']['difference'], task['task'])
+            self.assertGreaterEqual(high, task['cputime']['difference'], task['task'])
+            self.assertLess(low, 0, task['task'])
+            self.assertGreater(high, 0, task['task'])
+            self.assertFalse(task['cputime']['significant_slowdown'], task['task'])
+
+    @unittest.skipIf(regression.numpy is None, 'numpy is not available')
+    def test_vectorized_computation(self):
+        files = ([old_result_file, new_result_file, old_result_file],
+                 [new_result_file, new_result_file, old_result_file])
+        vectorized_report = analyze(*files, samples=200)
+        with mock.patch.object(regression, 'numpy', None):
+            report = analyze(*files, samples=200)
+        # sums are computed in a different order, so only almost equal
+        self.assertReportsAlmostEqual(report, vectorized_report)
+
+    def assertReportsAlmostEqual(self, expected, actual, path='report'):
+        if isinstance(expected, dict):
+            self.assertListEqual(sorted(expected), sorted(actual), path)
+            for key in expected:
+                self.assertReportsAlmostEqual(expected[key], actual[key], path + '.' + str(key))
+        elif isinstance(expected, list):
+            self.assertEqual(len(expected), len(actual), path)
+            for i, (e, a) in enumerate(zip(expected, actual)):
+                self.assertReportsAlmostEqual(e, a, '{}[{}]'.format(path, i))
+        elif isinstance(expected, float):
+            self.assertIsInstance(actual, float, path)
+            self.assertAlmostEqual(expected, actual, delta=1e-9 * max(1, abs(expected)), msg=path)
+        else:
+            self.assertEqual(expected, actual, path)
+
+    def test_write_report(self):
+        output_dir = tempfile.mkdtemp(prefix='BenchExec_test_regression_')
+        self.addCleanup(shutil.rmtree, output_dir)
+        report = analyze([new_result_file] * 2, [old_result_file] * 2)
+        json_file, html_file = regression.write_report(report, output_dir, 'test')
+
+        with open(json_file) as f:
+            self.assertEqual(json.loads(json.dumps(report)), json.load(f))
+        with open(html_file) as f:
+            html = f.read()
+        self.assertIn('class="number slower"', html)
+        self.assertNotIn('class="number faster"', html)
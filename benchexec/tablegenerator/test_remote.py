@@ -0,0 +1,251 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import http.server
+import io
+import logging
+import os
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import unittest
+import zipfile
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import tablegenerator
+from benchexec.tablegenerator import remote
+
+here = os.path.relpath(os.path.dirname(__file__))
+result_dir = os.path.join(here, 'test_integration', 'results')
+
+
+class _FileHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the files of a directory, with ETag and (optionally) range requests."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        path = os.path.join(server.directory, self.path.lstrip('/'))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            content = f.read()
+        etag = '"{}-{:.9f}"'.format(len(content), os.stat(path).st_mtime)
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        status = 200
+        byte_range = self.headers.get('Range')
+        if byte_range and server.support_ranges:
+            start, end = byte_range[len('bytes='):].split('-')
+            if not start:
+                start = max(0, len(content) - int(end))
+                end = len(content) - 1
+            start, end = int(start), min(int(end), len(content) - 1)
+            content_range = 'bytes {}-{}/{}'.format(start, end, len(content))
+            content = content[start:end + 1]
+            status = 206
+
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        if server.truncate:
+            # announce more content than is sent, the connection is closed afterwards
+            self.send_header('Content-Length', str(len(content) + 100))
+            self.close_connection = True
+        else:
+            self.send_header('Content-Length', str(len(content)))
+            # close the connection without telling the client, like for idle connections
+            self.close_connection = server.close_connections
+        if status == 206:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def setup(self):
+        super(_FileHandler, self).setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class TestRemoteFiles(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.served_dir = tempfile.mkdtemp(prefix='BenchExec_test_remote_served_')
+        self.cache_dir = tempfile.mkdtemp(prefix='BenchExec_test_remote_cache_')
+        self.addCleanup(shutil.rmtree, self.served_dir)
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        self.server = _Server(('localhost', 0), _FileHandler)
+        self.server.directory = self.served_dir
+        self.server.support_ranges = True
+        self.server.truncate = False
+        self.server.close_connections = False
+        self.server.requests = []
+        self.server.connections = 0
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = 'http://localhost:{}/'.format(self.server.server_address[1])
+
+        self.remote_files = remote.RemoteFiles(self.cache_dir)
+        self.addCleanup(self.remote_files._pool.close)
+
+    def write_file(self, name, content):
+        with open(os.path.join(self.served_dir, name), 'wb') as f:
+            f.write(content)
+
+    def read(self, remote_files, name, random_access=False):
+        with remote_files.open(self.base_url + name, random_access) as f:
+            return f.read()
+
+    def test_download_and_validate(self):
+        self.write_file('a.txt', b'content')
+        self.assertEqual(b'content', self.read(self.remote_files, 'a.txt'))
+        self.assertEqual(b'content', self.read(self.remote_files, 'a.txt'))
+        self.assertEqual(1, len(self.server.requests),
+                         'file should be validated only once per instance')
+
+        # another process with the same cache directory
+        other_remote_files = remote.RemoteFiles(self.cache_dir)
+        self.addCleanup(other_remote_files._pool.close)
+        self.assertEqual(b'content', self.read(other_remote_files, 'a.txt'))
+        self.assertEqual(2, len(self.server.requests))
+        self.assertIn('If-None-Match', self.server.requests[1][1])
+
+        # changed file is downloaded again
+        self.write_file('a.txt', b'new content')
+        third_remote_files = remote.RemoteFiles(self.cache_dir)
+        self.addCleanup(third_remote_files._pool.close)
+        self.assertEqual(b'new content', self.read(third_remote_files, 'a.txt'))
+
+    def test_missing_file(self):
+        self.assertRaises(IOError, self.remote_files.open, self.base_url + 'missing.txt')
+        self.assertRaises(IOError, self.remote_files.open, self.base_url + 'missing.zip', True)
+
+    def test_connection_closed_by_server(self):
+        self.server.close_connections = True
+        self.write_file('a.txt', b'a')
+        self.write_file('b.txt', b'b')
+        self.assertEqual(b'a', self.read(self.remote_files, 'a.txt'))
+        self.assertEqual(b'b', self.read(self.remote_files, 'b.txt'))
+        self.assertEqual(2, self.server.connections)
+
+    def test_truncated_response(self):
+        self.server.truncate = True
+        self.write_file('a.txt', b'content')
+        self.assertRaises(IOError, self.remote_files.open, self.base_url + 'a.txt')
+        self.assertRaises(IOError, self.remote_files.open, self.base_url + 'a.txt', True)
+        self.remote_files.prefetch([self.base_url + 'a.txt']) # errors are ignored
+        self.assertFalse(os.listdir(self.cache_dir), 'incomplete file should not be kept')
+
+    def test_evict(self):
+        for i in range(4):
+            self.write_file('{}.txt'.format(i), b'x' * 1000)
+            data_file, meta_file = self.remote_files._get_entry_files(
+                self.base_url + '{}.txt'.format(i))
+            self.remote_files.fetch(self.base_url + '{}.txt'.format(i))
+            os.utime(data_file, (i, i))
+        orphaned_meta_file = os.path.join(self.cache_dir, 'orphaned' + remote.META_FILE_SUFFIX)
+        with open(orphaned_meta_file, 'w') as f:
+            f.write('{}')
+        entry_size = sum(os.path.getsize(f) for f in (data_file, meta_file))
+
+        remote.evict(self.cache_dir, 2 * entry_size)
+        self.assertListEqual(
+            sorted(name for i in (2, 3) for name in self.remote_files._get_entry_files(
+                self.base_url + '{}.txt'.format(i))),
+            sorted(os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)))
+
+        remote.evict(os.path.join(self.cache_dir, 'missing'), 0)
+
+    def test_connections_reused(self):
+        for i in range(10):
+            self.write_file('{}.txt'.format(i), str(i).encode())
+        self.remote_files.prefetch(self.base_url + '{}.txt'.format(i) for i in range(10))
+        self.assertEqual(10, len(self.server.requests))
+        self.assertLessEqual(self.server.connections, remote.PREFETCH_THREADS)
+
+        # all files are in cache and validated now
+        for i in range(10):
+            self.assertEqual(str(i).encode(), self.read(self.remote_files, '{}.txt'.format(i)))
+        self.assertEqual(10, len(self.server.requests))
+
+    def test_range_requests(self):
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as zip_file:
+            for i in range(100):
+                # incompressible content such that archive is large
+                zip_file.writestr('logs/{}.log'.format(i), os.urandom(10000))
+            zip_file.writestr('logs/last.log', b'line 1\nline 2\n')
+        self.write_file('logs.zip', content.getvalue())
+
+        with zipfile.ZipFile(self.remote_files.open(self.base_url + 'logs.zip', True)) as zip_file:
+            self.assertEqual(b'line 1\nline 2\n', zip_file.read('logs/last.log'))
+        self.assertTrue(all('Range' in headers for unused_path, headers in self.server.requests))
+        self.assertFalse(os.listdir(self.cache_dir), 'file should not be downloaded')
+
+    def test_range_requests_not_supported(self):
+        self.server.support_ranges = False
+        self.write_file('a.txt', b'content')
+        self.assertEqual(b'content', self.read(self.remote_files, 'a.txt', random_access=True))
+
+    def test_load_result(self):
+        name = 'test.2015-03-03_1613.results.predicateAnalysis.xml'
+        shutil.copy(os.path.join(result_dir, name), self.served_dir)
+        options = argparse.Namespace(
+            ignore_errors=False, all_columns=False, correct_only=False, cache_dir=None)
+
+        remote.configure(self.cache_dir)
+        self.addCleanup(remote.configure, None)
+        remote_result = tablegenerator.load_result(self.base_url + name, options)
+        local_result = tablegenerator.load_result(os.path.join(result_dir, name), options)
+        self.assertListEqual([r.values for r in local_result.results],
+                             [r.values for r in remote_result.results])
+        self.assertEqual(1, len(self.server.requests))
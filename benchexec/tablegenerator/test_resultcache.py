@@ -0,0 +1,127 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec.tablegenerator import resultcache
+from benchexec.tablegenerator.columns import Column
+
+
+class TestResultCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_resultcache_")
+        self.cache = resultcache.ResultCache(os.path.join(self.base_dir, "cache"))
+        self.result_file = os.path.join(self.base_dir, "test.results.xml")
+        self.write_result_file("<result/>")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def write_result_file(self, content):
+        with open(self.result_file, "w") as f:
+            f.write(content)
+
+    def cache_entries(self):
+        return [name for name in os.listdir(self.cache.directory)
+                if name.endswith(resultcache.CACHE_FILE_SUFFIX)]
+
+    def test_load_missing(self):
+        key = self.cache.get_key(self.result_file, ())
+        self.assertIsNone(self.cache.load(key))
+
+    def test_store_and_load(self):
+        key = self.cache.get_key(self.result_file, ())
+        self.cache.store(key, {"results": [1, 2, 3]})
+        self.assertEqual({"results": [1, 2, 3]},
+                         self.cache.load(self.cache.get_key(self.result_file, ())))
+
+    def test_no_key_for_urls_and_missing_files(self):
+        self.assertIsNone(self.cache.get_key("http://example.com/test.results.xml", ()))
+        self.assertIsNone(self.cache.get_key(os.path.join(self.base_dir, "missing.xml"), ()))
+
+    def test_parameters_are_part_of_key(self):
+        columns = [Column("cputime", None, 2, None)]
+        key = self.cache.get_key(self.result_file, (columns, False))
+        self.cache.store(key, "value")
+        self.assertEqual("value", self.cache.load(
+            self.cache.get_key(self.result_file, ([Column("cputime", None, 2, None)], False))))
+        self.assertIsNone(self.cache.load(self.cache.get_key(self.result_file, (columns, True))))
+        self.assertIsNone(self.cache.load(self.cache.get_key(
+            self.result_file, ([Column("cputime", None, 3, None)], False))))
+
+    def test_changed_file_invalidates_entry(self):
+        key = self.cache.get_key(self.result_file, ())
+        self.cache.store(key, "value")
+        self.write_result_file("<result></result>")
+        self.assertIsNone(self.cache.load(self.cache.get_key(self.result_file, ())))
+        self.assertListEqual([], self.cache_entries(), "outdated entry should be removed")
+
+    def test_changed_content_with_same_size_and_time_invalidates_entry(self):
+        os.utime(self.result_file, (1000, 1000))
+        key = self.cache.get_key(self.result_file, ())
+        self.cache.store(key, "value")
+        self.write_result_file("<tluser/>")
+        os.utime(self.result_file, (1000, 1000))
+        self.assertIsNone(self.cache.load(self.cache.get_key(self.result_file, ())))
+
+    def test_invalid_entry_is_removed(self):
+        key = self.cache.get_key(self.result_file, ())
+        self.cache.store(key, "value")
+        entry_file = os.path.join(self.cache.directory, self.cache_entries()[0])
+        with open(entry_file, "wb") as f:
+            f.write(b"invalid")
+        self.assertIsNone(self.cache.load(key))
+        self.assertListEqual([], self.cache_entries())
+
+    def test_evict_least_recently_used(self):
+        keys = [self.cache.get_key(self.result_file, (i,)) for i in range(4)]
+        for i, key in enumerate(keys):
+            self.cache.store(key, "x" * 1000)
+            entry_file = os.path.join(self.cache.directory, key[0] + resultcache.CACHE_FILE_SUFFIX)
+            os.utime(entry_file, (i, i))
+        entry_size = os.path.getsize(entry_file)
+
+        self.cache.evict(4 * entry_size)
+        self.assertEqual(4, len(self.cache_entries()))
+
+        self.cache.load(keys[0]) # marks entry as recently used
+        self.cache.evict(2 * entry_size)
+        self.assertIsNotNone(self.cache.load(keys[0]))
+        self.assertIsNone(self.cache.load(keys[1]))
+        self.assertIsNone(self.cache.load(keys[2]))
+        self.assertIsNotNone(self.cache.load(keys[3]))
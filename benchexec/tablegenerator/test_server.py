@@ -0,0 +1,150 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.parse
+import urllib.request
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import tablegenerator
+from benchexec.tablegenerator import server
+
+here = os.path.relpath(os.path.dirname(__file__))
+result_dir = os.path.join(here, 'test_integration', 'results')
+
+
+def result_file(name):
+    return os.path.join(result_dir, name)
+
+
+class TestResultTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+        options = argparse.Namespace(
+            ignore_errors=False, all_columns=False, correct_only=False, cache_dir=None)
+        cls.run_sets = list(tablegenerator.load_results(
+            [result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'),
+             result_file('test.2015-03-03_1613.results.valueAnalysis.xml')],
+            options))
+        tablegenerator.merge_tasks(cls.run_sets)
+        cls.rows = tablegenerator.get_rows(cls.run_sets)
+        cls.table = server.ResultTable(cls.run_sets, cls.rows)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def query(self, query_string):
+        return urllib.parse.parse_qs(query_string)
+
+    def test_describe(self):
+        description = self.table.describe()
+        self.assertEqual(len(self.rows), description['rows'])
+        self.assertListEqual(
+            [[column.title for column in run_set.columns] for run_set in self.run_sets],
+            [[column['title'] for column in run_set['columns']] for run_set in description['runsets']])
+
+    def test_paging(self):
+        all_rows = self.table.get_rows(self.query(''))['rows']
+        self.assertListEqual(list(range(len(self.rows))), [row['index'] for row in all_rows])
+        page = self.table.get_rows(self.query('offset=1&limit=2'))
+        self.assertEqual(len(self.rows), page['total'])
+        self.assertListEqual(all_rows[1:3], page['rows'])
+
+    def test_filter(self):
+        selected = self.table.select_rows(self.query('task=builtin_expect'))
+        self.assertListEqual(
+            [i for i, row in enumerate(self.rows) if 'builtin_expect' in row.filename], selected)
+
+        selected = self.table.select_rows(self.query('category=missing&runset=1'))
+        self.assertTrue(selected)
+        self.assertListEqual(
+            [i for i, row in enumerate(self.rows) if row.results[1].category == 'missing'], selected)
+
+        selected = self.table.select_rows(self.query('diff=true'))
+        self.assertListEqual(
+            [i for i, row in enumerate(self.rows) if tablegenerator.results_differ(row.results)],
+            selected)
+
+    def test_sort(self):
+        column_index = [c.title for c in self.run_sets[0].columns].index('cputime')
+        def cputime(i):
+            return self.rows[i].results[0].get_number(column_index)
+
+        selected = self.table.select_rows(self.query('sort=0:cputime'))
+        self.assertListEqual(sorted(range(len(self.rows)), key=cputime), selected)
+        selected = self.table.select_rows(self.query('sort=0:cputime&order=desc'))
+        self.assertListEqual(sorted(range(len(self.rows)), key=cputime, reverse=True), selected)
+
+        self.assertRaises(server.QueryError, self.table.select_rows, self.query('sort=0:unknown'))
+        self.assertRaises(server.QueryError, self.table.select_rows, self.query('sort=5:cputime'))
+
+    def test_stats(self):
+        stats = self.table.get_stats(self.query(''))
+        expected = tablegenerator.get_stats_of_run_set([row.results[0] for row in self.rows], False)
+        status_stats = stats['runsets'][0][0]
+        self.assertEqual(expected[0][0].sum, status_stats['total']['sum'])
+        self.assertEqual(expected[1][0].sum, status_stats['correct']['sum'])
+
+        stats = self.table.get_stats(self.query('task=no-such-task'))
+        self.assertEqual(0, stats['total'])
+        self.assertIsNone(stats['runsets'][0][0]['total'])
+
+    def test_invalid_parameters(self):
+        self.assertRaises(server.QueryError, self.table.get_rows, self.query('limit=x'))
+        self.assertRaises(server.QueryError, self.table.get_rows, self.query('offset=-1'))
+        self.assertRaises(server.QueryError, self.table.get_log, self.query('row=0'))
+        self.assertRaises(server.QueryError, self.table.get_log, self.query('row=100&runset=0'))
+
+    def test_http(self):
+        http_server = server.create_server(self.table, 0)
+        self.addCleanup(http_server.server_close)
+        thread = threading.Thread(target=http_server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(http_server.shutdown)
+        url = 'http://localhost:{}'.format(http_server.server_address[1])
+
+        with urllib.request.urlopen(url + '/rows?limit=1') as response:
+            self.assertEqual('application/json', response.headers['Content-Type'])
+            self.assertEqual(1, len(json.loads(response.read().decode('utf-8'))['rows']))
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            urllib.request.urlopen(url + '/rows?limit=x')
+        self.assertEqual(400, cm.exception.code)
+        cm.exception.close()
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            urllib.request.urlopen(url + '/unknown')
+        self.assertEqual(404, cm.exception.code)
+        cm.exception.close()
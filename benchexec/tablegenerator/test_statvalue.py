@@ -20,11 +20,13 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from decimal import Decimal
+import math
+import random
 import sys
 import unittest
 sys.dont_write_bytecode = True # prevent creation of .pyc files
 
-from benchexec.tablegenerator import StatValue
+from benchexec.tablegenerator import StatValue, get_stats_of_partitions
 
 class TestStatValue(unittest.TestCase):
 
@@ -197,3 +199,70 @@ class TestStatValue(unittest.TestCase):
         self.assertEqual(s.min, ninf, "Not -Inf, but " + str(s.min))
         self.assertEqual(s.median, v, "Not 0.123, but " + str(s.median))
         self.assertTrue(math.isnan(s.stdev), "Not NaN, but " + str(s.stdev))
+
+
+class TestStatsOfPartitions(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def assertSameStats(self, expected, actual, msg):
+        for attr in ['sum', 'min', 'max', 'avg', 'median', 'stdev']:
+            expected_value = getattr(expected, attr)
+            actual_value = getattr(actual, attr)
+            if expected_value is not None and math.isnan(expected_value):
+                self.assertTrue(math.isnan(actual_value), msg)
+            else:
+                self.assertEqual(expected_value, actual_value, msg)
+
+    def assertSameStatsAsFromList(self, values, partitions_of_values, partition_count):
+        stats = get_stats_of_partitions(values, partitions_of_values, partition_count)
+        self.assertEqual(partition_count, len(stats))
+        for partition, actual in enumerate(stats):
+            partition_values = [value for value, partitions in zip(values, partitions_of_values)
+                                if partition in partitions]
+            self.assertSameStats(StatValue.from_list(partition_values), actual,
+                                 "partition {} of {}".format(partition, values))
+
+    def test_empty(self):
+        self.assertSameStatsAsFromList([], [], 3)
+        self.assertSameStatsAsFromList([None, None], [(0,), (0, 1)], 3)
+
+    def test_overlapping_partitions(self):
+        values = [Decimal(v) for v in ['1.5', '0.25', '3', '17.125', '-2', '0.25', '8']]
+        partitions = [(0, 1), (0, 2), (0,), (0, 1, 3), (0, 2), (0, 1), (0, 3)]
+        self.assertSameStatsAsFromList(values, partitions, 4)
+
+    def test_equal_partitions_of_different_identity(self):
+        values = [Decimal(1), Decimal(2), Decimal(3)]
+        self.assertSameStatsAsFromList(values, [tuple([0]), tuple([0]), tuple([0])], 1)
+        self.assertEqual(Decimal(6), get_stats_of_partitions(
+            values, [tuple([0]), tuple([0]), tuple([0])], 1)[0].sum)
+
+    def test_special_values(self):
+        nan = Decimal('nan')
+        inf = Decimal('inf')
+        ninf = Decimal('-inf')
+        v = Decimal('0.123')
+        self.assertSameStatsAsFromList(
+            [v, nan, inf, v, ninf, None, v, inf],
+            [(0, 1), (0, 2), (0, 3), (0, 4), (0, 4), (0, 5), (0, 3), (0, 4)],
+            6)
+
+    def test_many_digits(self):
+        # values that cannot be distinguished as floats
+        values = [Decimal('1.00000000000000000001'), Decimal('1.00000000000000000002'),
+                  Decimal('1'), Decimal('1.00000000000000000003')]
+        self.assertSameStatsAsFromList(values[::-1], [(0,), (0, 1), (0,), (0, 1)], 2)
+
+    def test_random_values(self):
+        rnd = random.Random(4711)
+        groups = [(0,), (0, 1, 2), (0, 1, 3), (0, 4)]
+        for unused_i in range(20):
+            count = rnd.randint(1, 200)
+            values = [Decimal(rnd.randint(0, 10**6)) / 1000 if rnd.random() < 0.95 else None
+                      for unused_j in range(count)]
+            partitions = [rnd.choice(groups) for unused_j in range(count)]
+            self.assertSameStatsAsFromList(values, partitions, 5)
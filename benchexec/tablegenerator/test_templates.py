@@ -0,0 +1,117 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+import tempita
+
+from benchexec.tablegenerator import templates
+
+TEMPLATE = """\
+{{py:total = sum(values)}}
+{{def item(value, highlight=False)}}<li{{if highlight}} class="max"{{endif}}>{{value}}</li>{{enddef}}
+<h1>{{title|upper}}</h1>
+<ul>
+{{for i, value in enumerate(values)}}
+{{if value == max(values)}}
+{{item(value, True)}}
+{{elif i % 2}}
+{{item(-value)}}
+{{else}}
+{{item(value)}}
+{{endif}}
+{{endfor}}
+</ul>
+<p>Total: {{total}} &lt; {{'<' + str(total + 1)}}</p>
+"""
+
+VALUES = {'title': 'Title', 'values': [3, 1, 4, 1, 5], 'upper': lambda s: s.upper()}
+
+
+class TestTemplates(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='BenchExec_test_templates_')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.template_file = os.path.join(self.tmp_dir, 'template.html')
+        with open(self.template_file, 'w') as f:
+            f.write(TEMPLATE)
+        self.addCleanup(templates.get_template.cache_clear)
+        self.addCleanup(templates._get_template_classes.cache_clear)
+        self.addCleanup(templates.configure, None)
+
+    def test_same_result_as_tempita(self):
+        expected = tempita.HTMLTemplate(TEMPLATE).substitute(**VALUES)
+        template = templates.get_template(self.template_file, html=True)
+        self.assertEqual(expected, template.substitute(**VALUES))
+        self.assertEqual(expected, template.substitute(**VALUES))
+        self.assertIs(template, templates.get_template(self.template_file, html=True),
+                      'template should be loaded only once')
+        self.assertTrue(template._code)
+
+        expected = tempita.Template(TEMPLATE).substitute(**VALUES)
+        template = templates.get_template(self.template_file)
+        self.assertEqual(expected, template.substitute(**VALUES))
+
+    def test_unexpected_tempita_internals(self):
+        with mock.patch.object(templates, '_TEMPITA_TEMPLATE_ATTRIBUTES', {'content'}):
+            template = templates.get_template(self.template_file, html=True)
+        self.assertIs(tempita.HTMLTemplate, type(template))
+        self.assertEqual(tempita.HTMLTemplate(TEMPLATE).substitute(**VALUES),
+                         template.substitute(**VALUES))
+
+    def test_cache_dir(self):
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        templates.configure(cache_dir)
+        expected = templates.get_template(self.template_file, html=True).substitute(**VALUES)
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+        templates.get_template.cache_clear()
+        template = templates.get_template(self.template_file, html=True)
+        self.assertEqual(expected, template.substitute(**VALUES))
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+        # changed template is not taken from cache
+        with open(self.template_file, 'w') as f:
+            f.write('{{title}}')
+        templates.get_template.cache_clear()
+        template = templates.get_template(self.template_file, html=True)
+        self.assertEqual('Title', template.substitute(**VALUES))
+        self.assertEqual(2, len(os.listdir(cache_dir)))
+
+    def test_error_position(self):
+        with open(self.template_file, 'w') as f:
+            f.write('line 1\n{{undefined_name}}')
+        template = templates.get_template(self.template_file)
+        with self.assertRaises(NameError) as context:
+            template.substitute()
+        self.assertIn('line 2', str(context.exception))
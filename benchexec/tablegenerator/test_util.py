@@ -19,6 +19,7 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from decimal import Decimal
 import sys
 import unittest
 sys.dont_write_bytecode = True # prevent creation of .pyc files
@@ -64,3 +65,44 @@ class TestUnit(unittest.TestCase):
         self.assertEqualTextAndNumber("abc", "abc", "")
         self.assertEqualTextAndNumber("abc1abc", "abc1abc", "")
         self.assertEqualTextAndNumber("abc1abc1", "abc1abc", "1")
+
+    def test_to_decimal(self):
+        self.assertEqual(util.to_decimal(""), None)
+        self.assertEqual(util.to_decimal(None), None)
+        self.assertEqual(util.to_decimal("s"), None)
+        self.assertEqual(util.to_decimal("1"), Decimal("1"))
+        self.assertEqual(util.to_decimal("1.23s"), Decimal("1.23"))
+        self.assertEqual(util.to_decimal(" 1.23 s "), Decimal("1.23"))
+        self.assertEqual(util.to_decimal("-1.5e3J"), Decimal("-1500"))
+        self.assertEqual(util.to_decimal("12%"), Decimal("12"))
+        self.assertEqual(util.to_decimal("inf"), Decimal("inf"))
+        self.assertEqual(util.to_decimal("-Inf"), Decimal("-inf"))
+        self.assertTrue(util.to_decimal("NaN").is_nan())
+
+    def test_lazy_process_pool_executor(self):
+        executor = util.LazyProcessPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        self.assertListEqual([], list(executor.map(abs, [])))
+        self.assertListEqual([1], list(executor.map(abs, [-1])))
+        self.assertIsNone(executor._pool, "no worker processes should be started for one item")
+        self.assertListEqual([1, 2, 3], list(executor.map(abs, [-1, 2, -3])))
+        self.assertIsNotNone(executor._pool)
+        self.assertEqual(4, executor.submit(abs, -4).result())
+
+    def test_lazy_process_pool_executor_initializer(self):
+        executor = util.LazyProcessPoolExecutor(
+            max_workers=1, initializer=_set_initialized, initargs=(42,))
+        self.addCleanup(executor.shutdown)
+        self.assertListEqual([42, 42], list(executor.map(_get_initialized, [0, 1])))
+        self.assertEqual(42, executor.submit(_get_initialized, 2).result())
+
+
+_initialized = None
+
+def _set_initialized(value):
+    global _initialized
+    assert _initialized is None, "initializer should be called only once per process"
+    _initialized = value
+
+def _get_initialized(unused_arg):
+    return _initialized
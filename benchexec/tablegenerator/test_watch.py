@@ -0,0 +1,160 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import tablegenerator
+
+here = os.path.relpath(os.path.dirname(__file__))
+result_dir = os.path.join(here, 'test_integration', 'results')
+
+
+def result_file(name):
+    return os.path.join(result_dir, name)
+
+
+def stats_to_str(stats):
+    return [[str(value) for value in row] for row in stats]
+
+
+class TestWatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.options = argparse.Namespace(
+            ignore_errors=False, all_columns=False, correct_only=False, cache_dir=None, common=False)
+        self.tmp = tempfile.mkdtemp(prefix="table_generator_watch_test_")
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def load_results(self, files):
+        results = list(tablegenerator.load_results(files, self.options, defer_log_values=True))
+        tablegenerator.collect_values_from_logs(results, False)
+        return results
+
+    def get_stats(self, results, stats_cache):
+        for result in results:
+            result.results = list(result.loaded_runs)
+        tablegenerator.merge_tasks(results)
+        rows = tablegenerator.get_rows(results)
+        return tablegenerator.get_stats(rows, None, False, stats_cache)[0]
+
+    def test_stats_cache(self):
+        files = [result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'),
+                 result_file('test.2015-03-03_1815.results.predicateAnalysis.xml')]
+        results = self.load_results(files)
+        for result in results:
+            result.loaded_runs = result.results
+
+        computed_columns = []
+        original_get_stats_of_run_set = tablegenerator.get_stats_of_run_set
+        def get_stats_of_run_set(runResults, correct_only):
+            computed_columns.append(runResults)
+            return original_get_stats_of_run_set(runResults, correct_only)
+        tablegenerator.get_stats_of_run_set = get_stats_of_run_set
+        self.addCleanup(setattr, tablegenerator, 'get_stats_of_run_set', original_get_stats_of_run_set)
+
+        stats_cache = tablegenerator.StatsCache()
+        expected = stats_to_str(self.get_stats(results, None))
+        del computed_columns[:]
+
+        self.assertListEqual(expected, stats_to_str(self.get_stats(results, stats_cache)))
+        self.assertEqual(2, len(computed_columns))
+        stats_cache.next_generation()
+
+        # unchanged results are reused
+        self.assertListEqual(expected, stats_to_str(self.get_stats(results, stats_cache)))
+        self.assertEqual(2, len(computed_columns))
+        stats_cache.next_generation()
+
+        # changed results are computed again
+        new_result = self.load_results(files[1:])[0]
+        new_result.loaded_runs = new_result.results
+        results[1] = new_result
+        self.assertListEqual(expected, stats_to_str(self.get_stats(results, stats_cache)))
+        self.assertEqual(3, len(computed_columns))
+
+    def test_reload_results(self):
+        file = os.path.join(self.tmp, 'test.results.xml')
+        shutil.copy(result_file('test.2015-03-03_1613.results.predicateAnalysis.xml'), file)
+        stamps = {}
+        results = {}
+
+        changed_files = [(file, tablegenerator._get_file_stamp(file))]
+        self.assertTrue(tablegenerator._reload_results(changed_files, None, self.options, stamps, results))
+        self.assertEqual(changed_files[0][1], stamps[file])
+        result, runs, unused_attributes = results[file]
+        self.assertEqual(len(runs), len(result.results))
+
+        # invalid files do not replace previous results
+        with open(file, 'w') as f:
+            f.write('<result')
+        changed_files = [(file, tablegenerator._get_file_stamp(file))]
+        self.assertFalse(tablegenerator._reload_results(changed_files, None, self.options, stamps, results))
+        self.assertIs(result, results[file][0])
+        self.assertNotEqual(changed_files[0][1], stamps[file])
+
+        os.remove(file)
+        self.assertIsNone(tablegenerator._get_file_stamp(file))
+
+    def test_find_watched_files(self):
+        def find(*patterns):
+            return [os.path.relpath(f, self.tmp) for f in tablegenerator._find_watched_files(
+                [os.path.join(self.tmp, pattern) for pattern in patterns])]
+
+        self.assertListEqual([], find('*.results*.xml'))
+
+        for name in ['a.results.xml.journal', 'b.results.xml', 'c.results.xml.journal']:
+            open(os.path.join(self.tmp, name), 'w').close()
+        self.assertListEqual(
+            ['a.results.xml.journal', 'b.results.xml', 'c.results.xml.journal'],
+            find('*.results*.xml'))
+        self.assertListEqual(['a.results.xml.journal'], find('a.results.xml.journal'))
+
+        # the result file replaces the journal once the run set is finished
+        open(os.path.join(self.tmp, 'a.results.xml'), 'w').close()
+        self.assertListEqual(
+            ['a.results.xml', 'b.results.xml', 'c.results.xml.journal'], find('*.results*.xml'))
+        self.assertListEqual(['a.results.xml'], find('a.results.xml.journal'))
+        self.assertListEqual(['a.results.xml'], find('a.results.xml'))
+
+    def test_reload_missing_file(self):
+        file = os.path.join(self.tmp, 'test.results.xml.journal')
+        stamps = {}
+        results = {}
+        changed_files = [(file, tablegenerator._get_file_stamp(file))]
+        self.assertFalse(tablegenerator._reload_results(changed_files, None, self.options, stamps, results))
+        self.assertNotIn(file, results)
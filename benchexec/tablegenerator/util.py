@@ -23,27 +23,33 @@ This module contains some useful functions for Strings, Files and Lists.
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import contextlib
 from decimal import Decimal
 import glob
+import gzip
 import io
 import json
 import logging
 import os
 import re
+import string
 from urllib.parse import quote as url_quote
-import urllib.request
-import tempita
-
 import benchexec.util
+from benchexec import resultdb
+from benchexec.tablegenerator import remote
+from benchexec.tablegenerator import templates
 
 
-def get_file_list(shortFile):
+def get_file_list(shortFile, warn_if_missing=True):
     """
     The function get_file_list expands a short filename to a sorted list
     of filenames. The short filename can contain variables and wildcards.
+    @param warn_if_missing: whether to log a warning if no file matches
     """
     if "://" in shortFile: # seems to be a URL
         return [shortFile]
+    if resultdb.is_run_set_reference(shortFile):
+        return [shortFile]
 
     # expand tilde and variables
     expandedFile = os.path.expandvars(os.path.expanduser(shortFile))
@@ -55,10 +61,12 @@ def get_file_list(shortFile):
     # if list is emtpy, sorting returns None, so better do not sort
     if len(fileList) != 0:
         fileList.sort()
-    else:
+    elif warn_if_missing:
         logging.warning("No file matches '%s'.", shortFile)
 
-    return fileList
+    # each run set in a result database is handled like a separate result file
+    return [f for file in fileList
+            for f in (resultdb.get_run_set_references(file) if resultdb.is_database(file) else [file])]
 
 
 def extend_file_list(filelist):
@@ -69,28 +77,71 @@ def extend_file_list(filelist):
     return [file for wildcardFile in filelist for file in get_file_list(wildcardFile)]
 
 
+def write_file_atomically(content, file):
+    """
+    Write a text file such that concurrent readers see either the old or the new content,
+    but never a partially written file.
+    """
+    with open_file_atomically(file) as f:
+        f.write(content)
+
+
+@contextlib.contextmanager
+def open_file_atomically(file, compress=False):
+    """
+    Open a text file for writing such that concurrent readers see either the old or the new content,
+    but never a partially written file: the file is replaced only after the with block succeeded.
+    @param compress: whether to write the file compressed with gzip
+    """
+    tmp_file = '{}.{}.tmp'.format(file, os.getpid())
+    try:
+        with (gzip.open(tmp_file, 'wt') if compress else open(tmp_file, 'w')) as f:
+            yield f
+        benchexec.util.replace_file(tmp_file, file)
+    except:
+        try:
+            os.remove(tmp_file)
+        except EnvironmentError:
+            pass
+        raise
+
+
 def make_url(path_or_url):
     """Make a URL from a string which is either a URL or a local path,
     by adding "file:" if necessary.
     """
     if not is_url(path_or_url):
+        import urllib.request
         return "file:" + urllib.request.pathname2url(path_or_url)
     return path_or_url
 
 
-def open_url_seekable(path_url, mode='rt'):
-    """Open a URL and ensure that the result is seekable,
-    copying it into a buffer if necessary."""
+def open_path_or_url(path_or_url):
+    """Open a local file or a URL in binary mode, such that the result is seekable.
+    Local files are opened directly, which is faster than through a "file:" URL."""
+    if is_url(path_or_url):
+        return open_url_seekable(path_or_url, mode='rb')
+    return open(path_or_url, 'rb')
 
-    logging.debug("Making request to '%s'", path_url)
-    response = urllib.request.urlopen(path_url)
-    logging.debug("Got response %s", response.info())
 
-    try:
-        response.seek(0)
-    except (IOError, AttributeError):
-        # Copy into buffer to allow seeking.
-        response = io.BytesIO(response.read())
+def open_url_seekable(path_url, mode='rt', random_access=False):
+    """Open a URL and ensure that the result is seekable,
+    copying it into a buffer if necessary.
+    Remote files are retrieved through the module remote if it is configured.
+    @param random_access: whether only small parts of the file will be read"""
+
+    response = remote.open_url(path_url, random_access)
+    if response is None:
+        import urllib.request
+        logging.debug("Making request to '%s'", path_url)
+        response = urllib.request.urlopen(path_url)
+        logging.debug("Got response %s", response.info())
+
+        try:
+            response.seek(0)
+        except (IOError, AttributeError):
+            # Copy into buffer to allow seeking.
+            response = io.BytesIO(response.read())
     if "b" in mode:
         return response
     else:
@@ -181,6 +232,12 @@ def format_options(options):
 
 def to_decimal(s):
     if s:
+        # fast path for numbers with an optional unit (e.g., '1.23s'),
+        # the result is the same as with split_number_and_unit
+        number = s.strip().rstrip(string.ascii_letters)
+        if number[-1:].isdigit():
+            return Decimal(number)
+
         if s.lower() in ['nan', 'inf', '-inf']:
             return Decimal(s)
         else:
@@ -221,7 +278,7 @@ def flatten(list_):
 
 
 def to_json(obj):
-    return tempita.html(json.dumps(obj, sort_keys=True))
+    return templates.html(json.dumps(obj, sort_keys=True))
 
 
 def merge_entries_with_common_prefixes(list_, number_of_needed_commons=6):
@@ -299,6 +356,64 @@ class DummyExecutor(object):
         pass
 
 
+# The initializer and its arguments that were already called in this process
+_process_initialized_with = None
+
+def _run_initialized(initializer, initargs, func, *args, **kwargs):
+    """Call the initializer once per process, and then the given function."""
+    global _process_initialized_with
+    if _process_initialized_with != (initializer, initargs):
+        initializer(*initargs)
+        _process_initialized_with = (initializer, initargs)
+    return func(*args, **kwargs)
+
+
+class LazyProcessPoolExecutor(object):
+    """Executor that starts a concurrent.futures.ProcessPoolExecutor
+    only when work is submitted to it for the first time,
+    such that no worker processes are started if they are not needed.
+    Calls of map() with at most one item are executed directly in the current process.
+    The initializer is called in each worker process before its first task
+    (ProcessPoolExecutor supports this itself only since Python 3.7).
+    Not all features of ProcessPoolExecutor are supported.
+    """
+
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            import concurrent.futures
+            self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _initialized(self, func):
+        if self.initializer is None:
+            return func
+        import functools
+        return functools.partial(_run_initialized, self.initializer, self.initargs, func)
+
+    def submit(self, func, *args, **kwargs):
+        return self._get_pool().submit(self._initialized(func), *args, **kwargs)
+
+    def map(self, func, *iterables):
+        args = list(zip(*iterables))
+        if len(args) <= 1:
+            return [func(*a) for a in args]
+        return self._get_pool().map(self._initialized(func), *zip(*args))
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait)
+
+
+class ResultFileError(Exception):
+    """Exception raised for result files that cannot be read or are invalid."""
+
+
 class TableDefinitionError(Exception):
     """Exception raised for errors in the table definition.
 
@@ -19,13 +19,15 @@
 # prepare for Python 3
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import collections
 import itertools
 import logging
+import math
 import sys
 import unittest
 sys.dont_write_bytecode = True # prevent creation of .pyc files
 
-from benchexec.resources import _get_cpu_cores_per_run0
+from benchexec.resources import _get_cpu_cores_per_run0, _get_memory_banks_per_run0
 
 def lrange(start, end):
     return list(range(start, end))
@@ -300,3 +302,155 @@ class TestCpuCoresPerRun_quadCPU_HT(TestCpuCoresPerRun):
 
 # prevent execution of base class as its own test
 del(TestCpuCoresPerRun)
+
+
+def synthetic_machine(packages, cores_per_package, threads_per_core, removed_cores=()):
+    """Create the parameters of _get_cpu_cores_per_run0 for a synthetic machine.
+    CPUs are numbered like Linux does on Intel machines,
+    i.e., first all physical cores, then all their hyper-threading siblings.
+    @param removed_cores: physical cores (with all their siblings) that are not in the cpuset
+    """
+    physical_cores = packages * cores_per_package
+    allCpus = []
+    cores_of_package = collections.defaultdict(list)
+    siblings_of_core = {}
+    for thread in range(threads_per_core):
+        for physical_core in range(physical_cores):
+            if physical_core in removed_cores:
+                continue
+            core = thread * physical_cores + physical_core
+            allCpus.append(core)
+            cores_of_package[physical_core // cores_per_package].append(core)
+            siblings_of_core[core] = [t * physical_cores + physical_core for t in range(threads_per_core)]
+    return (allCpus, dict(cores_of_package), siblings_of_core)
+
+
+class TestCpuCoresPerRunInvariants(unittest.TestCase):
+    """
+    Check properties that every core assignment needs to fulfill
+    on synthetic machines with up to 512 virtual cores,
+    instead of comparing against a hard-coded expected assignment.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        logging.disable(logging.CRITICAL)
+
+    def assertInvariants(self, coreLimit, num_of_threads, machine):
+        allCpus, cores_of_package, siblings_of_core = machine
+        package_of_core = {core: package for package, cores in cores_of_package.items() for core in cores}
+        msg = "for {} cores and {} threads".format(coreLimit, num_of_threads)
+
+        # Copy the input because it may be changed by the method
+        result = _get_cpu_cores_per_run0(coreLimit, num_of_threads, list(allCpus),
+            {package: list(cores) for package, cores in cores_of_package.items()},
+            siblings_of_core)
+
+        self.assertEqual(num_of_threads, len(result), msg)
+        for cores in result:
+            self.assertEqual(coreLimit, len(cores), msg)
+            self.assertTrue(set(cores).issubset(allCpus), msg)
+        all_assigned_cores = list(itertools.chain(*result))
+        self.assertEqual(len(all_assigned_cores), len(set(all_assigned_cores)),
+                         "Cores are assigned to more than one run " + msg)
+
+        threads_per_core = len(siblings_of_core[allCpus[0]])
+        package_size = len(allCpus) // len(cores_of_package)
+        coreLimit_rounded_up = int(math.ceil(coreLimit / threads_per_core) * threads_per_core)
+        runs_per_package = int(math.ceil(num_of_threads / len(cores_of_package)))
+
+        if coreLimit_rounded_up <= package_size:
+            # Each run fits on a single package and runs are spread evenly
+            for cores in result:
+                self.assertEqual(1, len(set(package_of_core[core] for core in cores)),
+                                 "Run is split across packages " + msg)
+            runs_of_package = collections.Counter(package_of_core[cores[0]] for cores in result)
+            self.assertLessEqual(max(runs_of_package.values()) - min(runs_of_package.values()), 1,
+                                 "Runs are not spread evenly across packages " + msg)
+            sharing_is_avoidable = coreLimit_rounded_up * runs_per_package <= package_size
+        else:
+            sharing_is_avoidable = coreLimit_rounded_up * num_of_threads <= len(allCpus)
+
+        if sharing_is_avoidable:
+            physical_core_of_run = {}
+            for run, cores in enumerate(result):
+                for core in cores:
+                    physical_core = min(siblings_of_core[core])
+                    self.assertEqual(run, physical_core_of_run.setdefault(physical_core, run),
+                                     "Physical core {} is shared between runs {}".format(physical_core, msg))
+
+        return result
+
+    def assertInvariantsForAllValidLimits(self, machine):
+        allCpus = machine[0]
+        for coreLimit in [1, 2, 3, 4, 6, 8, 16, 32, 64]:
+            max_threads = len(allCpus) // coreLimit
+            for num_of_threads in sorted({1, 2, 3, max_threads // 2, max_threads}):
+                if num_of_threads < 1:
+                    continue
+                try:
+                    self.assertInvariants(coreLimit, num_of_threads, machine)
+                except SystemExit:
+                    # Not all valid-looking combinations are supported by the algorithm,
+                    # but if it produces a result, it has to be valid.
+                    pass
+
+    def test_packages_without_smt(self):
+        for packages in [1, 2, 4, 8]:
+            self.assertInvariantsForAllValidLimits(synthetic_machine(packages, 256 // packages, 1))
+
+    def test_packages_with_smt(self):
+        for packages in [1, 2, 4, 8]:
+            self.assertInvariantsForAllValidLimits(synthetic_machine(packages, 256 // packages, 2))
+
+    def test_512_virtual_cores(self):
+        machine = synthetic_machine(8, 32, 2)
+        self.assertEqual(512, len(machine[0]))
+        self.assertInvariants(1, 512, machine)
+        self.assertInvariants(2, 256, machine)
+        self.assertInvariants(64, 8, machine)
+        self.assertInvariants(128, 4, machine)
+
+    def test_symmetrically_reduced_cpuset(self):
+        # Remove the same number of physical cores from every package
+        removed_cores = {package * 32 + core for package in range(4) for core in (3, 17)}
+        self.assertInvariantsForAllValidLimits(synthetic_machine(4, 32, 2, removed_cores))
+
+    def test_uneven_cpuset(self):
+        # Asymmetric cpusets are not supported and need to be rejected instead of being used unfairly
+        machine = synthetic_machine(2, 32, 2, removed_cores={0, 1, 2})
+        self.assertRaises(SystemExit, self.assertInvariants, 1, 4, machine)
+        self.assertRaises(SystemExit, self.assertInvariants, 4, 2, machine)
+
+    def test_incomplete_physical_core(self):
+        allCpus, cores_of_package, siblings_of_core = synthetic_machine(2, 8, 2)
+        allCpus.remove(16)
+        cores_of_package[0].remove(16)
+        del siblings_of_core[16]
+        self.assertRaises(SystemExit, self.assertInvariants, 1, 2,
+                          (allCpus, cores_of_package, siblings_of_core))
+
+
+class TestMemoryBanksPerRun(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        logging.disable(logging.CRITICAL)
+
+    def test_banks_of_package(self):
+        allCpus, cores_of_package, siblings_of_core = synthetic_machine(4, 32, 2)
+        mems_of_core = {core: [package] for package, cores in cores_of_package.items() for core in cores}
+        core_assignment = _get_cpu_cores_per_run0(16, 8, allCpus, cores_of_package, siblings_of_core)
+
+        result = _get_memory_banks_per_run0(core_assignment, {0, 1, 2, 3}, mems_of_core)
+
+        self.assertEqual(len(core_assignment), len(result))
+        for cores, mems in zip(core_assignment, result):
+            self.assertEqual(sorted(set(mems_of_core[core][0] for core in cores)), mems)
+
+    def test_restricted_banks(self):
+        mems_of_core = {0: [0], 1: [0], 2: [1], 3: [1]}
+        self.assertEqual([[0], []], _get_memory_banks_per_run0([[0, 1], [2, 3]], {0}, mems_of_core))
+        self.assertEqual([[0, 1]], _get_memory_banks_per_run0([[1, 2]], {0, 1}, mems_of_core))
@@ -0,0 +1,87 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec.filewriter import FileWriter
+
+
+class TestFileWriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_filewriter_")
+        self.filename = os.path.join(self.base_dir, "file.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def assertFileContent(self, expected):
+        with open(self.filename) as f:
+            self.assertEqual(expected, f.read())
+
+    def assertFileLines(self, expected):
+        with open(self.filename) as f:
+            self.assertEqual(expected, [line.rstrip(" \n") for line in f])
+
+    def test_append(self):
+        writer = FileWriter(self.filename, "header\n")
+        writer.append("a\n")
+        writer.append("temp\n", keep=False)
+        self.assertFileContent("header\na\ntemp\n")
+        writer.append("b\n")
+        self.assertFileContent("header\na\nb\n")
+
+    def test_updatable_lines(self):
+        writer = FileWriter(self.filename, "header\n")
+        writer.append_updatable_lines(["run1", "run2", "----------"])
+        self.assertFileLines(["header", "run1", "run2", "----------"])
+
+        writer.update_line(1, "run2 done")
+        self.assertFileLines(["header", "run1", "run2 done", "----------"])
+        writer.update_line(0, "run1 done äöü")
+        self.assertFileLines(["header", "run1 done äöü", "run2 done", "----------"])
+
+        # longer than all previous lines
+        writer.update_line(1, "run2 done with a much longer line")
+        self.assertFileLines(["header", "run1 done äöü", "run2 done with a much longer line", "----------"])
+
+        # updatable lines are forgotten and result is the same as without them
+        writer.append("final\n")
+        self.assertFileContent("header\nfinal\n")
+
+    def test_updatable_lines_after_temporary_content(self):
+        writer = FileWriter(self.filename, "header\n")
+        writer.append("temp\n", keep=False)
+        writer.append_updatable_lines(["run1", "run2"])
+        writer.update_line(0, "run1 done")
+        self.assertFileLines(["header", "run1 done", "run2"])
+        writer.append_updatable_lines(["run3"])
+        self.assertFileLines(["header", "run3"])
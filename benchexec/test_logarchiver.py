@@ -0,0 +1,153 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import zipfile
+import zlib
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import logarchiver
+
+
+class TestLogArchiver(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_logarchiver_")
+        self.zip_filename = os.path.join(self.base_dir, "logfiles.zip")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def create_log(self, i, size=1000):
+        filename = os.path.join(self.base_dir, "run{}.log".format(i))
+        with open(filename, 'w') as f:
+            f.write(("line {} of log {}\n".format(i, i) * size))
+        return filename
+
+    def check_archive(self, expected_names, archiver_class=logarchiver.LogArchiver, **kwargs):
+        archiver = archiver_class(self.zip_filename, **kwargs)
+        for i, name in enumerate(expected_names):
+            archiver.add(self.create_log(i), name)
+        archiver.flush()
+        self.assertEqual([], [f for f in os.listdir(self.base_dir) if f.endswith('.log')],
+                         "log files should be deleted after flush()")
+        archiver.close()
+
+        with zipfile.ZipFile(self.zip_filename) as zip:
+            self.assertIsNone(zip.testzip())
+            self.assertEqual(expected_names, zip.namelist())
+            for i, name in enumerate(expected_names):
+                self.assertEqual("line {} of log {}\n".format(i, i) * 1000,
+                                 zip.read(name).decode())
+                self.assertEqual(zipfile.ZIP_DEFLATED, zip.getinfo(name).compress_type)
+
+    def test_empty(self):
+        self.check_archive([])
+
+    def test_order(self):
+        self.check_archive(["logs/run{}.log".format(i) for i in range(50)], num_of_threads=4, max_pending=2)
+
+    def test_without_precompression(self):
+        with mock.patch.object(logarchiver, '_MAX_PRECOMPRESSED_SIZE', 0), \
+                mock.patch.object(logarchiver, '_READ_CHUNK_SIZE', 1000):
+            self.check_archive(["logs/run{}.log".format(i) for i in range(5)])
+
+    def test_non_ascii_name(self):
+        self.check_archive(["logs/r\u00fcn.log"])
+
+    def test_zip64(self):
+        with mock.patch.object(logarchiver, '_ZIP64_LIMIT', 1000), \
+                mock.patch.object(logarchiver, '_ZIP_MAX_ENTRIES', 3):
+            self.check_archive(["logs/run{}.log".format(i) for i in range(5)])
+
+    def test_zip64_without_precompression(self):
+        with mock.patch.object(logarchiver, '_ZIP64_LIMIT', 1000), \
+                mock.patch.object(logarchiver, '_MAX_PRECOMPRESSED_SIZE', 0):
+            self.check_archive(["logs/run{}.log".format(i) for i in range(5)])
+
+    def test_concurrent_add(self):
+        archiver = logarchiver.LogArchiver(self.zip_filename, num_of_threads=4, max_pending=3)
+        files = [self.create_log(i) for i in range(40)]
+        threads = [threading.Thread(target=lambda part=part:
+                        [archiver.add(f, os.path.basename(f)) for f in files[part::4]])
+                   for part in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        archiver.close()
+        with zipfile.ZipFile(self.zip_filename) as zip:
+            self.assertIsNone(zip.testzip())
+            self.assertEqual(sorted(os.path.basename(f) for f in files), sorted(zip.namelist()))
+
+    def test_missing_file(self):
+        archiver = logarchiver.LogArchiver(self.zip_filename)
+        archiver.add(os.path.join(self.base_dir, "missing.log"), "missing.log")
+        archiver.add(self.create_log(0), "run0.log")
+        archiver.close()
+        with zipfile.ZipFile(self.zip_filename) as zip:
+            self.assertEqual(["run0.log"], zip.namelist())
+
+    def test_unexpected_error(self):
+        archiver = logarchiver.LogArchiver(self.zip_filename, max_pending=1)
+        files = [self.create_log(i) for i in range(5)]
+        with mock.patch.object(logarchiver, '_compress_file', side_effect=MemoryError):
+            for f in files[:3]:
+                archiver.add(f, os.path.basename(f))
+            archiver.flush()
+        self.assertTrue(all(os.path.exists(f) for f in files[:3]), "log files should be kept")
+
+        # the archiver still works afterwards
+        for f in files[3:]:
+            archiver.add(f, os.path.basename(f))
+        archiver.flush()
+        self.assertFalse(any(os.path.exists(f) for f in files[3:]))
+        archiver.close()
+        with zipfile.ZipFile(self.zip_filename) as zip:
+            self.assertIsNone(zip.testzip())
+            self.assertEqual([os.path.basename(f) for f in files[3:]], zip.namelist())
+
+    def test_error_while_writing(self):
+        archiver = logarchiver.LogArchiver(self.zip_filename, max_pending=1)
+        files = [self.create_log(i) for i in range(3)]
+        archiver.add(files[0], "run0.log")
+        archiver.flush()
+        with mock.patch.object(logarchiver, '_MAX_PRECOMPRESSED_SIZE', 0), \
+                mock.patch.object(logarchiver.zlib, 'crc32', side_effect=zlib.error):
+            archiver.add(files[1], "run1.log")
+            archiver.flush()
+        self.assertTrue(os.path.exists(files[1]), "log file should be kept")
+        archiver.add(files[2], "run2.log")
+        archiver.close()
+        with zipfile.ZipFile(self.zip_filename) as zip:
+            self.assertIsNone(zip.testzip())
+            self.assertEqual(["run0.log", "run2.log"], zip.namelist())
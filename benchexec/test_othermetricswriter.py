@@ -0,0 +1,141 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import types
+import unittest
+from xml.etree import ElementTree
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec.model import Benchmark
+from benchexec.othermetricswriter import Othermetricswriter
+
+CPACHECKER_STATISTICS = """
+CEGAR algorithm statistics
+--------------------------
+Number of refinements:                5
+Number of successful refinements:     4
+Total time for CEGAR algorithm:     1.234s
+Time for refinement:                  0.456s
+
+Length of refined path (in blocks):          7 (count: 4, total: 27, max: 10)
+Attempted forced coverings:             12
+Successful forced coverings:            3 (25%)
+Number of computed successors:       1280
+Total time for CPA algorithm:         2.500s (Max:     1.000s)
+Time for forced covering:              0.012s
+Time for transfer relation:            0.345s
+Total time for SMT solver (w/o itp):   0.067s
+Number of abstractions:             42 (5% of all post computations)
+"""
+
+
+class TestOthermetricswriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_othermetricswriter_")
+        self.log_folder = os.path.join(self.base_dir, "logfiles") + os.sep
+        os.mkdir(self.log_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def create_run_set(self, metrics=None):
+        benchmark = types.SimpleNamespace(metrics=metrics)
+        return types.SimpleNamespace(benchmark=benchmark, log_folder=self.log_folder)
+
+    def create_run(self, name, output):
+        log_file = os.path.join(self.log_folder, name + ".log")
+        with open(log_file, 'w') as f:
+            f.write(output)
+        return types.SimpleNamespace(identifier=name, log_file=log_file)
+
+    def read_rows(self, writer):
+        with open(writer.filename) as f:
+            return list(csv.DictReader(f))
+
+    def test_default_metrics(self):
+        writer = Othermetricswriter(self.create_run_set())
+        writer.other_before_runset()
+        writer.other_after_run(self.create_run("task1", CPACHECKER_STATISTICS))
+        writer.other_after_run(self.create_run("task2", "no statistics\n"))
+        writer.other_after_runset()
+
+        rows = self.read_rows(writer)
+        self.assertEqual(writer.fieldnames, ["FileName","NoR","RLen","RLeninBlkAvg","AFC","SFC","ComS","TfR","TTfCPA","TfFC","TfTran","TfSMTwoitp","NoAbs"])
+        self.assertEqual(2, len(rows))
+        self.assertEqual({
+            "FileName": "task1", "NoR": "4", "RLen": "7", "RLeninBlkAvg": "10", "AFC": "12",
+            "SFC": "3", "ComS": "1280", "TfR": "0.456", "TTfCPA": "2.500", "TfFC": "0.012",
+            "TfTran": "0.345", "TfSMTwoitp": "0.067", "NoAbs": "42",
+            }, dict(rows[0]))
+        self.assertEqual("task2", rows[1]["FileName"])
+        self.assertTrue(all(value == "none" for key, value in rows[1].items() if key != "FileName"))
+
+    def test_metrics_from_benchmark_definition(self):
+        metrics = Benchmark.load_metrics(ElementTree.fromstring(
+            '<metrics>'
+            '<metric title="refinements">Number of refinements:\\s*(\\d+)</metric>'
+            '<metric title="cegar">CEGAR algorithm statistics</metric>'
+            '</metrics>'))
+        self.assertIsNone(Benchmark.load_metrics(None))
+
+        writer = Othermetricswriter(self.create_run_set(metrics))
+        writer.other_before_runset()
+        writer.other_after_run(self.create_run("task1", CPACHECKER_STATISTICS))
+        writer.flush()
+        # rows are visible on disk before the end of the run set
+        self.assertEqual([{"FileName": "task1", "refinements": "5", "cegar": "CEGAR algorithm statistics"}],
+                         [dict(row) for row in self.read_rows(writer)])
+        writer.other_after_runset()
+
+    def test_concurrent_runs(self):
+        writer = Othermetricswriter(self.create_run_set(), batch_size=3)
+        writer.other_before_runset()
+        runs = [self.create_run("task{}".format(i), CPACHECKER_STATISTICS) for i in range(40)]
+        threads = [threading.Thread(target=lambda part=part: [writer.other_after_run(run) for run in runs[part::4]])
+                   for part in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.other_after_runset()
+
+        rows = self.read_rows(writer)
+        self.assertEqual(sorted(run.identifier for run in runs), sorted(row["FileName"] for row in rows))
+        self.assertTrue(all(row["NoR"] == "4" for row in rows))
+
+    def test_missing_log_file(self):
+        writer = Othermetricswriter(self.create_run_set())
+        writer.other_before_runset()
+        writer.other_after_run(types.SimpleNamespace(identifier="task", log_file=os.path.join(self.base_dir, "missing")))
+        writer.other_after_runset()
+        self.assertEqual(["task"], [row["FileName"] for row in self.read_rows(writer)])
@@ -0,0 +1,92 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import sys
+import unittest
+from xml.dom import minidom
+from xml.etree import ElementTree as ET
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import outputhandler
+
+
+def minidom_pretty_xml(xml):
+    """The formerly used way of writing result XML files, as reference."""
+    reparsed = minidom.parseString(ET.tostring(xml, encoding='unicode'))
+    doctype = minidom.DOMImplementation().createDocumentType(
+            'result', outputhandler.RESULT_XML_PUBLIC_ID, outputhandler.RESULT_XML_SYSTEM_ID)
+    reparsed.insertBefore(doctype, reparsed.documentElement)
+    output = io.StringIO()
+    reparsed.writexml(output, indent="", addindent="  ", newl="\n", encoding="utf-8")
+    return output.getvalue()
+
+
+def streamed_pretty_xml(xml):
+    output = io.StringIO()
+    outputhandler._write_pretty_xml(xml, output.write)
+    return output.getvalue()
+
+
+class TestPrettyXml(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def assertSameAsMinidom(self, xml):
+        self.assertEqual(minidom_pretty_xml(xml), streamed_pretty_xml(xml))
+
+    def test_empty_result(self):
+        self.assertSameAsMinidom(ET.Element('result'))
+
+    def test_result_with_runs(self):
+        xml = ET.Element('result', {'benchmarkname': 'test', 'date': '2018-01-01 00:00:00 CET', 'tool': 'Tool'})
+        columns = ET.SubElement(xml, 'columns')
+        ET.SubElement(columns, 'column', {'title': 'status'})
+        ET.SubElement(xml, 'description').text = 'some description'
+        for i in range(3):
+            run = ET.SubElement(xml, 'run', {'name': 'file{}.c'.format(i), 'files': '[file{}.c]'.format(i)})
+            ET.SubElement(run, 'column', {'title': 'status', 'value': 'true'})
+            ET.SubElement(run, 'column', {'title': 'cputime', 'value': '1.{}s'.format(i)})
+        self.assertSameAsMinidom(xml)
+
+    def test_special_characters(self):
+        xml = ET.Element('result', {'name': 'a&b<c>"d\'e\tf\ng\rä'})
+        ET.SubElement(xml, 'description').text = 'a & b < c > d " e \' ä\tf\r\ng\rh\n'
+        ET.SubElement(xml, 'empty').text = ''
+        self.assertSameAsMinidom(xml)
+
+    def test_mixed_content(self):
+        xml = ET.Element('result')
+        xml.text = 'text'
+        child = ET.SubElement(xml, 'child')
+        child.text = 'child text'
+        child.tail = 'tail'
+        ET.SubElement(child, 'grandchild').tail = 'grandchild tail'
+        ET.SubElement(xml, 'other')
+        self.assertSameAsMinidom(xml)
+
+    def test_attributes_order(self):
+        xml = ET.Element('result')
+        ET.SubElement(xml, 'run', {'z': '1', 'a': '2', 'm': '3'})
+        self.assertSameAsMinidom(xml)
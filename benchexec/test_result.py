@@ -160,6 +160,15 @@ class TestResult(unittest.TestCase):
         self.assertEqual(True,  satisfies_file_property('test_true-no-deadlock.c',
                                                         [_PROP_SAT, _PROP_DEADLOCK]))
 
+    def test_satisfies_file_property_repeated_calls(self):
+        filename = 'test_true-unreach-call_false-termination_true-unreach-call.c'
+        for unused_i in range(2):
+            self.assertEqual(True,  satisfies_file_property(filename, [_PROP_CALL]))
+            self.assertEqual(False, satisfies_file_property(filename, [_PROP_TERMINATION]))
+            self.assertEqual(None,  satisfies_file_property(filename, [_PROP_CALL, _PROP_TERMINATION]))
+            self.assertEqual(None,  satisfies_file_property(filename, [_PROP_SAT]))
+        self.assertEqual(None,  satisfies_file_property('test_unsat_sat.smt2', [_PROP_SAT]))
+
 
     def test_score_for_task_no_score_available(self):
         self.assertEqual(0, score_for_task('test_true-unreach-call.c', [_PROP_CALL], CATEGORY_MISSING, None))
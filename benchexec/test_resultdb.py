@@ -0,0 +1,124 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from xml.etree import ElementTree as ET
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import resultdb
+
+
+class TestResultDatabase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_resultdb_")
+        self.filename = os.path.join(self.base_dir, "results.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def create_result_xml(self, name):
+        xml = ET.Element('result', {'benchmarkname': 'test', 'date': '2018-01-01 00:00:00 CET',
+                                    'tool': 'Tool', 'name': name})
+        columns = ET.SubElement(xml, 'columns')
+        ET.SubElement(columns, 'column', {'title': 'status'})
+        return xml
+
+    def create_run(self, i, status):
+        run = ET.Element('run', {'name': '../tasks/file{}.c'.format(i), 'files': '[../tasks/file{}.c]'.format(i)})
+        if i % 2:
+            run.set('properties', 'unreach-call')
+        ET.SubElement(run, 'column', {'title': 'category', 'value': 'correct', 'hidden': 'true'})
+        ET.SubElement(run, 'column', {'title': 'cputime', 'value': '{}.5s'.format(i)})
+        ET.SubElement(run, 'column', {'title': 'status', 'value': status})
+        return run
+
+    def fill_database(self, db, run_sets=2, runs=5):
+        benchmark_id = db.add_benchmark(self.create_result_xml(None))
+        expected = []
+        for run_set in range(run_sets):
+            xml = self.create_result_xml('runset{}'.format(run_set))
+            run_set_id = db.add_run_set(benchmark_id, xml, os.path.join(self.base_dir, 'runset{}.xml'.format(run_set)))
+            for i in range(runs):
+                run = self.create_run(i, 'TIMEOUT' if i == 3 else 'true')
+                xml.append(run)
+                db.add_run(run_set_id, run)
+            ET.SubElement(xml, 'column', {'title': 'walltime', 'value': '10s'})
+            xml.set('error', 'interrupted')
+            db.finish_run_set(run_set_id, xml)
+            expected.append(xml)
+        return expected
+
+    def test_round_trip(self):
+        db = resultdb.ResultDatabase(self.filename, batch_size=3)
+        expected = self.fill_database(db)
+        db.close()
+
+        self.assertTrue(resultdb.is_database(self.filename))
+        references = resultdb.get_run_set_references(self.filename)
+        self.assertEqual([self.filename + ":1", self.filename + ":2"], references)
+        for i, (reference, expected_xml) in enumerate(zip(references, expected)):
+            self.assertTrue(resultdb.is_run_set_reference(reference))
+            result_file, xml = resultdb.load_run_set(reference)
+            self.assertEqual(os.path.join(self.base_dir, 'runset{}.xml'.format(i)), result_file)
+            self.assertEqual(result_file, resultdb.load_run_set_file_name(reference))
+            self.assertEqual(ET.tostring(expected_xml, encoding='unicode'),
+                             ET.tostring(xml, encoding='unicode'))
+
+    def test_queries(self):
+        db = resultdb.ResultDatabase(self.filename)
+        self.fill_database(db)
+        db.close()
+        # results are added to an existing database
+        db = resultdb.ResultDatabase(self.filename)
+        self.fill_database(db, run_sets=1)
+        db.close()
+
+        connection = sqlite3.connect(self.filename)
+        try:
+            self.assertEqual(2, connection.execute("SELECT count(*) FROM benchmark").fetchone()[0])
+            self.assertEqual([('runset0', '../tasks/file3.c')] * 2 + [('runset1', '../tasks/file3.c')],
+                sorted(connection.execute(
+                    "SELECT runset.name, run.name FROM run JOIN runset ON run.runset_id = runset.id "
+                    "WHERE run.status = 'TIMEOUT'").fetchall()))
+            self.assertEqual(15, connection.execute(
+                "SELECT count(*) FROM run WHERE category = 'correct'").fetchone()[0])
+        finally:
+            connection.close()
+
+    def test_no_references(self):
+        self.assertFalse(resultdb.is_database(self.filename))
+        self.assertFalse(resultdb.is_run_set_reference(self.filename + ":1"))
+        resultdb.ResultDatabase(self.filename).close()
+        self.assertTrue(resultdb.is_run_set_reference(self.filename + ":1"))
+        self.assertFalse(resultdb.is_run_set_reference(self.filename + ":a"))
+        self.assertFalse(resultdb.is_run_set_reference(self.filename))
+        self.assertRaises(ValueError, resultdb.load_run_set, self.filename + ":1")
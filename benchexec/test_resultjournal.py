@@ -0,0 +1,115 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from xml.etree import ElementTree as ET
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import resultjournal
+
+
+class TestResultJournal(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_resultjournal_")
+        self.filename = os.path.join(self.base_dir, "results.xml.journal")
+
+        self.result_xml = ET.Element('result', {'benchmarkname': 'test & "more"', 'name': 'name'})
+        columns = ET.SubElement(self.result_xml, 'columns')
+        ET.SubElement(columns, 'column', {'title': 'status'})
+        ET.SubElement(self.result_xml, 'run', {'name': 'ignored'})
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def create_run(self, i):
+        run = ET.Element('run', {'name': 'file{}.c'.format(i)})
+        ET.SubElement(run, 'column', {'title': 'status', 'value': 'true <ä>'})
+        return run
+
+    def read_journal(self):
+        with open(self.filename, 'rb') as f:
+            return resultjournal.read_journal(f)
+
+    def assertRuns(self, result, expected_names):
+        self.assertEqual(expected_names, [run.get('name') for run in result.findall('run')])
+
+    def test_empty_journal(self):
+        resultjournal.ResultJournal(self.filename, self.result_xml).close()
+        result = self.read_journal()
+        self.assertEqual('result', result.tag)
+        self.assertEqual('incomplete', result.get('error'))
+        self.assertEqual('test & "more"', result.get('benchmarkname'))
+        self.assertEqual(['status'], [c.get('title') for c in result.find('columns')])
+        self.assertRuns(result, [])
+        self.assertNotIn('error', self.result_xml.attrib, "input must not be modified")
+
+    def test_runs(self):
+        journal = resultjournal.ResultJournal(self.filename, self.result_xml)
+        for i in range(3):
+            journal.append(self.create_run(i))
+        journal.close()
+        result = self.read_journal()
+        self.assertRuns(result, ['file0.c', 'file1.c', 'file2.c'])
+        self.assertEqual('true <ä>', result.find('run/column').get('value'))
+
+    def test_truncated_journal(self):
+        journal = resultjournal.ResultJournal(self.filename, self.result_xml)
+        for i in range(2):
+            journal.append(self.create_run(i))
+        journal.close()
+        with open(self.filename, 'rb') as f:
+            content = f.read()
+        for cut in [2, 10, 30]: # the last byte is a line break
+            result = resultjournal.read_journal(io.BytesIO(content[:-cut]))
+            self.assertRuns(result, ['file0.c'])
+        result = resultjournal.read_journal(io.BytesIO(content + b'<run name="x" garbage'))
+        self.assertRuns(result, ['file0.c', 'file1.c'])
+
+    def test_large_journal(self):
+        journal = resultjournal.ResultJournal(self.filename, self.result_xml)
+        for i in range(2000):
+            journal.append(self.create_run(i))
+        journal.close()
+        with open(self.filename, 'rb') as f:
+            content = f.read()
+        self.assertGreater(len(content), 2 * resultjournal._READ_CHUNK_SIZE)
+        result = resultjournal.read_journal(io.BytesIO(content + b'<run name="x" garbage'))
+        self.assertRuns(result, ['file{}.c'.format(i) for i in range(2000)])
+
+    def test_invalid_journal(self):
+        self.assertRaises(ET.ParseError, resultjournal.read_journal, io.BytesIO(b''))
+
+    def test_append_after_remove(self):
+        journal = resultjournal.ResultJournal(self.filename, self.result_xml)
+        journal.remove()
+        journal.append(self.create_run(0))
+        self.assertFalse(os.path.exists(self.filename))
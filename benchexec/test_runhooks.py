@@ -0,0 +1,114 @@
+# BenchExec is a framework for reliable benchmarking.
+# This file is part of BenchExec.
+#
+# Copyright (C) 2007-2018  Dirk Beyer
+# All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# prepare for Python 3
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import sys
+import threading
+import time
+import types
+import unittest
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+
+from benchexec import runhooks
+
+
+def create_run(i):
+    return types.SimpleNamespace(identifier="task{}".format(i), log_file="task{}.log".format(i))
+
+
+def example_hook(run, log_file):
+    pass
+
+
+class TestPostRunHooks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_load_hook(self):
+        self.assertIs(example_hook, runhooks.load_hook("benchexec.test_runhooks:example_hook"))
+        self.assertRaises(SystemExit, runhooks.load_hook, "benchexec.test_runhooks:missing_hook")
+        self.assertRaises(SystemExit, runhooks.load_hook, "benchexec.missing_module:hook")
+        self.assertRaises(SystemExit, runhooks.load_hook, "no-such-entry-point")
+
+    def test_hooks_and_callback(self):
+        calls = []
+        lock = threading.Lock()
+        def hook1(run, log_file):
+            with lock:
+                calls.append(("hook1", run.identifier, log_file))
+        def hook2(run, log_file):
+            with lock:
+                calls.append(("hook2", run.identifier, log_file))
+        def callback(run):
+            with lock:
+                calls.append(("callback", run.identifier, None))
+
+        runner = runhooks.PostRunHookRunner([hook1, hook2], max_workers=4)
+        for i in range(20):
+            runner.submit(create_run(i), callback)
+        self.assertEqual(0, runner.wait())
+        runner.shutdown()
+
+        self.assertEqual(60, len(calls))
+        for i in range(20):
+            calls_for_run = [call[0] for call in calls if call[1] == "task{}".format(i)]
+            self.assertEqual(["hook1", "hook2", "callback"], calls_for_run)
+        self.assertIn(("hook1", "task3", "task3.log"), calls)
+
+    def test_failing_hook(self):
+        finished = []
+        def failing_hook(run, log_file):
+            raise ValueError("hook failure")
+        runner = runhooks.PostRunHookRunner([failing_hook, lambda run, log_file: finished.append(run)])
+        runner.submit(create_run(0), callback=finished.append)
+        runner.submit(create_run(1))
+        self.assertEqual(2, runner.wait())
+        runner.shutdown()
+        self.assertEqual(3, len(finished), "other hooks and callback should be executed despite failure")
+
+    def test_bounded_pending_runs(self):
+        release = threading.Event()
+        def blocking_hook(run, log_file):
+            release.wait()
+        runner = runhooks.PostRunHookRunner([blocking_hook], max_workers=1, max_pending=2)
+        runner.submit(create_run(0))
+        runner.submit(create_run(1))
+
+        submitted = threading.Event()
+        def submit_third():
+            runner.submit(create_run(2))
+            submitted.set()
+        threading.Thread(target=submit_third).start()
+        time.sleep(0.1)
+        self.assertFalse(submitted.is_set(), "submit() should block while too many runs are pending")
+
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        runner.wait()
+        runner.shutdown()
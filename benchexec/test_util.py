@@ -154,3 +154,38 @@ class TestRmtree(unittest.TestCase):
 
     def test_dir_without_any_permissions(self):
         self.create_and_delete_directory(0)
+
+class TestReplaceFile(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.longMessage = True
+        cls.maxDiff = None
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix="BenchExec_test_util_replace_file")
+        self.addCleanup(util.rmtree, self.base_dir)
+        self.source = os.path.join(self.base_dir, "source")
+        self.target = os.path.join(self.base_dir, "target")
+
+    def check_replace_file(self):
+        util.write_file("new", self.source)
+        util.replace_file(self.source, self.target)
+        self.assertEqual("new", util.read_file(self.target))
+        self.assertFalse(os.path.exists(self.source))
+
+    def test_new_file(self):
+        self.check_replace_file()
+
+    def test_existing_file(self):
+        util.write_file("old", self.target)
+        self.check_replace_file()
+
+    def test_without_os_replace(self):
+        util.write_file("old", self.target)
+        replace = os.replace
+        del os.replace
+        try:
+            self.check_replace_file()
+        finally:
+            os.replace = replace
@@ -342,6 +342,15 @@ def makedirs(name, exist_ok=False):
             raise
 
 
+def replace_file(source, target):
+    """Rename a file and atomically replace the target if it exists.
+    Works like os.replace, which is missing in Python 3.2
+    (os.rename is used there, which also replaces atomically on POSIX systems).
+    """
+    replace = getattr(os, 'replace', os.rename)
+    replace(source, target)
+
+
 def rmtree(path, ignore_errors=False, onerror=None):
     """Same as shutil.rmtree, but supports directories without write or execute permissions."""
     if ignore_errors:
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+BenchExec is a framework for reliable benchmarking.
+This file is part of BenchExec.
+
+Copyright (C) 2007-2018  Dirk Beyer
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import collections
+import itertools
+import json
+import logging
+import math
+import os
+import sys
+import timeit
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from benchexec import resources
+
+DESCRIPTION = """Benchmark for the assignment of CPU cores and memory banks to parallel runs.
+It generates synthetic machine topologies (with and without hyper-threading,
+with 1 to 8 CPU packages, and with reduced cpusets),
+measures how long the assignment takes,
+and checks that each produced assignment fulfills the expected invariants
+(no overlapping cores, no shared physical cores if avoidable,
+runs spread evenly across packages).
+The results are written as a JSON report, and can be compared against
+a previous report to detect regressions of the assignment time.
+"""
+
+CORE_LIMITS = [1, 2, 4, 8, 16, 32]
+
+
+def synthetic_machine(packages, cores_per_package, threads_per_core, removed_cores=()):
+    """Create topology information for a machine where CPUs are numbered like on Intel machines,
+    i.e., first all physical cores, then all their hyper-threading siblings.
+    @param removed_cores: physical cores (with all their siblings) that are not in the cpuset
+    @return a tuple (allCpus, cores_of_package, siblings_of_core, mems_of_core)
+    """
+    physical_cores = packages * cores_per_package
+    allCpus = []
+    cores_of_package = collections.defaultdict(list)
+    siblings_of_core = {}
+    mems_of_core = {}
+    for thread in range(threads_per_core):
+        for physical_core in range(physical_cores):
+            if physical_core in removed_cores:
+                continue
+            core = thread * physical_cores + physical_core
+            package = physical_core // cores_per_package
+            allCpus.append(core)
+            cores_of_package[package].append(core)
+            siblings_of_core[core] = [t * physical_cores + physical_core for t in range(threads_per_core)]
+            mems_of_core[core] = [package]
+    return allCpus, dict(cores_of_package), siblings_of_core, mems_of_core
+
+
+def topologies():
+    for packages in [1, 2, 4, 8]:
+        for threads_per_core in [1, 2]:
+            for logical_cpus in [256, 512]:
+                cores_per_package = logical_cpus // packages // threads_per_core
+                yield ("{}x{}x{}".format(packages, cores_per_package, threads_per_core),
+                       synthetic_machine(packages, cores_per_package, threads_per_core))
+
+            # cpuset without two physical cores of each package
+            cores_per_package = 256 // packages // threads_per_core
+            removed = {p * cores_per_package + c for p in range(packages) for c in (1, 5)}
+            yield ("{}x{}x{}-reduced".format(packages, cores_per_package, threads_per_core),
+                   synthetic_machine(packages, cores_per_package, threads_per_core, removed))
+
+            # cpuset without two physical cores of the first package only (unsupported)
+            yield ("{}x{}x{}-uneven".format(packages, cores_per_package, threads_per_core),
+                   synthetic_machine(packages, cores_per_package, threads_per_core, {0, 1}))
+
+
+def check_invariants(assignment, coreLimit, num_of_threads, machine):
+    """Return a list of violated invariants of a core assignment."""
+    allCpus, cores_of_package, siblings_of_core, unused_mems = machine
+    package_of_core = {core: package for package, cores in cores_of_package.items() for core in cores}
+    violations = []
+
+    if len(assignment) != num_of_threads or any(len(cores) != coreLimit for cores in assignment):
+        violations.append("wrong number of cores")
+    all_cores = list(itertools.chain(*assignment))
+    if len(all_cores) != len(set(all_cores)):
+        violations.append("overlapping cores")
+
+    threads_per_core = len(siblings_of_core[allCpus[0]])
+    package_size = len(allCpus) // len(cores_of_package)
+    coreLimit_rounded_up = int(math.ceil(coreLimit / threads_per_core) * threads_per_core)
+    runs_per_package = int(math.ceil(num_of_threads / len(cores_of_package)))
+    if coreLimit_rounded_up <= package_size:
+        if any(len(set(package_of_core[core] for core in cores)) > 1 for cores in assignment):
+            violations.append("run split across packages")
+        runs_of_package = collections.Counter(package_of_core[cores[0]] for cores in assignment)
+        if max(runs_of_package.values()) - min(runs_of_package.values()) > 1:
+            violations.append("uneven package spread")
+        sharing_is_avoidable = coreLimit_rounded_up * runs_per_package <= package_size
+    else:
+        sharing_is_avoidable = coreLimit_rounded_up * num_of_threads <= len(allCpus)
+
+    if sharing_is_avoidable:
+        runs_of_physical_core = collections.defaultdict(set)
+        for run, cores in enumerate(assignment):
+            for core in cores:
+                runs_of_physical_core[min(siblings_of_core[core])].add(run)
+        if any(len(runs) > 1 for runs in runs_of_physical_core.values()):
+            violations.append("avoidable sharing of physical cores")
+
+    return violations
+
+
+def assign(coreLimit, num_of_threads, machine):
+    allCpus, cores_of_package, siblings_of_core, mems_of_core = machine
+    # Copy the input because it may be changed by the method
+    cores = resources._get_cpu_cores_per_run0(coreLimit, num_of_threads, list(allCpus),
+        {package: list(cores) for package, cores in cores_of_package.items()},
+        siblings_of_core)
+    mems = resources._get_memory_banks_per_run0(cores, set(itertools.chain(*mems_of_core.values())), mems_of_core)
+    return cores, mems
+
+
+def run_benchmark(repetitions):
+    report = []
+    for name, machine in topologies():
+        for coreLimit in CORE_LIMITS:
+            num_of_threads = len(machine[0]) // coreLimit
+            if num_of_threads < 1:
+                continue
+            entry = {"topology": name, "cpus": len(machine[0]),
+                     "coreLimit": coreLimit, "threads": num_of_threads}
+            try:
+                assignment, unused_mems = assign(coreLimit, num_of_threads, machine)
+            except SystemExit as e:
+                entry["result"] = "unsupported"
+                entry["message"] = str(e)
+            else:
+                timer = timeit.Timer(lambda: assign(coreLimit, num_of_threads, machine))
+                entry["seconds"] = min(timer.repeat(repeat=repetitions, number=1))
+                entry["violations"] = check_invariants(assignment, coreLimit, num_of_threads, machine)
+                entry["result"] = "invalid" if entry["violations"] else "ok"
+            report.append(entry)
+    return report
+
+
+def compare_with_baseline(report, baseline_file, tolerance):
+    """Return a list of entries that are slower than in the baseline by the given factor."""
+    with open(baseline_file) as f:
+        baseline = {(e["topology"], e["coreLimit"], e["threads"]): e for e in json.load(f)["results"]}
+    regressions = []
+    for entry in report:
+        old = baseline.get((entry["topology"], entry["coreLimit"], entry["threads"]))
+        if old and "seconds" in old and "seconds" in entry \
+                and entry["seconds"] > old["seconds"] * tolerance:
+            regressions.append(entry)
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("-o", "--output", metavar="FILE",
+                        help="write JSON report to FILE instead of stdout")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="compare against a previous JSON report and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=2.0, metavar="FACTOR",
+                        help="allowed slowdown compared to the baseline (default: %(default)s)")
+    parser.add_argument("--repetitions", type=int, default=5, metavar="N",
+                        help="number of measurements per configuration (default: %(default)s)")
+    options = parser.parse_args(args)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.WARNING)
+    logging.disable(logging.WARNING) # assignment warns about hyper-threading for many configurations
+
+    report = run_benchmark(options.repetitions)
+    invalid = [e for e in report if e["result"] == "invalid"]
+    regressions = compare_with_baseline(report, options.baseline, options.tolerance) if options.baseline else []
+
+    output = json.dumps({"results": report,
+                         "invalid": len(invalid),
+                         "regressions": len(regressions),
+                         "total_seconds": sum(e.get("seconds", 0) for e in report),
+                         }, indent=1, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for entry in invalid:
+        sys.stderr.write("Invalid assignment for {topology} with {coreLimit} cores and {threads} threads: {violations}\n".format(**entry))
+    for entry in regressions:
+        sys.stderr.write("Regression for {topology} with {coreLimit} cores and {threads} threads: {seconds:.4f}s\n".format(**entry))
+    return 1 if invalid or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+BenchExec is a framework for reliable benchmarking.
+This file is part of BenchExec.
+
+Copyright (C) 2007-2018  Dirk Beyer
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import timeit
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from benchexec import tablegenerator
+
+DESCRIPTION = """Benchmark for merging the task lists of several result files in table-generator.
+It generates synthetic task lists of increasing size
+(each run set misses some of the tasks and some run sets have a different order),
+measures how long the merge takes,
+and compares it with the previous implementation based on list insertion
+(which is quadratic and thus only measured up to a configurable size).
+The results are written as a JSON report that shows how both implementations scale.
+"""
+
+SIZES = [1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000]
+
+
+def merge_with_list_insertion(task_lists):
+    """The previous implementation of the merge, for comparison."""
+    task_list = []
+    task_set = set()
+    for tasks in task_lists:
+        index = -1
+        currentresult_taskset = set()
+        for task in tasks:
+            if task not in currentresult_taskset:
+                currentresult_taskset.add(task)
+                if task not in task_set:
+                    task_list.insert(index+1, task)
+                    task_set.add(task)
+                    index += 1
+                else:
+                    index = task_list.index(task)
+    return task_list
+
+
+def synthetic_task_lists(size, runsets, seed):
+    """Create task lists where each run set contains about 90% of all tasks
+    and every third run set has its tasks in reverse order."""
+    rnd = random.Random(seed)
+    tasks = [("tasks/task{:07d}.c".format(i), "unreach-call.prp") for i in range(size)]
+    task_lists = []
+    for i in range(runsets):
+        task_list = [task for task in tasks if rnd.random() < 0.9]
+        if i % 3 == 2:
+            task_list.reverse()
+        task_lists.append(task_list)
+    return task_lists
+
+
+def measure(function, task_lists, repetitions):
+    timer = timeit.Timer(lambda: function(task_lists))
+    return min(timer.repeat(repeat=repetitions, number=1))
+
+
+def run_benchmark(sizes, runsets, repetitions, max_old_size):
+    report = []
+    for size in sizes:
+        task_lists = synthetic_task_lists(size, runsets, seed=size)
+        entry = {"tasks": size, "runsets": runsets}
+        result = tablegenerator._merge_task_lists_preserving_order(task_lists)
+        entry["seconds"] = measure(
+            tablegenerator._merge_task_lists_preserving_order, task_lists, repetitions)
+        if size <= max_old_size:
+            entry["seconds_list_insertion"] = measure(
+                merge_with_list_insertion, task_lists, repetitions)
+            entry["result"] = "ok" if merge_with_list_insertion(task_lists) == result else "different"
+        else:
+            entry["result"] = "ok"
+        report.append(entry)
+    return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("-o", "--output", metavar="FILE",
+                        help="write JSON report to FILE instead of stdout")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, metavar="N",
+                        help="numbers of tasks to benchmark (default: %(default)s)")
+    parser.add_argument("--runsets", type=int, default=5, metavar="N",
+                        help="number of task lists that are merged (default: %(default)s)")
+    parser.add_argument("--repetitions", type=int, default=3, metavar="N",
+                        help="number of measurements per configuration (default: %(default)s)")
+    parser.add_argument("--max-old-size", type=int, default=8000, metavar="N",
+                        help="largest number of tasks for which the previous implementation "
+                             "is measured (default: %(default)s)")
+    options = parser.parse_args(args)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.WARNING)
+
+    report = run_benchmark(options.sizes, options.runsets, options.repetitions, options.max_old_size)
+    different = [e for e in report if e["result"] != "ok"]
+
+    output = json.dumps({"results": report,
+                         "different": len(different),
+                         }, indent=1, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for entry in different:
+        sys.stderr.write("Merged task list for {tasks} tasks differs from previous implementation\n".format(**entry))
+    return 1 if different else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+BenchExec is a framework for reliable benchmarking.
+This file is part of BenchExec.
+
+Copyright (C) 2007-2018  Dirk Beyer
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+sys.dont_write_bytecode = True # prevent creation of .pyc files
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from benchexec import result
+
+DESCRIPTION = """Benchmark for computing the expected results and scores of tasks
+(as done by table-generator for every run and by benchexec after every run).
+It scores a list of synthetic tasks (where the same task occurs in several run sets)
+with the current implementation, once as usual and once without its cache,
+and with the previous implementation that searched each possible marker in the file name,
+and checks that all results are the same.
+The results are written as a JSON report.
+"""
+
+PROPERTIES = [
+    [result._PROP_CALL],
+    [result._PROP_TERMINATION],
+    [result._PROP_OVERFLOW],
+    [result._PROP_DEREF, result._PROP_FREE, result._PROP_MEMTRACK],
+    ]
+
+CATEGORIES = [result.CATEGORY_CORRECT, result.CATEGORY_CORRECT, result.CATEGORY_WRONG,
+              result.CATEGORY_UNKNOWN, result.CATEGORY_CORRECT_UNCONFIRMED]
+
+RESULTS = {result.CATEGORY_WRONG: result.RESULT_TRUE_PROP}
+
+
+def expected_result_with_substring_search(filename, checked_properties):
+    """The previous implementation of result._expected_result(), for comparison."""
+    results = []
+    for (filename_part, (expected_result, for_properties)) in result._FILE_RESULTS.items():
+        if filename_part in filename \
+                and for_properties.intersection(checked_properties):
+            results.append(expected_result)
+    if not results:
+        return None
+    if len(results) > 1:
+        return None
+    return results[0]
+
+
+def expected_result_without_cache(filename, checked_properties):
+    return result._expected_result_for_properties.__wrapped__(filename, tuple(checked_properties))
+
+
+def synthetic_tasks(count, distinct, seed):
+    """Create a list of tasks (file name, properties, category, result),
+    with the given number of distinct file names."""
+    rnd = random.Random(seed)
+    markers = sorted(result._FILE_RESULTS)
+    filenames = [
+        "sv-benchmarks/c/set{:03d}/program{:07d}{}{}.c".format(
+            i % 100, i, rnd.choice(markers), rnd.choice(markers) if rnd.random() < 0.3 else "")
+        for i in range(distinct)]
+    tasks = []
+    for unused_i in range(count):
+        category = rnd.choice(CATEGORIES)
+        tasks.append((rnd.choice(filenames), rnd.choice(PROPERTIES), category, RESULTS.get(category)))
+    return tasks
+
+
+def score_tasks(tasks):
+    return [result.score_for_task(filename, properties, category, tool_result)
+            for filename, properties, category, tool_result in tasks]
+
+
+def measure(expected_result_function, tasks):
+    original = result._expected_result
+    if expected_result_function:
+        result._expected_result = expected_result_function
+    try:
+        result._expected_result_for_properties.cache_clear()
+        start = time.perf_counter()
+        scores = score_tasks(tasks)
+        return time.perf_counter() - start, scores
+    finally:
+        result._expected_result = original
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("-o", "--output", metavar="FILE",
+                        help="write JSON report to FILE instead of stdout")
+    parser.add_argument("--tasks", type=int, default=1000000, metavar="N",
+                        help="number of tasks that are scored (default: %(default)s)")
+    parser.add_argument("--distinct", type=int, default=20000, metavar="N",
+                        help="number of distinct file names of tasks (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, metavar="N",
+                        help="seed for generating the tasks (default: %(default)s)")
+    options = parser.parse_args(args)
+
+    tasks = synthetic_tasks(options.tasks, options.distinct, options.seed)
+    seconds, scores = measure(None, tasks)
+    seconds_without_cache, scores_without_cache = measure(expected_result_without_cache, tasks)
+    seconds_substring_search, scores_substring_search = measure(
+        expected_result_with_substring_search, tasks)
+    different = scores != scores_without_cache or scores != scores_substring_search
+
+    output = json.dumps({"tasks": options.tasks,
+                         "distinct": options.distinct,
+                         "seconds": seconds,
+                         "seconds_without_cache": seconds_without_cache,
+                         "seconds_substring_search": seconds_substring_search,
+                         "result": "different" if different else "ok",
+                         }, indent=1, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if different:
+        sys.stderr.write("Scores differ from previous implementation\n")
+    return 1 if different else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
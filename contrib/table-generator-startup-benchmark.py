@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+BenchExec is a framework for reliable benchmarking.
+This file is part of BenchExec.
+
+Copyright (C) 2007-2018  Dirk Beyer
+All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DESCRIPTION = """Benchmark for the startup time of table-generator.
+It starts table-generator repeatedly in fresh processes on a small result file
+(as it happens in continuous-integration setups that call it many times)
+and measures the time for importing its module and the total time for generating the tables,
+once without and once with a cache directory (where compiled templates are kept).
+The results are written as a JSON report.
+Another checkout of BenchExec can be given for comparing the times.
+"""
+
+BENCHEXEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+DEFAULT_RESULT_FILE = os.path.join(
+    BENCHEXEC_DIR, "benchexec", "tablegenerator", "test_integration", "results",
+    "test.2015-03-03_1613.results.predicateAnalysis.xml")
+
+
+def measure_import(benchexec_dir):
+    """Measure the time for importing table-generator in a fresh interpreter."""
+    code = ("import time; start = time.perf_counter(); import benchexec.tablegenerator; "
+            "print(time.perf_counter() - start)")
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=benchexec_dir)
+    return float(output)
+
+
+def measure_run(benchexec_dir, result_file, output_dir, cache_dir):
+    """Measure the time for running table-generator in a fresh process."""
+    cmdline = [sys.executable, os.path.join(benchexec_dir, "bin", "table-generator"),
+               "--quiet", "--outputpath", output_dir, result_file]
+    if cache_dir:
+        cmdline += ["--cache-dir", cache_dir]
+    start = time.perf_counter()
+    subprocess.check_call(cmdline, cwd=benchexec_dir)
+    return time.perf_counter() - start
+
+
+def summarize(times):
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def run_benchmark(benchexec_dir, result_file, runs):
+    temp_dir = tempfile.mkdtemp(prefix="table-generator-startup-benchmark-")
+    try:
+        output_dir = os.path.join(temp_dir, "output")
+        cache_dir = os.path.join(temp_dir, "cache")
+        # bytecode files are present in installations, so create them for a fair comparison
+        subprocess.check_call([sys.executable, "-m", "compileall", "-q",
+                               os.path.join(benchexec_dir, "benchexec")])
+        # first run populates the cache
+        measure_run(benchexec_dir, result_file, output_dir, cache_dir)
+        return {
+            "import": summarize([measure_import(benchexec_dir) for unused_i in range(runs)]),
+            "run": summarize([measure_run(benchexec_dir, result_file, output_dir, None)
+                              for unused_i in range(runs)]),
+            "run_with_cache": summarize([measure_run(benchexec_dir, result_file, output_dir, cache_dir)
+                                         for unused_i in range(runs)]),
+        }
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("result_file", nargs="?", default=DEFAULT_RESULT_FILE,
+                        help="result file for table-generator (default: a small example file)")
+    parser.add_argument("-o", "--output", metavar="FILE",
+                        help="write JSON report to FILE instead of stdout")
+    parser.add_argument("--runs", type=int, default=20, metavar="N",
+                        help="number of measurements per configuration (default: %(default)s)")
+    parser.add_argument("--compare-with", metavar="DIR",
+                        help="directory with another checkout of BenchExec to measure, too")
+    options = parser.parse_args(args)
+
+    result_file = os.path.abspath(options.result_file)
+    report = {"result_file": result_file,
+              "runs": options.runs,
+              "current": run_benchmark(BENCHEXEC_DIR, result_file, options.runs)}
+    if options.compare_with:
+        report["compared"] = run_benchmark(
+            os.path.abspath(options.compare_with), result_file, options.runs)
+
+    output = json.dumps(report, indent=1, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -80,6 +80,9 @@ setuptools.setup(
             'benchexec = benchexec.benchexec:main',
             'table-generator = benchexec.tablegenerator:main',
             ] if not PY2 else []),
+        "benchexec.post_run_hooks": [
+            'runstatistics = benchexec.hookrunstatistics:hookrunstatistics',
+            ],
         },
     install_requires = ['tempita==0.5.2'],
     setup_requires=['nose>=1.0'] + ['lxml'] if not PY2 else [],